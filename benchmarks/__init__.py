@@ -0,0 +1 @@
+"""Offline performance benchmarks"""
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Synthetic resume corpus generator.
+
+Builds PDF and DOCX resumes of configurable length from
+data/sample_resume.txt, with shuffled sections and numbered variants so
+every file has distinct bytes (and therefore misses the result cache).
+
+    python -m benchmarks.corpus --out benchmarks/corpus --count 50 --pages 1 2 10 40
+"""
+
+import argparse
+import os
+import random
+from io import BytesIO
+from typing import List
+
+from docx import Document
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE = os.path.join(ROOT, "data", "sample_resume.txt")
+
+LINES_PER_PAGE = 55
+LINE_WIDTH = 110
+
+
+def load_lines(path: str = SAMPLE) -> List[str]:
+    lines = []
+    with open(path, encoding="utf-8") as f:
+        for raw in f:
+            raw = raw.rstrip().replace("\t", " ")
+            # Wrap long bullets so PDF lines stay on the page
+            while len(raw) > LINE_WIDTH:
+                cut = raw.rfind(" ", 0, LINE_WIDTH)
+                cut = cut if cut > 0 else LINE_WIDTH
+                lines.append(raw[:cut])
+                raw = "   " + raw[cut:].lstrip()
+            lines.append(raw)
+    return lines
+
+
+def resume_pages(lines: List[str], pages: int, seed: int) -> List[List[str]]:
+    """The sample resume first, then shuffled body lines as filler pages"""
+    rng = random.Random(seed)
+    body = [l for l in lines[5:] if l.strip()]
+    text = [f"{lines[0]} #{seed}"] + lines[1:]
+    while len(text) < pages * LINES_PER_PAGE:
+        text.append(rng.choice(body))
+    text = text[:pages * LINES_PER_PAGE]
+    return [text[i:i + LINES_PER_PAGE] for i in range(0, len(text), LINES_PER_PAGE)]
+
+
+def _pdf_escape(line: str) -> bytes:
+    line = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return line.encode("latin-1", "replace")
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """Minimal text-only PDF (Helvetica, one content stream per page)"""
+    objects: List[bytes] = []
+    pages_id = 2 + 2 * len(pages)
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    kids = []
+    for lines in pages:
+        stream = b"BT /F1 9 Tf 40 800 Td 13 TL " + b" ".join(
+            b"(" + _pdf_escape(line) + b") '" for line in lines
+        ) + b" ET"
+        content = add(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        kids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] "
+            b"/Contents %d 0 R /Resources << /Font << /F1 %d 0 R >> >> >>"
+            % (pages_id, content, font)
+        ))
+    assert add(b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids)
+    )) == pages_id
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog, xref
+    )
+    return bytes(out)
+
+
+def make_docx(pages: List[List[str]]) -> bytes:
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = pages[0][0]
+    for number, lines in enumerate(pages):
+        if number:
+            doc.add_page_break()
+        for line in lines:
+            doc.add_paragraph(line)
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def generate(out_dir: str, count: int, page_counts: List[int], formats: List[str]) -> List[str]:
+    os.makedirs(out_dir, exist_ok=True)
+    lines = load_lines()
+    written = []
+    for i in range(count):
+        pages = page_counts[(i // len(formats)) % len(page_counts)]
+        fmt = formats[i % len(formats)]
+        content = resume_pages(lines, pages, seed=i)
+        data = make_pdf(content) if fmt == "pdf" else make_docx(content)
+        path = os.path.join(out_dir, f"resume_{i:04d}_{pages}p.{fmt}")
+        with open(path, "wb") as f:
+            f.write(data)
+        written.append(path)
+    return written
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--out", default=os.path.join(ROOT, "benchmarks", "corpus"))
+    ap.add_argument("--count", type=int, default=50)
+    ap.add_argument("--pages", type=int, nargs="+", default=[1, 2])
+    ap.add_argument("--formats", nargs="+", choices=["pdf", "docx"], default=["pdf", "docx"])
+    args = ap.parse_args()
+
+    written = generate(args.out, args.count, args.pages, args.formats)
+    size = sum(os.path.getsize(p) for p in written)
+    print(f"✅ Wrote {len(written)} resumes ({size / 1024:.0f} KB) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
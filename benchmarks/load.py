@@ -0,0 +1,227 @@
+"""
+Load driver for /parse and /batch-parse.
+
+Sends a synthetic corpus at the API with bounded concurrency and reports
+throughput plus p50/p95/p99 latency per stage. With --start-servers it also
+launches benchmarks/mock_llm.py and a uvicorn API wired to it, so a full run
+needs no network:
+
+    python -m benchmarks.load --start-servers --requests 200 --concurrency 20
+    python -m benchmarks.load --endpoint batch-parse --batch-size 10 --llm-latency 2
+    python -m benchmarks.load --start-servers --second-backend --strategy hedged \
+        --llm-slow-rate 0.05 --llm-slow-latency 10
+"""
+
+import argparse
+import asyncio
+import glob
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.corpus import generate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+class Recorder:
+    def __init__(self):
+        self.stages: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, int] = defaultdict(int)
+        self.files = 0
+
+    def add(self, stage: str, ms: float):
+        self.stages[stage].append(ms)
+
+    def report(self, wall_seconds: float, requests: int):
+        print(f"\n📊 {requests} requests, {self.files} files in {wall_seconds:.2f}s")
+        print(f"   throughput: {requests / wall_seconds:.2f} req/s, "
+              f"{self.files / wall_seconds:.2f} files/s")
+        print(f"   statuses: {dict(self.statuses)}")
+        print(f"\n{'stage':<28}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for stage, values in sorted(self.stages.items()):
+            print(f"{stage:<28}{len(values):>6}{percentile(values, 50):>10.1f}"
+                  f"{percentile(values, 95):>10.1f}{percentile(values, 99):>10.1f}"
+                  f"{max(values):>10.1f}")
+
+
+async def run_load(args, files: List[str]) -> None:
+    payloads = []
+    for path in files:
+        with open(path, "rb") as f:
+            payloads.append((os.path.basename(path), f.read()))
+
+    recorder = Recorder()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    timeout = httpx.Timeout(args.timeout)
+
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout) as client:
+        async def one(i: int):
+            async with semaphore:
+                if args.endpoint == "parse":
+                    name, data = payloads[i % len(payloads)]
+                    request = client.post("/parse", files={"file": (name, data)})
+                    count = 1
+                else:
+                    batch = [payloads[(i * args.batch_size + j) % len(payloads)]
+                             for j in range(args.batch_size)]
+                    request = client.post(
+                        "/batch-parse", files=[("files", item) for item in batch]
+                    )
+                    count = len(batch)
+
+                started = time.perf_counter()
+                try:
+                    response = await request
+                except httpx.HTTPError as e:
+                    recorder.statuses[type(e).__name__] += 1
+                    return
+                recorder.add("request (client)", (time.perf_counter() - started) * 1000)
+                recorder.statuses[str(response.status_code)] += 1
+                recorder.files += count
+                if response.status_code != 200:
+                    return
+                body = response.json()
+                if args.endpoint == "batch-parse":
+                    recorder.add("batch (server)", body.get("elapsed_ms", 0))
+                    for entry in body.get("resumes", []):
+                        recorder.add("file (server)", entry.get("elapsed_ms", 0))
+                        recorder.statuses[f"file:{entry['status']}"] += 1
+                else:
+                    recorder.statuses["file:error" if "error" in body else "file:success"] += 1
+                    # Server-side stage breakdown (PARSE_TIMING_HEADER=true)
+                    for pair in filter(None, response.headers.get("x-parse-timing", "").split(",")):
+                        stage, _, ms = pair.partition("=")
+                        recorder.add(f"{stage} (server)", float(ms))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        recorder.report(time.perf_counter() - started, args.requests)
+
+
+def wait_for(url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"Server at {url} did not come up")
+
+
+def start_mock(args, port: int, seed: int) -> subprocess.Popen:
+    return subprocess.Popen([
+        sys.executable, "-m", "benchmarks.mock_llm",
+        "--port", str(port),
+        "--latency", str(args.llm_latency),
+        "--jitter", str(args.llm_jitter),
+        "--error-rate", str(args.llm_error_rate),
+        "--quota-rps", str(args.llm_quota_rps),
+        "--slow-rate", str(args.llm_slow_rate),
+        "--slow-latency", str(args.llm_slow_latency),
+        "--seed", str(seed),
+        "--shapes", *args.llm_shapes,
+    ], cwd=ROOT)
+
+
+def start_servers(args) -> List[subprocess.Popen]:
+    mocks = [start_mock(args, args.mock_port, 0)]
+    # Benchmark databases stay out of the repo root and away from dev data
+    workdir = tempfile.mkdtemp(prefix="load-bench-")
+    env = dict(
+        os.environ,
+        PERPLEXITY_API_KEY="mock",
+        LLM_ENDPOINT=f"http://127.0.0.1:{args.mock_port}/chat/completions",
+        CACHE_ENABLED="true" if args.cache else "false",
+        JOBS_WORKERS="0",
+        JOBS_DB_PATH=os.path.join(workdir, "jobs.db"),
+        STORE_DB_PATH=os.path.join(workdir, "resumes.db"),
+        PARSE_TIMING_HEADER="true",
+        LLM_BACKENDS="perplexity",
+    )
+    if args.second_backend:
+        # Second mock as the OpenAI-compatible backend, routed by --strategy
+        mocks.append(start_mock(args, args.mock_port + 1, 1))
+        env.update(
+            LLM_BACKENDS="perplexity,openai",
+            LLM_STRATEGY=args.strategy,
+            OPENAI_ENDPOINT=f"http://127.0.0.1:{args.mock_port + 1}/chat/completions",
+        )
+    port = args.url.rsplit(":", 1)[-1].strip("/")
+    api = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "src.api:app",
+        "--port", port, "--log-level", "warning",
+    ], cwd=ROOT, env=env)
+    for i in range(len(mocks)):
+        wait_for(f"http://127.0.0.1:{args.mock_port + i}/stats")
+    wait_for(f"{args.url}/health")
+    return [api, *mocks]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", default="http://127.0.0.1:8000")
+    ap.add_argument("--endpoint", choices=["parse", "batch-parse"], default="parse")
+    ap.add_argument("--requests", type=int, default=100)
+    ap.add_argument("--concurrency", type=int, default=10)
+    ap.add_argument("--batch-size", type=int, default=10)
+    ap.add_argument("--timeout", type=float, default=300.0)
+    ap.add_argument("--corpus", help="directory of resumes (generated if omitted)")
+    ap.add_argument("--corpus-count", type=int, default=50)
+    ap.add_argument("--pages", type=int, nargs="+", default=[1, 2])
+    ap.add_argument("--start-servers", action="store_true",
+                    help="launch the mock LLM and a local API first")
+    ap.add_argument("--cache", action="store_true", help="leave the result cache on")
+    ap.add_argument("--mock-port", type=int, default=8911)
+    ap.add_argument("--llm-latency", type=float, default=1.0)
+    ap.add_argument("--llm-jitter", type=float, default=0.2)
+    ap.add_argument("--llm-error-rate", type=float, default=0.0)
+    ap.add_argument("--llm-shapes", nargs="+", default=["plain", "fenced"])
+    ap.add_argument("--llm-quota-rps", type=float, default=0.0,
+                    help="mock provider quota; 429s with Retry-After above it")
+    ap.add_argument("--llm-slow-rate", type=float, default=0.0,
+                    help="share of mock completions stuck for --llm-slow-latency")
+    ap.add_argument("--llm-slow-latency", type=float, default=10.0)
+    ap.add_argument("--second-backend", action="store_true",
+                    help="start a second mock as the OpenAI-compatible backend")
+    ap.add_argument("--strategy", choices=["fallback", "cheapest", "hedged"], default="hedged")
+    args = ap.parse_args()
+
+    if args.corpus:
+        files = sorted(glob.glob(os.path.join(args.corpus, "*.pdf"))
+                       + glob.glob(os.path.join(args.corpus, "*.docx")))
+    else:
+        files = generate(tempfile.mkdtemp(prefix="resume-corpus-"),
+                         args.corpus_count, args.pages, ["pdf", "docx"])
+    if not files:
+        raise SystemExit("No resumes found")
+
+    servers = start_servers(args) if args.start_servers else []
+    try:
+        asyncio.run(run_load(args, files))
+    finally:
+        for proc in servers:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
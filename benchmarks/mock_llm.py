@@ -0,0 +1,179 @@
+"""
+Local stand-in for an OpenAI-style `/chat/completions` endpoint.
+
+Latency, jitter, error rate and the shape of the completion text are all
+configurable, so the parser can be load-tested with no network:
+
+    python -m benchmarks.mock_llm --port 8911 --latency 2.0 --jitter 0.5 \
+        --error-rate 0.05 --shapes plain fenced prose --quota-rps 5
+
+    LLM_ENDPOINT=http://127.0.0.1:8911/chat/completions uvicorn src.api:app
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# Completion text shapes seen from real providers
+SHAPES = ("plain", "fenced", "prose", "truncated")
+
+FIELD_RE = re.compile(r'"(\w+)":')
+BATCH_RE = re.compile(r"^\s*=== RESUME (\d+) ===$", re.MULTILINE)
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+
+SAMPLE_VALUES = {
+    "name": "Jane Doe",
+    "email": "jane.doe@example.com",
+    "phone": "+44 7700 900123",
+    "location": "Sheffield, UK",
+    "summary": "Machine learning engineer with production NLP experience.",
+    "skills": ["Python", "FastAPI", "PyTorch", "AWS"],
+    "experience": [{
+        "title": "ML Engineer",
+        "company": "Quantiphi Analytics",
+        "duration": "May 2021 - Aug 2022",
+        "description": "Built claim adjudication models.",
+    }],
+    "education": [{
+        "degree": "MSc Artificial Intelligence",
+        "institution": "Sheffield Hallam University",
+        "year": "2025",
+        "details": None,
+    }],
+    "certifications": ["IBM Data Analyst Professional Certificate"],
+}
+
+
+def requested_fields(prompt: str) -> list:
+    """Top-level fields listed in the prompt's JSON schema"""
+    schema = re.split(r"Resume:|=== RESUME", prompt, maxsplit=1)[0]
+    fields = [f for f in FIELD_RE.findall(schema) if f in SAMPLE_VALUES]
+    return list(dict.fromkeys(fields)) or list(SAMPLE_VALUES)
+
+
+def render(shape: str, payload) -> str:
+    body = json.dumps(payload, indent=2)
+    if shape == "fenced":
+        return f"```json\n{body}\n```"
+    if shape == "prose":
+        return f"Here is the parsed resume:\n{body}\nLet me know if you need anything else."
+    if shape == "truncated":
+        return body[: len(body) // 2]
+    return body
+
+
+def create_app(
+    latency: float = 1.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    shapes=("plain",),
+    retry_after: float = 1.0,
+    seed: int = 0,
+    quota_rps: float = 0.0,
+    slow_rate: float = 0.0,
+    slow_latency: float = 10.0,
+    shuffle_batches: bool = False,
+) -> FastAPI:
+    app = FastAPI(title="Mock LLM")
+    rng = random.Random(seed)
+    stats = {"requests": 0, "errors": 0, "throttled": 0, "prompt_chars": 0}
+    app.state.stats = stats
+    # Provider quota: a token bucket of `quota_rps` requests per second
+    quota = {"tokens": max(1.0, quota_rps), "updated": time.monotonic()}
+
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        prompt = "".join(m.get("content", "") for m in body.get("messages", []))
+        stats["prompt_chars"] += len(prompt)
+
+        if quota_rps > 0:
+            now = time.monotonic()
+            quota["tokens"] = min(max(1.0, quota_rps), quota["tokens"] + (now - quota["updated"]) * quota_rps)
+            quota["updated"] = now
+            if quota["tokens"] < 1:
+                stats["throttled"] += 1
+                wait = (1 - quota["tokens"]) / quota_rps
+                return JSONResponse({"error": {"message": "rate limited"}}, status_code=429,
+                                    headers={"Retry-After": f"{wait:.2f}"})
+            quota["tokens"] -= 1
+
+        delay = max(0.0, latency + rng.uniform(-jitter, jitter))
+        if rng.random() < slow_rate:
+            # Tail latency: the occasional stuck completion
+            delay = slow_latency
+        await asyncio.sleep(delay)
+
+        if rng.random() < error_rate:
+            stats["errors"] += 1
+            status = rng.choice((429, 500, 503))
+            headers = {"Retry-After": str(retry_after)} if status == 429 else {}
+            return JSONResponse({"error": {"message": "mock failure"}}, status_code=status, headers=headers)
+
+        payload = {f: SAMPLE_VALUES[f] for f in requested_fields(prompt)}
+        parts = BATCH_RE.split(prompt)
+        if len(parts) > 1:
+            # Micro-batched prompt: one object per delimited resume, echoing
+            # its number and the email in its text
+            entries = []
+            for number, text in zip(parts[1::2], parts[2::2]):
+                entry = dict(payload, resume=int(number), name=f"Jane Doe {number}")
+                email = EMAIL_RE.search(text)
+                if "email" in entry and email:
+                    entry["email"] = email.group(0)
+                entries.append(entry)
+            if shuffle_batches:
+                rng.shuffle(entries)
+            payload = entries
+        content = render(rng.choice(shapes), payload)
+        return {
+            "id": f"mock-{stats['requests']}",
+            "model": body.get("model"),
+            "created": int(time.time()),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+            "usage": {
+                "prompt_tokens": len(prompt) // 4,
+                "completion_tokens": len(content) // 4,
+            },
+        }
+
+    @app.get("/stats")
+    def get_stats():
+        return stats
+
+    return app
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8911)
+    ap.add_argument("--latency", type=float, default=1.0, help="mean seconds per completion")
+    ap.add_argument("--jitter", type=float, default=0.0, help="± seconds, uniform")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="share of 429/500/503 answers")
+    ap.add_argument("--retry-after", type=float, default=1.0, help="Retry-After sent with 429")
+    ap.add_argument("--shapes", nargs="+", choices=SHAPES, default=["plain"])
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--quota-rps", type=float, default=0.0, help="429 above this request rate (0 = no quota)")
+    ap.add_argument("--slow-rate", type=float, default=0.0, help="share of completions that take --slow-latency")
+    ap.add_argument("--slow-latency", type=float, default=10.0)
+    ap.add_argument("--shuffle-batches", action="store_true",
+                    help="answer micro-batches out of order")
+    args = ap.parse_args()
+
+    import uvicorn
+    app = create_app(args.latency, args.jitter, args.error_rate, args.shapes,
+                     args.retry_after, args.seed, args.quota_rps,
+                     args.slow_rate, args.slow_latency, args.shuffle_batches)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
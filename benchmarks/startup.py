@@ -0,0 +1,120 @@
+"""
+Cold-start benchmark.
+
+Measures, each in a fresh process:
+  - `import src.api` time,
+  - time from launching uvicorn to the first 200 from /health,
+  - latency of the first and second /parse after that (two different
+    resumes, against benchmarks/mock_llm.py), with and without WARM_UP.
+
+    python -m benchmarks.startup --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.corpus import generate
+from benchmarks.load import ROOT, wait_for
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import src.api; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def measure_import(env: Dict[str, str]) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return float(out.strip().splitlines()[-1]) * 1000
+
+
+def measure_cold_start(env: Dict[str, str], port: int, files: List[str]) -> Dict[str, float]:
+    url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    api = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "src.api:app",
+        "--port", str(port), "--log-level", "warning",
+    ], cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    try:
+        timings = {}
+        with httpx.Client(base_url=url, timeout=30.0) as client:
+            while True:
+                try:
+                    if client.get("/health").status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if time.perf_counter() - started > 60:
+                    raise SystemExit("API did not come up")
+                time.sleep(0.01)
+            timings["first /health"] = (time.perf_counter() - started) * 1000
+            for label, path in zip(("first /parse", "second /parse"), files):
+                with open(path, "rb") as f:
+                    data = f.read()
+                sent = time.perf_counter()
+                response = client.post("/parse", files={"file": (os.path.basename(path), data)})
+                response.raise_for_status()
+                timings[label] = (time.perf_counter() - sent) * 1000
+        return timings
+    finally:
+        api.terminate()
+        api.wait()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--port", type=int, default=8931)
+    ap.add_argument("--mock-port", type=int, default=8932)
+    ap.add_argument("--llm-latency", type=float, default=0.05)
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="startup-bench-")
+    mock = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.mock_llm",
+        "--port", str(args.mock_port), "--latency", str(args.llm_latency),
+    ], cwd=ROOT)
+    try:
+        wait_for(f"http://127.0.0.1:{args.mock_port}/stats")
+        base_env = dict(
+            os.environ,
+            PERPLEXITY_API_KEY="mock",
+            LLM_ENDPOINT=f"http://127.0.0.1:{args.mock_port}/chat/completions",
+            LLM_BACKENDS="perplexity",
+            CACHE_ENABLED="false",
+            JOBS_WORKERS="0",
+            JOBS_DB_PATH=os.path.join(workdir, "jobs.db"),
+            STORE_DB_PATH=os.path.join(workdir, "resumes.db"),
+        )
+
+        imports = [measure_import(base_env) for _ in range(args.runs)]
+        print(f"\n🚀 import src.api: median {statistics.median(imports):.0f} ms "
+              f"(min {min(imports):.0f}, max {max(imports):.0f}) over {args.runs} runs")
+
+        # Two different resumes; CACHE_ENABLED=false so neither is served from memory
+        files = generate(os.path.join(workdir, "corpus"), 2, [1], ["pdf"])
+        print(f"\n{'':<10}{'first /health':>15}{'first /parse':>15}{'second /parse':>15}   (median ms)")
+        for warm_up in ("false", "true"):
+            runs = []
+            for _ in range(args.runs):
+                runs.append(measure_cold_start(dict(base_env, WARM_UP=warm_up), args.port, files))
+            row = [statistics.median(r[k] for r in runs)
+                   for k in ("first /health", "first /parse", "second /parse")]
+            print(f"{'WARM_UP=' + warm_up:<10}" + "".join(f"{v:>15.0f}" for v in row))
+    finally:
+        mock.terminate()
+        mock.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,6 @@ Run this to see exactly what's breaking
 """
 
 import json
-import requests
 from src.parser import ResumeParser
 from src.config import settings
 import traceback
@@ -39,15 +38,9 @@ print("✅ Text extraction test passed")
 print("\n2️⃣ Testing raw Perplexity API...")
 try:
     prompt = "Return JSON: {\"test\": \"works\"}"
-    response = requests.post(
-        "https://api.perplexity.ai/chat/completions",
-        headers={"Authorization": f"Bearer {settings.perplexity_api_key}", "Content-Type": "application/json"},
-        json={
-            "model": "sonar-pro",
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.1
-        },
-        timeout=30
+    response = parser.llm.backends[0].complete_sync(
+        [{"role": "user", "content": prompt}],
+        temperature=0.1
     )
     print(f"Status: {response.status_code}")
     print("Raw response keys:", list(response.json().keys()))
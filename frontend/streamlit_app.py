@@ -1,11 +1,16 @@
 import streamlit as st
 import requests
+import hashlib
 import json
-from io import BytesIO
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from urllib3.util.retry import Retry
 import os
 # Page config
 st.set_page_config(
-    page_title="Resume Parser AI", 
+    page_title="Resume Parser AI",
     page_icon="📄",
     layout="wide"
 )
@@ -16,7 +21,7 @@ st.markdown("**Production-ready resume parsing with AI**")
 # Sidebar with API config
 # st.sidebar.header("🔧 API Settings")
 # api_url = st.sidebar.text_input(
-#     "API URL", 
+#     "API URL",
 #     value="http://127.0.0.1:8000",
 #     help="Local server for testing"
 # )
@@ -28,109 +33,218 @@ st.caption(f"🔗 Backend: {api_url}")
 if api_url:
     st.sidebar.success(f"✅ Connected to {api_url}")
 
+# Resumes sent to the API at the same time (the API's default in-flight limit)
+PARALLEL_UPLOADS = int(os.getenv("PARALLEL_UPLOADS", "16"))
+# (connect, read) seconds; the API answers 503 quickly when it is overloaded
+# instead of letting requests pile up, so the read timeout only covers a slow parse
+REQUEST_TIMEOUT = (5, 90)
+
+
+class ParseError(Exception):
+    """Failed parse; raised so that st.cache_data does not keep it"""
+
+
+class DegradedParse(ParseError):
+    """Rules-only result from an LLM outage: shown, but not cached"""
+
+    def __init__(self, data: dict):
+        super().__init__(data.get("llm_error") or "AI parsing unavailable")
+        self.data = data
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One pooled HTTP session for every parse, shared across reruns.
+
+    503 + Retry-After from the API's admission control is retried after
+    the advertised delay.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        status_forcelist=[503],
+        allowed_methods=None,
+        respect_retry_after_header=True,
+        backoff_factor=1,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1, pool_maxsize=PARALLEL_UPLOADS, max_retries=retry
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_data(show_spinner=False, max_entries=1000, ttl=24 * 3600)
+def parse_resume(api_url: str, digest: str, filename: str, _content: bytes, _client: str) -> dict:
+    """Parsed resume, memoized by file hash; `_` arguments are not hashed"""
+    response = get_session().post(
+        f"{api_url}/parse",
+        files={"file": (filename, _content)},
+        # One fairness queue per browser session, once the API lists this
+        # host in ADMISSION_TRUSTED_PROXIES (otherwise it keys on our address)
+        headers={"X-Client-ID": _client},
+        timeout=REQUEST_TIMEOUT,
+    )
+    if response.status_code != 200:
+        raise ParseError(f"API Error {response.status_code}: {response.text[:500]}")
+    data = response.json()
+    if "error" in data:
+        raise ParseError(data["error"])
+    # Otherwise the rules-only answer would stick for 24 h after the LLM is back
+    if data.get("partial") or "llm_error" in data:
+        raise DegradedParse(data)
+    return data
+
+
+def render_resume(data: dict, filename: str, digest: str):
+    """Show one parsed resume"""
+    # Personal info
+    st.subheader("👤 Personal Information")
+    personal_col1, personal_col2 = st.columns(2)
+    with personal_col1:
+        st.metric("Name", data.get("name") or "N/A")
+        st.metric("Email", data.get("email") or "N/A")
+    with personal_col2:
+        st.metric("Phone", data.get("phone") or "N/A")
+        st.metric("Location", data.get("location") or "N/A")
+
+    # Summary
+    if data.get("summary"):
+        st.subheader("📝 Professional Summary")
+        st.write(data["summary"])
+
+    # Skills
+    if data.get("skills"):
+        st.subheader("🔧 Skills")
+        skills = data["skills"]
+        skill_cols = st.columns(3)
+        for i, skill in enumerate(skills[:9]):  # Show top 9
+            with skill_cols[i % 3]:
+                st.caption(skill)
+        if len(skills) > 9:
+            st.caption(f"... and {len(skills)-9} more")
+
+    # Experience
+    if data.get("experience"):
+        st.subheader("💼 Experience")
+        for exp in data["experience"]:
+            with st.expander(f"📈 {exp.get('title')} @ {exp.get('company')}"):
+                if exp.get("duration"):
+                    st.caption(f"**Duration:** {exp['duration']}")
+                if exp.get("description"):
+                    st.write(exp["description"])
+
+    # Education
+    if data.get("education"):
+        st.subheader("🎓 Education")
+        for edu in data["education"]:
+            with st.expander(f"📚 {edu.get('degree')}"):
+                st.caption(f"**{edu.get('institution', 'N/A')}**")
+                if edu.get("year"):
+                    st.caption(f"**Year:** {edu['year']}")
+                if edu.get("details"):
+                    st.write(edu["details"])
+
+    # Download JSON
+    json_data = json.dumps(data, indent=2, ensure_ascii=False)
+    st.download_button(
+        label="💾 Download JSON",
+        data=json_data,
+        file_name=f"{filename.rsplit('.', 1)[0]}_parsed.json",
+        mime="application/json",
+        key=f"download-{digest}",
+    )
+
+
 # Main content
 col1, col2 = st.columns([1, 2])
 
 with col1:
-    st.header("📤 Upload Resume")
-    uploaded_file = st.file_uploader(
-        "Choose PDF or DOCX file",
+    st.header("📤 Upload Resumes")
+    uploaded_files = st.file_uploader(
+        "Choose PDF or DOCX files",
         type=["pdf", "docx"],
-        help="Supports PDF and DOCX formats"
+        accept_multiple_files=True,
+        help="Supports PDF and DOCX formats; several files are parsed in parallel"
     )
-    
-    if uploaded_file:
-        st.info(f"**File:** {uploaded_file.name}")
-        st.info(f"**Size:** {uploaded_file.size / 1024:.1f} KB")
+
+    if uploaded_files:
+        total_kb = sum(f.size for f in uploaded_files) / 1024
+        st.info(f"**Files:** {len(uploaded_files)} ({total_kb:.1f} KB)")
 
 with col2:
-    if uploaded_file:
-        if st.button("🚀 Parse Resume", type="primary"):
-            with st.spinner("AI parsing your resume..."):
-                try:
-                    # Send to your API
-                    files = {"file": (uploaded_file.name, uploaded_file.getvalue())}
-                    response = requests.post(
-                        f"{api_url}/parse",
-                        files=files,
-                        timeout=45
-                    )
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        
-                        # Success message
-                        st.success("✅ Resume parsed successfully!")
-                        
-                        # Personal info
-                        st.subheader("👤 Personal Information")
-                        personal_col1, personal_col2 = st.columns(2)
-                        with personal_col1:
-                            st.metric("Name", data.get("name", "N/A"))
-                            st.metric("Email", data.get("email", "N/A"))
-                        with personal_col2:
-                            st.metric("Phone", data.get("phone", "N/A"))
-                            st.metric("Location", data.get("location", "N/A"))
-                        
-                        # Summary
-                        if data.get("summary"):
-                            st.subheader("📝 Professional Summary")
-                            st.write(data["summary"])
-                        
-                        # Skills
-                        if data.get("skills"):
-                            st.subheader("🔧 Skills")
-                            skills = data["skills"]
-                            skill_cols = st.columns(3)
-                            for i, skill in enumerate(skills[:9]):  # Show top 9
-                                with skill_cols[i % 3]:
-                                    st.caption(skill)
-                            if len(skills) > 9:
-                                st.caption(f"... and {len(skills)-9} more")
-                        
-                        # Experience
-                        if data.get("experience"):
-                            st.subheader("💼 Experience")
-                            for exp in data["experience"]:
-                                with st.expander(f"📈 {exp.get('title')} @ {exp.get('company')}"):
-                                    if exp.get("duration"):
-                                        st.caption(f"**Duration:** {exp['duration']}")
-                                    if exp.get("description"):
-                                        st.write(exp["description"])
-                        
-                        # Education
-                        if data.get("education"):
-                            st.subheader("🎓 Education")
-                            for edu in data["education"]:
-                                with st.expander(f"📚 {edu.get('degree')}"):
-                                    st.caption(f"**{edu.get('institution', 'N/A')}**")
-                                    if edu.get("year"):
-                                        st.caption(f"**Year:** {edu['year']}")
-                                    if edu.get("details"):
-                                        st.write(edu["details"])
-                        
-                        # Download JSON
-                        st.divider()
-                        json_data = json.dumps(data, indent=2, ensure_ascii=False)
-                        st.download_button(
-                            label="💾 Download JSON",
-                            data=json_data,
-                            file_name=f"{uploaded_file.name.rsplit('.', 1)[0]}_parsed.json",
-                            mime="application/json",
-                            type="primary"
-                        )
-                        
-                    else:
-                        st.error(f"❌ API Error: {response.status_code}")
-                        st.code(response.text)
-                
-                except requests.exceptions.Timeout:
-                    st.error("⏱️ Request timed out. Try a smaller file.")
-                except Exception as e:
-                    st.error(f"❌ Error: {str(e)}")
+    if uploaded_files:
+        # Identical uploads are parsed once
+        files = {}
+        for uploaded_file in uploaded_files:
+            content = uploaded_file.getvalue()
+            files.setdefault(hashlib.sha256(content).hexdigest(), (uploaded_file.name, content))
+
+        label = "🚀 Parse Resume" if len(files) == 1 else f"🚀 Parse {len(files)} Resumes"
+        if st.button(label, type="primary"):
+            st.session_state.parse_requested = True
+
+        # Stay on the results across reruns (expanders, downloads); cached
+        # files come straight back from st.cache_data
+        if st.session_state.get("parse_requested"):
+            started = time.perf_counter()
+            progress = st.progress(0.0, text="AI parsing your resumes...")
+            results = []
+            failures = 0
+            ctx = get_script_run_ctx()
+            client = f"streamlit-{ctx.session_id[:8]}" if ctx else "streamlit"
+
+            def submit(digest: str, filename: str, content: bytes) -> dict:
+                add_script_run_ctx(ctx=ctx)
+                return parse_resume(api_url, digest, filename, content, client)
+
+            with ThreadPoolExecutor(max_workers=PARALLEL_UPLOADS) as executor:
+                futures = {
+                    executor.submit(submit, digest, name, content): (digest, name)
+                    for digest, (name, content) in files.items()
+                }
+                # Rendered in completion order, each as soon as it is back
+                for done, future in enumerate(as_completed(futures), start=1):
+                    digest, filename = futures[future]
+                    with st.container(border=True):
+                        st.markdown(f"#### 📄 {filename}")
+                        data = None
+                        try:
+                            data = future.result()
+                        except DegradedParse as e:
+                            data = e.data
+                            st.warning(f"⚠️ AI parsing unavailable ({e}); showing rule-based "
+                                       f"fields only. Parse again later for the full result.")
+                        except requests.exceptions.Timeout:
+                            failures += 1
+                            st.error("⏱️ Request timed out. Try a smaller file.")
+                        except Exception as e:
+                            failures += 1
+                            st.error(f"❌ Error: {str(e)}")
+                        if data is not None:
+                            results.append({"filename": filename, "sha256": digest, "data": data})
+                            render_resume(data, filename, digest)
+                    progress.progress(done / len(files), text=f"Parsed {done}/{len(files)}")
+
+            elapsed = time.perf_counter() - started
+            if failures:
+                st.warning(f"⚠️ {len(results)} parsed, {failures} failed in {elapsed:.1f}s")
+            else:
+                st.success(f"✅ {len(results)} resume(s) parsed in {elapsed:.1f}s")
+            if len(results) > 1:
+                st.download_button(
+                    label="💾 Download all as JSON",
+                    data=json.dumps(results, indent=2, ensure_ascii=False),
+                    file_name="resumes_parsed.json",
+                    mime="application/json",
+                    type="primary",
+                )
 
     else:
-        st.info("👆 Upload a resume PDF or DOCX to get started!")
+        st.session_state.parse_requested = False
+        st.info("👆 Upload resume PDFs or DOCX files to get started!")
 
 # Footer
 st.divider()
@@ -142,4 +256,4 @@ st.markdown("""
 - **Deployment:** Railway + Hugging Face Spaces
 
 **Source Code:** [GitHub](https://github.com/kunalg06/Resume-Parser-AI)
-""")
\ No newline at end of file
+""")
@@ -0,0 +1,296 @@
+"""
+Admission control for the parse endpoints.
+
+At most `max_in_flight` parses run at once; the rest wait in a bounded
+queue with a deadline, and anything that cannot be served in time is
+refused immediately with 503 and a `Retry-After` derived from the observed
+service time. Accepted work therefore keeps a predictable latency under
+overload instead of every request slowing down together.
+
+Waiters are queued per client and slots are handed out round-robin across
+clients, so a bulk uploader with dozens of files waiting cannot starve an
+interactive user behind it. When the queue is full, a newcomer from a
+lighter client pushes out the heaviest client's newest waiter. Clients are
+told apart by peer address; headers that name a client are only believed
+when they come from a configured trusted proxy, since anyone can rotate them.
+"""
+
+import asyncio
+import ipaddress
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src import metrics
+
+ADMISSION_REJECTED = metrics.REGISTRY.counter(
+    "resume_admission_rejected_total",
+    "Parses refused with 503, by reason (queue_full, client_queue_full, deadline, shed)",
+    ["reason"],
+)
+ADMISSION_WAIT_SECONDS = metrics.REGISTRY.histogram(
+    "resume_admission_wait_seconds",
+    "Time admitted parses spent queued for a slot",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20),
+)
+
+# Bounds for Retry-After, in seconds
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 120
+
+
+class Overloaded(Exception):
+    """No slot now or within the deadline; retry after `retry_after` seconds"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Server overloaded ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounded in-flight parses with a fair, deadline-bounded wait queue.
+
+    Waiters admitted with `deadline=False` (files of a batch that was
+    already accepted, background jobs) still take turns with everyone else
+    but are never timed out or shed, and do not count against `max_queue`.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 16,
+        max_queue: int = 64,
+        max_queue_per_client: int = 16,
+        queue_timeout: float = 15.0,
+        initial_service_time: float = 2.0,
+    ):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max_queue
+        self.max_queue_per_client = max_queue_per_client
+        self.queue_timeout = queue_timeout
+        # Moving average of how long a parse holds its slot
+        self.service_time = initial_service_time
+        self.in_flight = 0
+        self.queued = 0
+        # Waiters that have a deadline, the ones max_queue bounds
+        self.bounded = 0
+        # (future, has deadline) by client, clients in round-robin order
+        self._waiting: "OrderedDict[str, Deque[Tuple[asyncio.Future, bool]]]" = OrderedDict()
+
+    def retry_after(self, ahead: Optional[int] = None) -> int:
+        """Seconds until a slot is likely free for a request behind `ahead` others"""
+        ahead = self.queued if ahead is None else ahead
+        wait = (ahead + 1) * self.service_time / self.max_in_flight
+        return int(min(MAX_RETRY_AFTER, max(MIN_RETRY_AFTER, math.ceil(wait))))
+
+    def _ahead_of(self, client: str) -> int:
+        # Round-robin: each client is served at most one more time than
+        # this one before this one's new waiter gets a slot
+        mine = len(self._waiting.get(client, ()))
+        return sum(min(len(waiters), mine + 1) for waiters in self._waiting.values())
+
+    def check(self, client: str):
+        """Raise Overloaded if a new waiter from `client` would be refused"""
+        if self.in_flight < self.max_in_flight and not self.queued:
+            return
+        mine = len(self._waiting.get(client, ()))
+        if mine >= self.max_queue_per_client:
+            self._reject("client_queue_full")
+        if self.bounded >= self.max_queue and self._victim(mine) is None:
+            self._reject("queue_full")
+        ahead = self._ahead_of(client)
+        if (ahead + 1) * self.service_time / self.max_in_flight > self.queue_timeout:
+            self._reject("deadline", ahead)
+
+    def _reject(self, reason: str, ahead: Optional[int] = None):
+        ADMISSION_REJECTED.inc(reason=reason)
+        raise Overloaded(reason, self.retry_after(ahead))
+
+    def _victim(self, than: int) -> Optional[Tuple[str, Tuple[asyncio.Future, bool]]]:
+        """Newest sheddable waiter of the client with clearly more than `than` waiting"""
+        for client, waiters in sorted(self._waiting.items(), key=lambda item: -len(item[1])):
+            if len(waiters) <= than + 1:
+                return None
+            for waiter in reversed(waiters):
+                if waiter[1]:
+                    return client, waiter
+        return None
+
+    async def acquire(self, client: str, deadline: bool = True) -> float:
+        """Wait for a slot; returns the seconds spent queued"""
+        if self.in_flight < self.max_in_flight and not self.queued:
+            self.in_flight += 1
+            return 0.0
+        if deadline:
+            self.check(client)
+            if self.bounded >= self.max_queue:
+                self._shed(*self._victim(len(self._waiting.get(client, ()))))
+
+        started = time.perf_counter()
+        waiter = (asyncio.get_running_loop().create_future(), deadline)
+        self._waiting.setdefault(client, deque()).append(waiter)
+        self.queued += 1
+        self.bounded += deadline
+        future = waiter[0]
+        try:
+            await asyncio.wait_for(future, self.queue_timeout if deadline else None)
+        except BaseException as e:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # Granted just as we gave up: hand the slot on
+                self.release()
+            else:
+                self._forget(client, waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self._reject("deadline")
+            raise
+        waited = time.perf_counter() - started
+        ADMISSION_WAIT_SECONDS.observe(waited)
+        return waited
+
+    def _shed(self, client: str, waiter: Tuple[asyncio.Future, bool]):
+        self._forget(client, waiter)
+        ADMISSION_REJECTED.inc(reason="shed")
+        waiter[0].set_exception(Overloaded("shed", self.retry_after()))
+
+    def _forget(self, client: str, waiter: Tuple[asyncio.Future, bool]):
+        waiters = self._waiting.get(client)
+        if waiters is not None and waiter in waiters:
+            waiters.remove(waiter)
+            self.queued -= 1
+            self.bounded -= waiter[1]
+            if not waiters:
+                del self._waiting[client]
+
+    def release(self, service_seconds: Optional[float] = None):
+        if service_seconds is not None:
+            self.service_time = 0.8 * self.service_time + 0.2 * service_seconds
+        self.in_flight -= 1
+        while self._waiting and self.in_flight < self.max_in_flight:
+            # Next client in turn; it goes to the back if it has more waiting
+            client, waiters = self._waiting.popitem(last=False)
+            future, bounded = waiters.popleft()
+            if waiters:
+                self._waiting[client] = waiters
+            self.queued -= 1
+            self.bounded -= bounded
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, client: str, deadline: bool = True) -> AsyncIterator[float]:
+        """Hold one parse slot for the body of the `async with`"""
+        waited = await self.acquire(client, deadline)
+        started = time.perf_counter()
+        try:
+            yield waited
+        finally:
+            self.release(time.perf_counter() - started)
+
+    def stats(self) -> Dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "clients_waiting": len(self._waiting),
+            "service_time": round(self.service_time, 3),
+        }
+
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def parse_trusted_proxies(value: str) -> List[Network]:
+    """"10.0.0.0/8, 127.0.0.1" -> networks; invalid entries are reported and skipped"""
+    networks = []
+    for entry in (part.strip() for part in value.split(",")):
+        if not entry:
+            continue
+        try:
+            networks.append(ipaddress.ip_network(entry, strict=False))
+        except ValueError:
+            print(f"⚠️ Ignoring invalid trusted proxy: {entry}")
+    return networks
+
+
+def _trusted(address: str, trusted_proxies: Sequence[Network]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in trusted_proxies)
+
+
+def client_id(scope: Scope, trusted_proxies: Sequence[Network] = ()) -> str:
+    """Who to queue a request under.
+
+    The peer address, unless the peer is a trusted proxy: then its
+    X-Client-ID (e.g. one per frontend session), else the nearest
+    X-Forwarded-For hop that is not itself a trusted proxy.
+    """
+    client = scope.get("client")
+    peer = client[0] if client else "unknown"
+    if not _trusted(peer, trusted_proxies):
+        return peer
+    headers = dict(scope.get("headers") or [])
+    explicit = headers.get(b"x-client-id")
+    if explicit:
+        return explicit.decode("latin-1")[:64]
+    forwarded = headers.get(b"x-forwarded-for")
+    if forwarded:
+        # Hops are appended left to right; only the right end is trustworthy
+        for hop in reversed(forwarded.decode("latin-1").split(",")):
+            hop = hop.strip()
+            if hop and not _trusted(hop, trusted_proxies):
+                return hop
+    return peer
+
+
+class AdmissionMiddleware:
+    """Refuse parse requests before their bodies are read.
+
+    A request to one of `paths` is turned away up front when a new waiter
+    from its client would be. Slots themselves are taken by the handlers
+    once the upload is in memory, so a slow upload never holds one and
+    upload time never counts as service time.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        paths,
+        trusted_proxies: Sequence[Network] = (),
+    ):
+        self.app = app
+        self.controller = controller
+        self.paths = set(paths)
+        self.trusted_proxies = trusted_proxies
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and scope.get("path") in self.paths:
+            try:
+                self.controller.check(client_id(scope, self.trusted_proxies))
+            except Overloaded as e:
+                await reject(send, e)
+                return
+        await self.app(scope, receive, send)
+
+
+async def reject(send: Send, error: Overloaded):
+    body = ('{"detail":"%s","retry_after":%d}' % (error, error.retry_after)).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(error.retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
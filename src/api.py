@@ -1,33 +1,144 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import tempfile
-import os
-from src.parser import ResumeParser
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+import asyncio
+import time
+from contextlib import nullcontext
+from src import decoding, metrics
+from src.admission import (
+    AdmissionController, AdmissionMiddleware, Overloaded, client_id, parse_trusted_proxies
+)
+from src.parser import FULL_MODE, RULES_MODE, build_parser
+from src.providers import NO_BACKEND_ERROR
+from src.store import ResumeStore, SearchError
+from src import config
 from src.config import settings
+from src.workers import WorkerPools
+from src.jobs import JobQueue, JobWorkerPool
+from src.uploads import (
+    Upload, UploadLimitMiddleware, UnsupportedUpload, UploadTooLarge, read_upload
+)
+from typing import List
 import traceback
 
+class FastJSONResponse(JSONResponse):
+    """JSONResponse serialized with orjson when it is installed"""
+
+    def render(self, content) -> bytes:
+        if decoding.orjson is None:
+            return super().render(content)
+        return decoding.orjson.dumps(content, option=decoding.orjson.OPT_NON_STR_KEYS)
+
 app = FastAPI(
     title="Resume Parser API",
     description="AI-powered resume parsing with Perplexity LLM",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=FastJSONResponse
+)
+
+# Cap whole request bodies before the multipart parser spools them
+app.add_middleware(
+    UploadLimitMiddleware,
+    max_bytes=settings.max_request_bytes,
+    paths=["/parse", "/batch-parse", "/batch-parse/stream", "/jobs"],
 )
 
-# CORS setup - allow frontend to connect
+# Bounded parse concurrency with a fair, deadline-bounded queue; overload
+# is answered with 503 + Retry-After before the upload is read, and slots
+# are taken only once it has been
+admission = None
+# Only these peers may name the client (X-Client-ID / X-Forwarded-For)
+trusted_proxies = parse_trusted_proxies(settings.admission_trusted_proxies)
+if settings.admission_max_in_flight > 0:
+    admission = AdmissionController(
+        max_in_flight=settings.admission_max_in_flight,
+        max_queue=settings.admission_max_queue,
+        max_queue_per_client=settings.admission_max_queue_per_client,
+        queue_timeout=settings.admission_queue_timeout,
+    )
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=admission,
+        paths=["/parse", "/batch-parse", "/batch-parse/stream"],
+        trusted_proxies=trusted_proxies,
+    )
+
+# CORS setup - allow frontend to connect. Added last so it is the
+# outermost layer: the 413 and 503 answers of the middlewares above carry
+# CORS headers too, and a browser can read their Retry-After
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
+)
+
+# Extraction runs in a process pool, blocking file I/O in a thread pool
+pools = WorkerPools(
+    cpu_workers=settings.extract_process_workers,
+    io_workers=settings.io_thread_workers
 )
 
+# Configuration problems found while starting, reported by /health
+startup_problems = list(config.load_errors)
+
 # Initialize parser
 try:
-    parser = ResumeParser(api_key=settings.perplexity_api_key)
+    parser = build_parser(settings)
 except Exception as e:
     print(f"Warning: Could not initialize parser: {e}")
+    startup_problems.append(f"Parser not initialized: {e}")
     parser = None
+if parser is not None and not parser.llm.backends:
+    startup_problems.append(f"{NO_BACKEND_ERROR}; only mode=rules works")
+
+# Durable queue behind /jobs; workers may also run via `python -m src.jobs`
+jobs_queue = JobQueue(settings.jobs_db_path, lease_seconds=settings.jobs_lease_seconds)
+job_workers = None
+
+@app.on_event("startup")
+async def start_job_workers():
+    """Start in-process job workers (JOBS_WORKERS=0 leaves it to external ones)"""
+    global job_workers
+    if parser and settings.jobs_workers > 0:
+        job_workers = JobWorkerPool(
+            jobs_queue, parser,
+            workers=settings.jobs_workers,
+            max_attempts=settings.jobs_max_attempts,
+            retry_backoff=settings.jobs_retry_backoff,
+            extract_executor=pools,
+            admission=admission,
+        )
+        job_workers.start()
+
+@app.on_event("startup")
+async def warm_up():
+    """Open LLM connections and start extraction processes (WARM_UP=true)"""
+    if not settings.warm_up:
+        return
+    started = time.perf_counter()
+    tasks = [pools.warm_up()]
+    if parser:
+        tasks.append(parser.llm.warm_up())
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            print(f"⚠️ Warm-up failed: {result!r}")
+        elif result:
+            for name, error in result.items():
+                print(f"⚠️ Could not reach LLM backend {name}: {error}")
+    print(f"🔥 Warmed up in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+@app.on_event("shutdown")
+async def close_llm_client():
+    """Stop job workers, release pooled LLM connections and worker pools"""
+    if job_workers:
+        await job_workers.stop()
+    if parser:
+        await parser.aclose()
+    pools.shutdown()
 
 @app.get("/")
 def root():
@@ -35,20 +146,106 @@ def root():
     return {
         "message": "Resume Parser API v2.0",
         "docs": "/docs",
-        "endpoints": ["/health", "/parse", "/batch-parse"]
+        "endpoints": ["/health", "/parse", "/batch-parse", "/batch-parse/stream", "/jobs", "/search", "/resumes/{hash}", "/cache/stats", "/metrics"]
     }
 
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
     return {
-        "status": "ok",
+        "status": "degraded" if startup_problems else "ok",
+        "problems": startup_problems,
         "version": "2.0.0",
-        "api": "Perplexity"
+        "api": "+".join(b.name for b in parser.llm.backends) or None if parser else None,
+        "routing": parser.llm.strategy if parser else None
     }
 
+@app.get("/cache/stats")
+def cache_stats():
+    """Result cache hit/miss counters"""
+    if not parser or parser.cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **parser.cache.stats()}
+
+def _cache_metrics() -> list:
+    """Result cache counters, read at scrape time"""
+    if not parser or parser.cache is None:
+        return []
+    stats = parser.cache.stats()
+    return [
+        "# HELP resume_cache_hits_total Result cache hits (memory or disk)",
+        "# TYPE resume_cache_hits_total counter",
+        f"resume_cache_hits_total {stats['hits']}",
+        "# HELP resume_cache_disk_hits_total Result cache hits served from SQLite",
+        "# TYPE resume_cache_disk_hits_total counter",
+        f"resume_cache_disk_hits_total {stats['disk_hits']}",
+        "# HELP resume_cache_misses_total Result cache misses",
+        "# TYPE resume_cache_misses_total counter",
+        f"resume_cache_misses_total {stats['misses']}",
+        "# HELP resume_cache_entries Entries held in the in-memory cache tier",
+        "# TYPE resume_cache_entries gauge",
+        f"resume_cache_entries {stats['memory_entries']}",
+    ]
+
+def _router_metrics() -> list:
+    """Per-backend p90 and scheduler state, read at scrape time"""
+    if not parser:
+        return []
+    gauges = [
+        ("p90_seconds", "resume_llm_p90_seconds", "Observed p90 latency per backend"),
+        ("concurrency_limit", "resume_llm_concurrency_limit", "Current adaptive in-flight limit"),
+        ("in_flight", "resume_llm_in_flight", "Chat-completion calls in flight"),
+        ("breaker", "resume_llm_circuit_open", "1 while the circuit breaker refuses calls"),
+    ]
+    rows = parser.llm.stats()
+    lines = []
+    for key, name, doc in gauges:
+        lines += [f"# HELP {name} {doc}", f"# TYPE {name} gauge"]
+        for row in rows:
+            value = row.get(key)
+            if key == "breaker" and value is not None:
+                value = int(value != "closed")
+            if value is not None:
+                lines.append(f'{name}{{backend="{row["backend"]}"}} {value}')
+    return lines
+
+def _admission_metrics() -> list:
+    """Admission controller occupancy, read at scrape time"""
+    if admission is None:
+        return []
+    stats = admission.stats()
+    return [
+        "# HELP resume_admission_in_flight Parses holding a slot",
+        "# TYPE resume_admission_in_flight gauge",
+        f"resume_admission_in_flight {stats['in_flight']}",
+        "# HELP resume_admission_queued Parses waiting for a slot",
+        "# TYPE resume_admission_queued gauge",
+        f"resume_admission_queued {stats['queued']}",
+        "# HELP resume_admission_service_seconds Moving average of slot hold time",
+        "# TYPE resume_admission_service_seconds gauge",
+        f"resume_admission_service_seconds {stats['service_time']}",
+    ]
+
+metrics.REGISTRY.register_collector(_cache_metrics)
+metrics.REGISTRY.register_collector(_router_metrics)
+metrics.REGISTRY.register_collector(_admission_metrics)
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Prometheus scrape endpoint: stage latencies, outcomes, LLM errors"""
+    return PlainTextResponse(
+        metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4"
+    )
+
+def _check_mode(mode: str):
+    if mode not in (FULL_MODE, RULES_MODE):
+        raise HTTPException(
+            status_code=400,
+            detail=f"mode must be '{FULL_MODE}' or '{RULES_MODE}'"
+        )
+
 @app.post("/parse")
-async def parse_resume(file: UploadFile = File(...)):
+async def parse_resume(request: Request, file: UploadFile = File(...), mode: str = FULL_MODE):
     """
     Upload a resume (PDF or DOCX) and get structured data.
     
@@ -58,8 +255,11 @@ async def parse_resume(file: UploadFile = File(...)):
     - experience (list of jobs)
     - education (list of degrees)
     - certifications
+
+    `mode=rules` skips the LLM and returns the offline, partial result.
     """
     
+    _check_mode(mode)
     if not parser:
         raise HTTPException(
             status_code=500,
@@ -73,96 +273,266 @@ async def parse_resume(file: UploadFile = File(...)):
     # Log for debugging
     print(f"📁 Processing: {filename} ({file.size} bytes)")
 
-    # Size limit only
-    if file.size > 10 * 1024 * 1024:  # 10MB
-        raise HTTPException(status_code=400, detail="File too large")
-
-    # Optional: Warn on unknown extension
+    # Format is sniffed from magic bytes, the extension is only a hint
     if not filename.lower().endswith(('.pdf', '.docx', '.doc')):
         print(f"⚠️ Unknown extension: {filename}")
+
+    timings = metrics.start_request_timing()
+    started = time.perf_counter()
+    upload = await _read_upload(file)
+    upload.filename = filename
     
-    tmp_path = None
     try:
-        # Save uploaded file to temp location
-        with tempfile.NamedTemporaryFile(
-            delete=False,
-            suffix=os.path.splitext(file.filename)[1]
-        ) as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
-        
-        # Parse the resume
-        result = parser.parse(tmp_path)
-        
-        return JSONResponse(content=result, status_code=200)
+        # Slot only once the upload is in memory: a slow client never holds one
+        slot = admission.slot(client_id(request.scope, trusted_proxies)) if admission else nullcontext()
+        async with slot:
+            result = await _parse_upload(upload, mode)
+        metrics.record_stage("total", time.perf_counter() - started)
+
+        headers = None
+        if settings.parse_timing_header:
+            headers = {"X-Parse-Timing": metrics.format_timing(timings)}
+        return FastJSONResponse(content=result, status_code=200, headers=headers)
+
+    except Overloaded as e:
+        return FastJSONResponse(
+            content={"detail": str(e), "retry_after": e.retry_after},
+            status_code=503,
+            headers={"Retry-After": str(e.retry_after)}
+        )
     
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             content={
                 "error": str(e),
                 "type": type(e).__name__
             },
             status_code=500
         )
-    
-    finally:
-        # Always cleanup temp file
-        if tmp_path and os.path.exists(tmp_path):
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
+
+async def _read_upload(file: UploadFile) -> Upload:
+    """Chunked, size-capped read; HTTP 413/415 on rejection"""
+    try:
+        with metrics.timed("upload_read"):
+            upload = await read_upload(
+                file, settings.max_upload_bytes, settings.upload_chunk_bytes
+            )
+        metrics.BYTES_PROCESSED.inc(len(upload.content))
+        return upload
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedUpload as e:
+        raise HTTPException(status_code=415, detail=str(e))
+
+async def _parse_upload(upload: Upload, mode: str = FULL_MODE, micro_batch: bool = False) -> dict:
+    """Run the full parser on one in-memory upload without blocking the loop"""
+    return await parser.parse_bytes_async(
+        upload.content, upload.filename, extract_executor=pools,
+        mode=mode, content_hash=upload.sha256, micro_batch=micro_batch
+    )
 
 @app.post("/batch-parse")
-async def batch_parse(files: list[UploadFile] = File(...)):
-    """Parse multiple resumes at once"""
+async def batch_parse(request: Request, files: list[UploadFile] = File(...), mode: str = FULL_MODE):
+    """Parse multiple resumes at once.
+
+    Files are parsed concurrently (at most BATCH_CONCURRENCY at a time) and
+    returned in upload order, each with its own elapsed time.
+    """
     
+    _check_mode(mode)
     if not parser:
         raise HTTPException(
             status_code=500,
             detail="Parser not initialized"
         )
     
-    results = []
+    semaphore = asyncio.Semaphore(settings.batch_concurrency)
+    batch_started = time.perf_counter()
+
+    # gather preserves input order regardless of completion order
+    client = client_id(request.scope, trusted_proxies)
+    results = await asyncio.gather(
+        *(_parse_batch_entry(i, f, mode, semaphore, client) for i, f in enumerate(files))
+    )
     
-    for file in files:
+    return _batch_summary(results, batch_started) | {"resumes": results}
+
+async def _parse_batch_entry(
+    index: int,
+    file: UploadFile,
+    mode: str,
+    semaphore: asyncio.Semaphore,
+    client: str
+) -> dict:
+    """Parse one batch file under the shared concurrency limit"""
+    async with semaphore:
+        started = time.perf_counter()
         try:
-            # Create temp file
-            with tempfile.NamedTemporaryFile(
-                delete=False,
-                suffix=os.path.splitext(file.filename)[1]
-            ) as tmp:
-                content = await file.read()
-                tmp.write(content)
-                tmp_path = tmp.name
-            
-            # Parse
-            result = parser.parse(tmp_path)
-            results.append({
+            upload = await _read_upload(file)
+            # The batch was admitted as a whole: its files wait their turn
+            # with other clients' requests but are not timed out
+            slot = admission.slot(client, deadline=False) if admission else nullcontext()
+            async with slot:
+                result = await _parse_upload(upload, mode, micro_batch=True)
+            entry = {
+                "index": index,
                 "filename": file.filename,
                 "status": "success" if "error" not in result else "error",
                 "data": result
-            })
-            
-            # Cleanup
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-        
+            }
         except Exception as e:
-            results.append({
+            entry = {
+                "index": index,
                 "filename": file.filename,
                 "status": "error",
-                "error": str(e)
-            })
-    
+                "error": e.detail if isinstance(e, HTTPException) else str(e)
+            }
+        entry["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return entry
+
+def _batch_summary(results: list, batch_started: float) -> dict:
     return {
         "total": len(results),
         "successful": sum(1 for r in results if r["status"] == "success"),
         "failed": sum(1 for r in results if r["status"] == "error"),
-        "resumes": results
+        "elapsed_ms": round((time.perf_counter() - batch_started) * 1000, 1),
+    }
+
+@app.post("/batch-parse/stream")
+async def batch_parse_stream(
+    request: Request,
+    files: list[UploadFile] = File(...),
+    mode: str = FULL_MODE,
+    format: str = "ndjson"
+):
+    """Parse multiple resumes, streaming each result as soon as it is done.
+
+    Results arrive in completion order, each carrying its upload `index`,
+    followed by one summary record. `format=ndjson` (default) sends one
+    JSON object per line; `format=sse` sends Server-Sent Events.
+    """
+    _check_mode(mode)
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+    if not parser:
+        raise HTTPException(
+            status_code=500,
+            detail="Parser not initialized"
+        )
+
+    semaphore = asyncio.Semaphore(settings.batch_concurrency)
+    batch_started = time.perf_counter()
+    client = client_id(request.scope, trusted_proxies)
+    tasks = [
+        asyncio.create_task(_parse_batch_entry(i, f, mode, semaphore, client))
+        for i, f in enumerate(files)
+    ]
+
+    def encode(kind: str, record: dict) -> str:
+        record = {"type": kind, **record}
+        if format == "sse":
+            return f"event: {kind}\ndata: {decoding.dumps(record)}\n\n"
+        return decoding.dumps(record) + "\n"
+
+    async def stream():
+        done = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                entry = await next_done
+                done.append(entry)
+                yield encode("result", entry)
+            yield encode("summary", _batch_summary(done, batch_started))
+        finally:
+            # Client went away: don't keep paying for the rest of the batch
+            for task in tasks:
+                task.cancel()
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(stream(), media_type=media_type)
+
+@app.post("/jobs", status_code=202)
+async def create_job(files: list[UploadFile] = File(...), mode: str = FULL_MODE):
+    """Queue one or many resumes for background parsing.
+
+    Returns a job ID immediately; poll `GET /jobs/{job_id}` for results.
+    """
+    _check_mode(mode)
+    if not parser:
+        raise HTTPException(
+            status_code=500,
+            detail="Parser not initialized"
+        )
+
+    if settings.jobs_max_pending > 0:
+        excess = await pools.run_io(jobs_queue.pending) + len(files) - settings.jobs_max_pending
+        if excess > 0:
+            retry_after = admission.retry_after(excess) if admission else 60
+            raise HTTPException(
+                status_code=503,
+                detail=f"Job backlog full, retry after {retry_after}s",
+                headers={"Retry-After": str(retry_after)}
+            )
+
+    uploads = []
+    for file in files:
+        upload = await _read_upload(file)
+        uploads.append((upload.filename, upload.content))
+    job_id = await pools.run_io(jobs_queue.submit, uploads, mode)
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "total": len(uploads),
+        "status_url": f"/jobs/{job_id}"
     }
 
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Job status plus per-file results in upload order"""
+    job = await pools.run_io(jobs_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def _store() -> ResumeStore:
+    if not parser or parser.store is None:
+        raise HTTPException(status_code=503, detail="Resume store disabled")
+    return parser.store
+
+@app.get("/search")
+def search_resumes(
+    skill: List[str] = Query([]),
+    title: List[str] = Query([]),
+    company: List[str] = Query([]),
+    institution: List[str] = Query([]),
+    certification: List[str] = Query([]),
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = Query(0, ge=0)
+):
+    """Boolean search over stored resumes; no LLM calls.
+
+    Repeat a parameter to require several terms (`skill=python&skill=aws`),
+    use `a|b` for either term and a leading `-` to exclude one.
+    """
+    clauses = {
+        "skill": skill,
+        "title": title,
+        "company": company,
+        "institution": institution,
+        "certification": certification,
+    }
+    try:
+        return _store().search({k: v for k, v in clauses.items() if v}, limit, offset)
+    except SearchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/resumes/{content_hash}")
+def get_resume(content_hash: str):
+    """Stored result for an upload, by the SHA-256 of its bytes"""
+    resume = _store().get(content_hash.lower())
+    if resume is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return resume
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,98 @@
+"""
+Micro-batching of short LLM prompts.
+
+Bulk imports are mostly one-page resumes, each far under the prompt
+budget but each paying a full request and a full copy of the schema.
+`MicroBatcher` collects items submitted within a short window and hands
+them to a batch function together, up to an item and token cap. The
+parser packs such a batch into one completion (delimited inputs, JSON
+array out) and falls back to individual calls when the answer does not
+split cleanly.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+from src import metrics
+
+MICRO_BATCHES = metrics.REGISTRY.counter(
+    "resume_llm_micro_batches_total",
+    "Micro-batches sent, by outcome (batched, fallback, single)",
+    ["outcome"],
+)
+MICRO_BATCH_SIZE = metrics.REGISTRY.histogram(
+    "resume_llm_micro_batch_size",
+    "Resumes per micro-batch",
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16),
+)
+
+# Receives every item of a batch, returns one result per item in order
+BatchFunction = Callable[[List[Any]], Awaitable[List[Any]]]
+
+
+class MicroBatcher:
+    """Collect items for up to `window` seconds, then run them as one batch.
+
+    A batch is sent early once it holds `max_items` items or `max_tokens`
+    estimated prompt tokens.
+    """
+
+    def __init__(
+        self,
+        run_batch: BatchFunction,
+        max_items: int = 4,
+        max_tokens: int = 3000,
+        window: float = 0.05,
+    ):
+        self.run_batch = run_batch
+        self.max_items = max(1, max_items)
+        self.max_tokens = max_tokens
+        self.window = window
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._pending_tokens = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Batches in progress; the loop itself only keeps weak references
+        self._running: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any, tokens: int) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._pending and self._pending_tokens + tokens > self.max_tokens:
+            self._flush()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        self._pending_tokens += tokens
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_tokens = self._pending, [], 0
+        if batch:
+            # Runs on its own, so a cancelled submitter does not sink the batch
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def aclose(self):
+        """Send what is still collecting and wait for every batch in progress"""
+        self._flush()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        MICRO_BATCH_SIZE.observe(len(batch))
+        try:
+            results = await self.run_batch([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,144 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from src import decoding
+
+
+class ResultCache:
+    """Content-addressed cache for parse results.
+
+    Two tiers: an in-memory LRU (bounded by entry count and TTL) and an
+    optional SQLite file that survives restarts. Keys are SHA-256 digests of
+    the uploaded bytes combined with the prompt and model version, so a prompt
+    or model change never serves stale structure.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 86400,
+        sqlite_path: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.sqlite_path = sqlite_path
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if sqlite_path:
+            self._open_db(sqlite_path)
+
+    @staticmethod
+    def make_key(
+        content: bytes,
+        prompt_version: str,
+        model: str,
+        digest: Optional[str] = None,
+    ) -> str:
+        """Build a cache key from the raw upload plus prompt/model version.
+
+        Pass `digest` when the SHA-256 was already computed while reading.
+        """
+        digest = digest or hashlib.sha256(content).hexdigest()
+        return f"{digest}:{prompt_version}:{model}"
+
+    def _open_db(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    @property
+    def persistent(self) -> bool:
+        """True when lookups may touch the SQLite file"""
+        return self._db is not None
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a cached result, promoting disk hits into memory"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    raw, created_at = row
+                    if not self._expired(created_at, now):
+                        value = decoding.loads(raw)
+                        self._put_memory(key, value, created_at)
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return value
+                    self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Dict):
+        """Store a result in every configured tier"""
+        now = time.time()
+        with self._lock:
+            self._put_memory(key, value, now)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, decoding.dumps(value), now),
+                )
+                self._db.commit()
+
+    def _put_memory(self, key: str, value: Dict, created_at: float):
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and tier sizes"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "sqlite_path": self.sqlite_path,
+            }
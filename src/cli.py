@@ -0,0 +1,258 @@
+"""
+Command-line bulk ingestion, without the HTTP layer.
+
+    python -m src.cli ingest resumes/ --out results.jsonl
+    python -m src.cli ingest "archive/**/*.pdf" --out results.jsonl --concurrency 64
+
+Files stream through a bounded pipeline: a walker feeds a queue, workers
+read and hash each file, extraction runs in a process pool and the LLM
+stage runs as many calls at once as `--concurrency` allows (the LLM
+scheduler still enforces quotas). Each successful result is appended to
+the JSONL output as it lands and its SHA-256 and mode to a checkpoint
+file, so a killed run picks up where it stopped and never parses the same
+content twice. A file done with `--mode rules` is still sent to the LLM
+by a later full run. Failures go to `<out>.errors.jsonl` and are retried
+on the next run.
+"""
+
+import argparse
+import asyncio
+import glob
+import hashlib
+import os
+import sys
+import time
+from typing import Dict, Iterator, Optional, Set
+
+from src import decoding
+
+EXTENSIONS = (".pdf", ".docx")
+# Bytes of output re-read at start-up to catch lines written just before
+# a crash but missing from the checkpoint
+TAIL_BYTES = 256 * 1024
+
+# Same values as src.parser's, which is too heavy to import here. Entries
+# from before modes were recorded count as full parses
+FULL_MODE = "full"
+RULES_MODE = "rules"
+
+
+def iter_files(sources) -> Iterator[str]:
+    """PDF/DOCX paths under directories, glob patterns or plain files"""
+    for source in sources:
+        if os.path.isdir(source):
+            for root, dirs, names in os.walk(source):
+                dirs.sort()
+                for name in sorted(names):
+                    if name.lower().endswith(EXTENSIONS):
+                        yield os.path.join(root, name)
+        elif os.path.isfile(source):
+            yield source
+        else:
+            for path in sorted(glob.iglob(source, recursive=True)):
+                if os.path.isfile(path) and path.lower().endswith(EXTENSIONS):
+                    yield path
+
+
+def _read_file(path: str):
+    with open(path, "rb") as f:
+        content = f.read()
+    return content, hashlib.sha256(content).hexdigest()
+
+
+class Checkpoint:
+    """Append-only JSONL output plus the (mode, content hash) pairs already done"""
+
+    def __init__(self, out_path: str, checkpoint_path: Optional[str] = None):
+        self.out_path = out_path
+        self.checkpoint_path = checkpoint_path or f"{out_path}.checkpoint"
+        self.errors_path = f"{os.path.splitext(out_path)[0]}.errors.jsonl"
+        self.done: Set[str] = set()
+        self._load()
+        self._out = open(out_path, "a", encoding="utf-8")
+        self._checkpoint = open(self.checkpoint_path, "a", encoding="utf-8")
+        self._errors = open(self.errors_path, "a", encoding="utf-8")
+
+    def _load(self):
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                for line in f:
+                    fields = line.split()
+                    if fields:
+                        self.done.add(self._key(*fields[:2]))
+        if not os.path.exists(self.out_path):
+            return
+        with open(self.out_path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - TAIL_BYTES))
+            tail = f.read()
+            # A run killed mid-write leaves half a line; drop it
+            end = tail.rfind(b"\n") + 1
+            if end < len(tail):
+                f.truncate(size - len(tail) + end)
+            for line in tail[:end].splitlines():
+                try:
+                    entry = decoding.loads(line)
+                    self.done.add(self._key(entry["sha256"], entry.get("mode", FULL_MODE)))
+                except (ValueError, KeyError, TypeError):
+                    continue
+
+    @staticmethod
+    def _key(digest: str, mode: str = FULL_MODE) -> str:
+        return f"{mode}:{digest}"
+
+    def is_done(self, digest: str, mode: str) -> bool:
+        """Already parsed in `mode`; a full parse also covers rules mode"""
+        return self._key(digest, FULL_MODE) in self.done or self._key(digest, mode) in self.done
+
+    def write(self, entry: Dict):
+        # Output first: a crash in between is caught by the tail re-read
+        self._out.write(decoding.dumps(entry) + "\n")
+        self._out.flush()
+        self._checkpoint.write(f"{entry['sha256']} {entry['mode']}\n")
+        self._checkpoint.flush()
+        self.done.add(self._key(entry["sha256"], entry["mode"]))
+
+    def write_error(self, entry: Dict):
+        self._errors.write(decoding.dumps(entry) + "\n")
+        self._errors.flush()
+
+    def sync(self):
+        for f in (self._out, self._checkpoint, self._errors):
+            os.fsync(f.fileno())
+
+    def close(self):
+        self.sync()
+        for f in (self._out, self._checkpoint, self._errors):
+            f.close()
+
+
+class Progress:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.found = 0
+        self.parsed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes = 0
+
+    def line(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        handled = self.parsed + self.failed
+        return (
+            f"📈 {handled + self.skipped}/{self.found} files, {self.parsed} parsed, "
+            f"{self.skipped} skipped, {self.failed} failed | {handled / elapsed:.1f} files/s, "
+            f"{self.bytes / elapsed / 1e6:.2f} MB/s, {elapsed:.0f}s"
+        )
+
+
+async def ingest(args) -> Progress:
+    from src.config import settings
+    from src.parser import build_parser
+    from src.workers import WorkerPools
+
+    parser = build_parser(settings)
+    pools = WorkerPools(cpu_workers=args.extract_workers, io_workers=args.concurrency)
+    checkpoint = Checkpoint(args.out, args.checkpoint)
+    progress = Progress()
+    print(f"📂 Ingesting into {args.out} ({len(checkpoint.done)} already done)")
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=args.concurrency * 2)
+    # Hashes being parsed right now; copies of a file met meanwhile are skipped
+    claimed: Set[str] = set()
+
+    async def walk():
+        # The walk itself touches the disk; keep it off the loop
+        paths = iter_files(args.sources)
+        while True:
+            path = await asyncio.to_thread(next, paths, None)
+            if path is None:
+                break
+            progress.found += 1
+            await queue.put(path)
+        for _ in range(args.concurrency):
+            await queue.put(None)
+
+    async def work():
+        while True:
+            path = await queue.get()
+            if path is None:
+                return
+            try:
+                size = os.path.getsize(path)
+                if size > settings.max_upload_bytes:
+                    raise ValueError(f"File larger than {settings.max_upload_bytes} bytes")
+                content, digest = await pools.run_io(_read_file, path)
+            except (OSError, ValueError) as e:
+                progress.failed += 1
+                checkpoint.write_error({"path": path, "error": str(e)})
+                continue
+            if checkpoint.is_done(digest, args.mode) or digest in claimed:
+                progress.skipped += 1
+                continue
+            claimed.add(digest)
+            started = time.perf_counter()
+            try:
+                result = await parser.parse_bytes_async(
+                    content, os.path.basename(path), pools, args.mode, digest,
+                    micro_batch=True
+                )
+            finally:
+                claimed.discard(digest)
+            progress.bytes += size
+            entry = {"path": path, "sha256": digest, "mode": args.mode}
+            # LLM failures that fell back to rules are retried next run
+            if "error" in result or "llm_error" in result:
+                progress.failed += 1
+                checkpoint.write_error({**entry, "error": result.get("error") or result.get("llm_error")})
+            else:
+                progress.parsed += 1
+                entry["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                entry["data"] = result
+                checkpoint.write(entry)
+
+    async def report():
+        while True:
+            await asyncio.sleep(args.progress_every)
+            checkpoint.sync()
+            print(progress.line(), flush=True)
+
+    reporter = asyncio.create_task(report())
+    try:
+        await asyncio.gather(walk(), *(work() for _ in range(args.concurrency)))
+    finally:
+        reporter.cancel()
+        checkpoint.close()
+        await parser.aclose()
+        pools.shutdown()
+    print(progress.line())
+    if progress.failed:
+        print(f"⚠️ {progress.failed} failures logged to {checkpoint.errors_path}; rerun to retry them")
+    return progress
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m src.cli", description="Resume parser tools")
+    commands = ap.add_subparsers(dest="command", required=True)
+
+    cmd = commands.add_parser("ingest", help="Parse local PDF/DOCX files into a JSONL file")
+    cmd.add_argument("sources", nargs="+", help="Directories, files or glob patterns (quote globs)")
+    cmd.add_argument("--out", required=True, help="JSONL output, appended to across runs")
+    cmd.add_argument("--checkpoint", help="Done hash + mode file (default <out>.checkpoint)")
+    cmd.add_argument("--mode", choices=[FULL_MODE, RULES_MODE], default=FULL_MODE)
+    cmd.add_argument("--concurrency", type=int, default=32, help="Files in flight at once")
+    cmd.add_argument("--extract-workers", type=int, default=os.cpu_count() or 2,
+                     help="Extraction processes (0 = threads)")
+    cmd.add_argument("--progress-every", type=float, default=5.0, help="Seconds between progress lines")
+    args = ap.parse_args(argv)
+
+    try:
+        progress = asyncio.run(ingest(args))
+    except KeyboardInterrupt:
+        print("\n⏹️ Interrupted; rerun the same command to resume")
+        return 130
+    return 1 if progress.failed and not progress.parsed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""Prompt compaction and section-aware token budgeting.
+
+Replaces the old hard `resume_text[:5000]` cut: whitespace is normalised,
+page headers/footers repeated on every page are dropped, and the token
+budget is shared between sections so a long experience history can no
+longer push education and certifications out of the prompt. Long resumes
+can also be planned as several section chunks parsed in parallel.
+"""
+
+import math
+import re
+from typing import Dict, List, Tuple
+
+# Rough English average for the tokenizers we call
+CHARS_PER_TOKEN = 4
+
+# Relative share of the budget when sections have to be trimmed
+SECTION_WEIGHTS = {
+    "header": 1.0,
+    "summary": 1.0,
+    "experience": 3.0,
+    "education": 2.0,
+    "skills": 1.5,
+    "certifications": 1.0,
+}
+OTHER_WEIGHT = 0.5
+
+# Fields parsed in their own chunk when the resume is split
+CHUNKED_FIELDS = ("experience", "education")
+
+# "Page 2", "2 of 3", "2/3" - but not a bare year on its own line
+PAGE_NUMBER_RE = re.compile(r"^(?:page\s*\d+|\d{1,3})\s*(?:(?:of|/)\s*\d+)?$", re.IGNORECASE)
+INLINE_SPACE_RE = re.compile(r"[ \t\u00a0\u2000-\u200b]+")
+BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def normalize(text: str, repeat_threshold: int = 3) -> str:
+    """Collapse whitespace and drop page numbers and repeated header/footer lines.
+
+    A short line seen `repeat_threshold` or more times is treated as page
+    furniture; its first occurrence is kept.
+    """
+    lines = [INLINE_SPACE_RE.sub(" ", line).strip() for line in text.splitlines()]
+
+    counts: Dict[str, int] = {}
+    for line in lines:
+        if line and len(line) <= 80:
+            counts[line] = counts.get(line, 0) + 1
+
+    kept = []
+    seen = set()
+    for line in lines:
+        if line and PAGE_NUMBER_RE.match(line):
+            continue
+        if counts.get(line, 0) >= repeat_threshold:
+            if line in seen:
+                continue
+            seen.add(line)
+        kept.append(line)
+    return BLANK_LINES_RE.sub("\n\n", "\n".join(kept)).strip()
+
+
+def section_base(name: str) -> str:
+    """"skills_4" -> "skills" (repeated headings get a numeric suffix)"""
+    base, _, suffix = name.rpartition("_")
+    return base if base and suffix.isdigit() else name
+
+
+def _weight(name: str) -> float:
+    return SECTION_WEIGHTS.get(section_base(name), OTHER_WEIGHT)
+
+
+def _truncate(body: str, max_chars: int) -> str:
+    """Cut at a line boundary where possible"""
+    if len(body) <= max_chars:
+        return body
+    cut = body.rfind("\n", 0, max_chars)
+    return body[:cut if cut > max_chars // 2 else max_chars].rstrip()
+
+
+def allocate(sections: Dict[str, str], token_budget: int) -> Dict[str, int]:
+    """Weighted water-filling: small sections keep everything, the rest
+    share what is left in proportion to their weight."""
+    sizes = {name: estimate_tokens(body) for name, body in sections.items() if body}
+    if sum(sizes.values()) <= token_budget:
+        return sizes
+
+    allocation = {}
+    remaining = token_budget
+    pending = sorted(sizes, key=lambda name: sizes[name] / _weight(name))
+    total_weight = sum(_weight(name) for name in pending)
+    for name in pending:
+        share = remaining * _weight(name) / total_weight
+        allocation[name] = int(min(sizes[name], share))
+        remaining -= allocation[name]
+        total_weight -= _weight(name)
+    return allocation
+
+
+def render(sections: Dict[str, str]) -> str:
+    parts = []
+    for name, body in sections.items():
+        if not body:
+            continue
+        parts.append(body if name == "header" else f"{section_base(name).upper()}\n{body}")
+    return "\n\n".join(parts)
+
+
+def fit_to_budget(sections: Dict[str, str], token_budget: int) -> str:
+    """Render sections as prompt text within `token_budget` tokens"""
+    allocation = allocate(sections, token_budget)
+    trimmed = {
+        name: _truncate(body, allocation.get(name, 0) * CHARS_PER_TOKEN)
+        for name, body in sections.items()
+    }
+    return render(trimmed)
+
+
+def plan_chunks(
+    sections: Dict[str, str],
+    fields: List[str],
+    token_budget: int,
+    max_chunks: int = 1
+) -> List[Tuple[List[str], str]]:
+    """Split the LLM work into (fields, prompt text) chunks.
+
+    Experience and education get their own chunk when they have a section
+    and the whole resume would not fit one budget; everything else shares
+    a general chunk. Chunks are packed back together while they fit.
+    """
+    total = sum(estimate_tokens(body) for body in sections.values())
+    if max_chunks <= 1 or total <= token_budget:
+        return [(fields, fit_to_budget(sections, token_budget))]
+
+    groups: List[Tuple[List[str], Dict[str, str]]] = []
+    general = dict(sections)
+    for field in CHUNKED_FIELDS:
+        if field not in fields:
+            continue
+        own = {name: body for name, body in sections.items() if section_base(name) == field}
+        if own:
+            groups.append(([field], own))
+            for name in own:
+                general.pop(name)
+    general_fields = [f for f in fields if not any(f in g for g, _ in groups)]
+    if general_fields:
+        groups.insert(0, (general_fields, general))
+
+    # Pack neighbouring groups while they fit, then cap the chunk count
+    packed: List[Tuple[List[str], Dict[str, str]]] = []
+    for group_fields, group_sections in groups:
+        if packed:
+            last_fields, last_sections = packed[-1]
+            size = sum(estimate_tokens(b) for b in {**last_sections, **group_sections}.values())
+            if size <= token_budget or len(packed) >= max_chunks:
+                packed[-1] = (last_fields + group_fields, {**last_sections, **group_sections})
+                continue
+        packed.append((group_fields, group_sections))
+
+    return [(f, fit_to_budget(s, token_budget)) for f, s in packed]
+
+
+def merge_chunk_results(results: List[Dict]) -> Dict:
+    """Combine per-chunk LLM answers; failures are reported, not fatal"""
+    merged: Dict = {}
+    errors = [r for r in results if "error" in r]
+    if len(errors) == len(results):
+        return errors[0]
+    for result in results:
+        if "error" in result:
+            continue
+        for key, value in result.items():
+            if value and not merged.get(key):
+                merged[key] = value
+    if errors:
+        merged["partial"] = True
+        merged["llm_error"] = errors[0]["error"]
+    return merged
@@ -1,16 +1,156 @@
+from pydantic import ValidationError
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import List, Optional
 import os
 
 class Settings(BaseSettings):
-    perplexity_api_key: str
+    # Optional so a missing key is reported at startup, not at import
+    perplexity_api_key: Optional[str] = None
     openai_api_key: Optional[str] = None
     environment: str = "development"
 
+    # Result cache (content-addressed, see src/cache.py)
+    cache_enabled: bool = True
+    cache_max_entries: int = 1024
+    cache_ttl_seconds: int = 7 * 24 * 3600
+    cache_sqlite_path: Optional[str] = None
+
+    # Pooled LLM HTTP client (see src/llm_client.py); point the endpoint at
+    # benchmarks/mock_llm.py for offline runs
+    llm_endpoint: str = "https://api.perplexity.ai/chat/completions"
+    llm_http2: bool = True
+    llm_max_connections: int = 20
+    llm_max_keepalive_connections: int = 10
+    llm_keepalive_expiry: float = 60.0
+    llm_connect_timeout: float = 5.0
+    llm_read_timeout: float = 30.0
+    llm_write_timeout: float = 10.0
+    llm_pool_timeout: float = 10.0
+
+    # LLM scheduler (see src/scheduler.py); 0 disables a rate limit
+    llm_requests_per_second: float = 0.0
+    llm_burst: int = 5
+    llm_tokens_per_minute: int = 0
+    llm_initial_concurrency: int = 8
+    llm_min_concurrency: int = 1
+    llm_max_concurrency: int = 20
+    llm_max_attempts: int = 4
+    llm_backoff_base: float = 0.5
+    llm_backoff_max: float = 30.0
+    llm_breaker_threshold: int = 5
+    llm_breaker_reset_seconds: float = 30.0
+
+    # Backends and routing (see src/providers.py): fallback, cheapest or
+    # hedged; OPENAI_ENDPOINT may point at a local OpenAI-compatible server
+    llm_backends: str = "perplexity,openai"
+    llm_strategy: str = "fallback"
+    llm_hedge_quantile: float = 0.9
+    llm_hedge_delay: float = 8.0
+    perplexity_model: str = "sonar-pro"
+    perplexity_cost_per_1k_tokens: float = 0.003
+    openai_endpoint: str = "https://api.openai.com/v1/chat/completions"
+    openai_model: str = "gpt-4o-mini"
+    openai_cost_per_1k_tokens: float = 0.00015
+    openai_json_mode: bool = True
+
+    # Worker pools (see src/workers.py); 0 process workers = extract in threads
+    extract_process_workers: int = 2
+    io_thread_workers: int = 16
+
+    # Rule-based pre-extraction (see src/rules.py)
+    rules_pre_extract: bool = True
+    rules_fallback: bool = True
+
+    # Prompt tokens per LLM call, and section chunks per long resume
+    llm_token_budget: int = 1250
+    llm_max_chunks: int = 1
+
+    # Micro-batching of short resumes from /batch-parse and jobs
+    # (see src/batching.py); size 1 = off
+    micro_batch_size: int = 1
+    micro_batch_tokens: int = 3000
+    micro_batch_window_ms: float = 50.0
+
+    # Background jobs (see src/jobs.py); 0 workers = run `python -m src.jobs`
+    jobs_db_path: str = os.path.join(os.path.dirname(os.path.dirname(__file__)), "jobs.db")
+    jobs_workers: int = 4
+    jobs_max_attempts: int = 3
+    jobs_retry_backoff: float = 5.0
+    jobs_lease_seconds: float = 600.0
+    # Unfinished job items accepted before POST /jobs answers 503 (0 = no cap)
+    jobs_max_pending: int = 10000
+
+    # Admission control for /parse, /batch-parse and job workers
+    # (see src/admission.py); 0 in-flight = off
+    admission_max_in_flight: int = 16
+    admission_max_queue: int = 64
+    admission_max_queue_per_client: int = 16
+    admission_queue_timeout: float = 15.0
+    # Comma-separated proxy addresses/CIDRs whose X-Client-ID and
+    # X-Forwarded-For are believed; empty = key clients on the peer address
+    admission_trusted_proxies: str = ""
+
+    # Searchable store of parsed resumes behind /search (see src/store.py)
+    store_enabled: bool = True
+    store_db_path: str = os.path.join(os.path.dirname(os.path.dirname(__file__)), "resumes.db")
+
+    # Upload limits (see src/uploads.py)
+    max_upload_bytes: int = 10 * 1024 * 1024
+    max_request_bytes: int = 50 * 1024 * 1024
+    upload_chunk_bytes: int = 64 * 1024
+
+    # Max files from one /batch-parse request processed at the same time
+    batch_concurrency: int = 8
+
+    # Per-stage timing: add an X-Parse-Timing header to /parse responses
+    parse_timing_header: bool = False
+
+    # Open LLM connections and start extraction processes at startup, so
+    # the first request after a cold start does not pay for them
+    warm_up: bool = False
+
     model_config = SettingsConfigDict(
         env_file=os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env"),
         env_file_encoding="utf-8",
         extra="ignore",
     )
 
-settings = Settings()
+
+_settings: Optional[Settings] = None
+# Validation errors from the environment, reported by /health
+load_errors: List[str] = []
+
+
+def get_settings() -> Settings:
+    """Settings from the environment and .env, read on first use.
+
+    Never raises: an invalid value is reported and its default used
+    instead, so a bad variable shows up in /health rather than as an
+    import crash.
+    """
+    global _settings
+    if _settings is None:
+        try:
+            _settings = Settings()
+        except ValidationError as e:
+            load_errors[:] = [
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+            ]
+            print(f"⚠️ Invalid settings, using defaults for them: {'; '.join(load_errors)}")
+            # Init arguments take precedence over the environment
+            defaults = {
+                err["loc"][0]: Settings.model_fields[err["loc"][0]].default
+                for err in e.errors() if err["loc"] and err["loc"][0] in Settings.model_fields
+            }
+            try:
+                _settings = Settings(**defaults)
+            except ValidationError:
+                _settings = Settings.model_construct()
+    return _settings
+
+
+def __getattr__(name: str):
+    # `from src.config import settings` loads settings lazily
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,113 @@
+"""
+Fast JSON decoding of LLM completions.
+
+`extract_json` first tries the span from the first bracket to the last
+one, then falls back to finding the first balanced JSON value in one
+linear pass over the structural characters. Markdown fences, a chatty
+preamble or trailing remarks around the JSON are skipped without
+rebuilding the string. Completions cut off by `max_tokens` are repaired
+by dropping the unfinished trailing element and closing the open
+brackets, so an answer that *almost* parsed still yields everything it
+did contain.
+
+orjson is used when installed, the stdlib `json` otherwise.
+"""
+
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+CLOSERS = {"{": "}", "[": "]"}
+# The only characters that change the scanner's state
+TOKEN_RE = re.compile(r'[{}\[\],"\\]')
+
+
+def loads(data) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value)
+
+
+def _decodes(text: str) -> Tuple[bool, Any]:
+    try:
+        return True, loads(text)
+    except ValueError:  # orjson.JSONDecodeError and json.JSONDecodeError both subclass it
+        return False, None
+
+
+def extract_json(content: str, expect: Optional[str] = None) -> Tuple[Any, bool]:
+    """Decode the first balanced JSON value found in `content`.
+
+    `expect` is "{" or "[" to only accept an object or an array at the top
+    level. Returns (value, repaired); raises ValueError when nothing decodes.
+    """
+    openers = (expect,) if expect else tuple(CLOSERS)
+
+    # Fast path, all in C: from the first opener to the last matching
+    # closer covers plain, fenced and most prose-wrapped answers
+    starts = [p for p in (content.find(o) for o in openers) if p >= 0]
+    if starts:
+        first = min(starts)
+        last = content.rfind(CLOSERS[content[first]])
+        if last > first:
+            ok, value = _decodes(content[first:last + 1])
+            if ok:
+                return value, False
+
+    stack: List[str] = []
+    start = -1
+    in_string = False
+    escaped_at = -1
+    # Last comma outside a string inside the candidate, with the brackets
+    # open at that point - where a truncated answer can be cut and closed
+    cut: Optional[Tuple[int, List[str]]] = None
+
+    for match in TOKEN_RE.finditer(content):
+        ch = match.group()
+        i = match.start()
+        if start < 0:
+            if ch in openers:
+                start, stack, cut = i, [ch], None
+        elif in_string:
+            if i == escaped_at:
+                continue
+            if ch == "\\":
+                escaped_at = i + 1
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in CLOSERS:
+            stack.append(ch)
+        elif ch in "}]":
+            if CLOSERS[stack[-1]] != ch:
+                # Not JSON after all; look for the next candidate after it
+                start = -1
+                continue
+            stack.pop()
+            if not stack:
+                ok, value = _decodes(content[start:i + 1])
+                if ok:
+                    return value, False
+                start = -1
+        elif ch == ",":
+            cut = (i, list(stack))
+
+    if start >= 0 and cut is not None:
+        index, open_brackets = cut
+        repaired = content[start:index] + "".join(CLOSERS[b] for b in reversed(open_brackets))
+        ok, value = _decodes(repaired)
+        if ok:
+            return value, True
+    raise ValueError("No JSON value found in completion")
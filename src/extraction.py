@@ -0,0 +1,284 @@
+"""Text extraction for resume files.
+
+Plain module-level functions so they can be shipped to a process pool;
+ResumeParser delegates to these. The format is decided by magic bytes,
+not by the filename, and uploads are read straight from memory.
+pdfplumber (and pdfminer under it) is imported on the first PDF, so
+importing this module stays cheap.
+"""
+
+from io import BytesIO
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+from xml.etree import ElementTree
+import os
+import re
+import time
+import zipfile
+
+PDF = "pdf"
+DOCX = "docx"
+TEXT = "text"
+
+DOCX_BODY = "word/document.xml"
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_P, W_T, W_TAB, W_BR, W_CR = _W + "p", _W + "t", _W + "tab", _W + "br", _W + "cr"
+W_TR, W_TC = _W + "tr", _W + "tc"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+# How many leading bytes to sniff (PDF headers may follow a little junk)
+SNIFF_BYTES = 1024
+
+# Markup and data files decode as text but are not resumes
+NOT_RESUME_PREFIXES = (b"<", b"{", b"[")
+# Control characters allowed in plain text: tab, newline, form feed, CR
+TEXT_CONTROLS = {9, 10, 12, 13}
+
+
+def looks_like_text(head: bytes) -> bool:
+    """Plain-text resume: valid UTF-8, no stray control bytes, not markup/JSON"""
+    head = head.removeprefix(b"\xef\xbb\xbf")
+    try:
+        text = head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # The sniffed window may end inside a multi-byte character
+        if e.reason != "unexpected end of data":
+            return False
+        text = head[:e.start].decode("utf-8")
+    stripped = text.lstrip()
+    if not stripped or stripped.encode("utf-8").startswith(NOT_RESUME_PREFIXES):
+        return False
+    return not any(ord(ch) < 32 and ord(ch) not in TEXT_CONTROLS or ord(ch) == 127 for ch in text)
+
+
+def detect_format(head: bytes, filename: Optional[str] = None) -> str:
+    """Classify an upload as PDF, DOCX or plain text from its first bytes"""
+    if b"%PDF-" in head[:SNIFF_BYTES]:
+        return PDF
+    if head.startswith(b"PK\x03\x04"):
+        return DOCX
+    if head.startswith(b"\xd0\xcf\x11\xe0"):
+        raise ValueError("Legacy .doc files are not supported, save as DOCX or PDF")
+    if looks_like_text(head[:SNIFF_BYTES]):
+        return TEXT
+
+    # Binary we don't recognise: fall back to the extension if there is one
+    name = (filename or "").lower()
+    if name.endswith(".pdf"):
+        return PDF
+    if name.endswith(".docx"):
+        return DOCX
+    raise ValueError(f"Unsupported file format: {filename or 'upload'}")
+
+
+def extract_text(file_path: str, char_budget: Optional[int] = None) -> str:
+    """Extract text from a file on disk"""
+    with open(file_path, "rb") as f:
+        return extract_text_from_stream(f, os.path.basename(file_path), char_budget)
+
+
+def extract_text_from_bytes(
+    content: bytes,
+    filename: Optional[str] = None,
+    char_budget: Optional[int] = None
+) -> str:
+    """Extract text from an in-memory upload"""
+    return extract_text_from_stream(BytesIO(content), filename, char_budget)
+
+
+def extract_text_with_stats(
+    content: bytes,
+    filename: Optional[str] = None,
+    char_budget: Optional[int] = None
+) -> Tuple[str, Dict]:
+    """`extract_text_from_bytes` plus timings for the metrics layer.
+
+    This runs in worker processes, so it returns its measurements rather
+    than recording them.
+    """
+    started = time.perf_counter()
+    stream = BytesIO(content)
+    kind = detect_format(content[:SNIFF_BYTES], filename)
+    page_seconds: List[float] = []
+    if kind == PDF:
+        text = "".join(
+            page + "\n" for page in iter_pdf_pages(stream, char_budget, page_seconds)
+        )
+    else:
+        text = extract_text_from_stream(stream, filename, char_budget)
+    return text, {
+        "format": kind,
+        "seconds": time.perf_counter() - started,
+        "page_seconds": page_seconds,
+    }
+
+
+def extract_text_from_stream(
+    stream: BinaryIO,
+    filename: Optional[str] = None,
+    char_budget: Optional[int] = None
+) -> str:
+    """Extract text from a seekable binary stream.
+
+    `char_budget` lets extraction stop early once enough text exists for
+    the LLM prompt; `None` extracts everything.
+    """
+    head = stream.read(SNIFF_BYTES)
+    stream.seek(0)
+    kind = detect_format(head, filename)
+
+    if kind == PDF:
+        return extract_from_pdf(stream, char_budget)
+    if kind == DOCX:
+        if not zipfile.is_zipfile(stream):
+            raise ValueError("Corrupt DOCX archive")
+        stream.seek(0)
+        return extract_from_docx(stream, char_budget)
+    return _decode_text(stream.read())
+
+
+def warm_up() -> int:
+    """Import the PDF stack ahead of the first upload; returns the pid"""
+    import pdfplumber  # noqa: F401
+
+    return os.getpid()
+
+
+def iter_pdf_pages(
+    source: Union[str, BinaryIO],
+    char_budget: Optional[int] = None,
+    page_seconds: Optional[List[float]] = None
+) -> Iterator[str]:
+    """Yield page text lazily, stopping once `char_budget` characters are out.
+
+    Each page's cached layout objects are released as soon as its text has
+    been pulled, so peak memory tracks one page rather than the document.
+    Per-page extraction times are appended to `page_seconds` when given.
+    """
+    import pdfplumber
+
+    produced = 0
+    with pdfplumber.open(source) as pdf:
+        for page in pdf.pages:
+            started = time.perf_counter()
+            try:
+                extracted = page.extract_text()
+            finally:
+                page.close()
+            if page_seconds is not None:
+                page_seconds.append(time.perf_counter() - started)
+            if extracted:
+                yield extracted
+                produced += len(extracted) + 1
+            if char_budget is not None and produced >= char_budget:
+                break
+
+
+def extract_from_pdf(
+    source: Union[str, BinaryIO],
+    char_budget: Optional[int] = None
+) -> str:
+    """Use pdfplumber to extract text"""
+    return "".join(page + "\n" for page in iter_pdf_pages(source, char_budget))
+
+
+def extract_from_docx(
+    source: Union[str, BinaryIO],
+    char_budget: Optional[int] = None
+) -> str:
+    """Extract from DOCX (headers, body incl. tables and text boxes, footers)"""
+    lines = []
+    produced = 0
+    for line in iter_docx_text(source):
+        lines.append(line)
+        produced += len(line) + 1
+        if char_budget is not None and produced >= char_budget:
+            break
+    return "\n".join(lines)
+
+
+def _docx_parts(names) -> list:
+    """Headers, then the body, then footers - the order a reader sees them"""
+    def numbered(prefix):
+        found = [n for n in names if re.fullmatch(rf"word/{prefix}\d*\.xml", n)]
+        return sorted(found, key=lambda n: int(re.sub(r"\D", "", n) or 0))
+
+    return numbered("header") + [DOCX_BODY] + numbered("footer")
+
+
+def iter_docx_text(source: Union[str, BinaryIO]) -> Iterator[str]:
+    """Stream text out of a DOCX without building the python-docx DOM.
+
+    Each part is read with an incremental XML parser and paragraphs are
+    cleared as soon as they are emitted. Table rows come out as one line
+    with cells separated by " | ".
+    """
+    with zipfile.ZipFile(source) as archive:
+        names = set(archive.namelist())
+        if DOCX_BODY not in names:
+            raise ValueError("Not a Word document (word/document.xml missing)")
+        for part in _docx_parts(names):
+            with archive.open(part) as stream:
+                yield from _iter_wordml_text(stream)
+
+
+def _iter_wordml_text(stream: BinaryIO) -> Iterator[str]:
+    paragraphs = []  # fragments of each open <w:p>; text boxes nest them
+    cells = []       # paragraph texts of each open <w:tc>
+    rows = []        # cell texts of each open <w:tr>
+    fallback_depth = 0
+
+    for event, elem in ElementTree.iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+
+        # Text boxes are stored twice (DrawingML + VML fallback); keep one
+        if tag == MC_FALLBACK:
+            fallback_depth += 1 if event == "start" else -1
+            if event == "end":
+                elem.clear()
+            continue
+        if fallback_depth:
+            continue
+
+        if event == "start":
+            if tag == W_P:
+                paragraphs.append([])
+            elif tag == W_TC:
+                cells.append([])
+            elif tag == W_TR:
+                rows.append([])
+            continue
+
+        if tag == W_T:
+            if paragraphs and elem.text:
+                paragraphs[-1].append(elem.text)
+        elif tag == W_TAB:
+            if paragraphs:
+                paragraphs[-1].append("\t")
+        elif tag in (W_BR, W_CR):
+            if paragraphs:
+                paragraphs[-1].append("\n")
+        elif tag == W_P:
+            text = "".join(paragraphs.pop())
+            if cells:
+                cells[-1].append(text)
+            elif text.strip():
+                yield text
+            elem.clear()
+        elif tag == W_TC:
+            rows[-1].append(" ".join(t for t in cells.pop() if t.strip()))
+        elif tag == W_TR:
+            line = " | ".join(c for c in rows.pop() if c)
+            if cells:
+                # Nested table: the row belongs to the enclosing cell
+                cells[-1].append(line)
+            elif line:
+                yield line
+            elem.clear()
+
+
+def _decode_text(content: bytes) -> str:
+    try:
+        return content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return content.decode("latin-1")
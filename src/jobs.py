@@ -0,0 +1,343 @@
+"""
+Durable background parse jobs.
+
+`POST /jobs` stores the uploads in a SQLite queue and returns immediately;
+workers claim items, parse them and write results back, retrying transient
+LLM failures with backoff. Workers run inside the API process
+(JOBS_WORKERS > 0) and/or standalone against the same database file:
+
+    python -m src.jobs --workers 8
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Executor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Union
+
+from src import decoding
+from src.workers import WorkerPools
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCESS = "success"
+FAILED = "error"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    mode TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    filename TEXT,
+    content BLOB,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    claimed_at REAL,
+    finished_at REAL,
+    elapsed_ms REAL,
+    result TEXT,
+    error TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS job_items_ready ON job_items (status, available_at);
+"""
+
+
+@dataclass
+class JobItem:
+    job_id: str
+    index: int
+    filename: Optional[str]
+    content: bytes
+    mode: str
+    attempts: int
+
+
+class JobQueue:
+    """SQLite-backed job queue; safe to share between threads and processes"""
+
+    def __init__(self, path: str, lease_seconds: float = 600):
+        self.path = path
+        # A claimed item not finished within the lease is handed out again
+        self.lease_seconds = lease_seconds
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def submit(self, files: List[Tuple[Optional[str], bytes]], mode: str) -> str:
+        """Enqueue one job with one item per (filename, content)"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "INSERT INTO jobs (id, mode, total, created_at) VALUES (?, ?, ?, ?)",
+                    (job_id, mode, len(files), now),
+                )
+                self._db.executemany(
+                    "INSERT INTO job_items (job_id, idx, filename, content, status, available_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(job_id, i, name, content, QUEUED, now) for i, (name, content) in enumerate(files)],
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return job_id
+
+    def claim(self, max_attempts: Optional[int] = None) -> Optional[JobItem]:
+        """Take the oldest ready item (or one whose lease expired).
+
+        An expired item that already had `max_attempts` claims is marked
+        failed instead: it most likely takes its worker down with it.
+        """
+        now = time.time()
+        expired = now - self.lease_seconds
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                if max_attempts is not None:
+                    error = f"Worker lost {max_attempts} times while parsing (lease expired)"
+                    self._db.execute(
+                        "UPDATE job_items SET status = ?, result = ?, error = ?, content = NULL, "
+                        "finished_at = ? WHERE status = ? AND claimed_at <= ? AND attempts >= ?",
+                        (FAILED, decoding.dumps({"error": error}), error, now,
+                         RUNNING, expired, max_attempts),
+                    )
+                row = self._db.execute(
+                    "SELECT i.job_id, i.idx, i.filename, i.content, j.mode, i.attempts "
+                    "FROM job_items i JOIN jobs j ON j.id = i.job_id "
+                    "WHERE (i.status = ? AND i.available_at <= ?) "
+                    "   OR (i.status = ? AND i.claimed_at <= ?) "
+                    "ORDER BY i.available_at LIMIT 1",
+                    (QUEUED, now, RUNNING, expired),
+                ).fetchone()
+                if row is None:
+                    self._db.execute("COMMIT")
+                    return None
+                self._db.execute(
+                    "UPDATE job_items SET status = ?, attempts = attempts + 1, claimed_at = ? "
+                    "WHERE job_id = ? AND idx = ?",
+                    (RUNNING, now, row[0], row[1]),
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return JobItem(row[0], row[1], row[2], row[3], row[4], row[5] + 1)
+
+    def complete(self, item: JobItem, result: Dict, elapsed_ms: float):
+        status = FAILED if "error" in result else SUCCESS
+        with self._lock:
+            # The upload is no longer needed once a final result exists
+            self._db.execute(
+                "UPDATE job_items SET status = ?, result = ?, error = ?, content = NULL, "
+                "finished_at = ?, elapsed_ms = ? WHERE job_id = ? AND idx = ?",
+                (status, decoding.dumps(result), result.get("error"), time.time(),
+                 elapsed_ms, item.job_id, item.index),
+            )
+
+    def retry(self, item: JobItem, error: str, delay: float):
+        with self._lock:
+            self._db.execute(
+                "UPDATE job_items SET status = ?, error = ?, available_at = ?, claimed_at = NULL "
+                "WHERE job_id = ? AND idx = ?",
+                (QUEUED, error, time.time() + delay, item.job_id, item.index),
+            )
+
+    def pending(self) -> int:
+        """Items not finished yet, queued or running"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM job_items WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchone()[0]
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Job status with per-file results in upload order"""
+        with self._lock:
+            job = self._db.execute(
+                "SELECT id, mode, total, created_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            rows = self._db.execute(
+                "SELECT idx, filename, status, attempts, elapsed_ms, result, error "
+                "FROM job_items WHERE job_id = ? ORDER BY idx",
+                (job_id,),
+            ).fetchall()
+
+        resumes = []
+        for idx, filename, status, attempts, elapsed_ms, result, error in rows:
+            entry = {"index": idx, "filename": filename, "status": status, "attempts": attempts}
+            if result is not None:
+                entry["data"] = decoding.loads(result)
+                entry["elapsed_ms"] = elapsed_ms
+            elif error:
+                entry["last_error"] = error
+            resumes.append(entry)
+
+        counts = {s: sum(1 for r in resumes if r["status"] == s)
+                  for s in (QUEUED, RUNNING, SUCCESS, FAILED)}
+        done = counts[SUCCESS] + counts[FAILED]
+        if done == job[2]:
+            status = "completed"
+        elif counts[RUNNING] or done:
+            status = "running"
+        else:
+            status = "queued"
+        return {
+            "job_id": job[0],
+            "status": status,
+            "mode": job[1],
+            "total": job[2],
+            "successful": counts[SUCCESS],
+            "failed": counts[FAILED],
+            "pending": counts[QUEUED] + counts[RUNNING],
+            "created_at": job[3],
+            "resumes": resumes,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def is_transient(result: Dict) -> bool:
+    """LLM/network failures worth retrying; bad files are final"""
+    error = result.get("llm_error") or result.get("error") or ""
+    return (
+        error.startswith("Exception:")
+        or error.startswith("HTTP 429")
+        or error.startswith("HTTP 5")
+    )
+
+
+class JobWorkerPool:
+    """Async workers that drain a JobQueue through a ResumeParser"""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        parser,
+        workers: int = 4,
+        max_attempts: int = 3,
+        retry_backoff: float = 5.0,
+        poll_interval: float = 0.5,
+        extract_executor: Union[WorkerPools, Executor, None] = None,
+        admission=None,
+    ):
+        self.queue = queue
+        self.parser = parser
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.poll_interval = poll_interval
+        self.extract_executor = extract_executor
+        # Optional AdmissionController: jobs take parse slots in turn with
+        # interactive clients instead of on top of them
+        self.admission = admission
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+    def start(self):
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self):
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                item = await asyncio.to_thread(self.queue.claim, self.max_attempts)
+                if item is None:
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                await self.process(item)
+            except Exception as e:
+                # A locked database must not end the worker for good; an
+                # item left running is handed out again when its lease ends
+                print(f"⚠️ Job worker error, retrying in {self.poll_interval}s: {e!r}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def process(self, item: JobItem):
+        started = time.perf_counter()
+        slot = self.admission.slot("jobs", deadline=False) if self.admission else nullcontext()
+        try:
+            async with slot:
+                result = await self.parser.parse_bytes_async(
+                    item.content, item.filename,
+                    extract_executor=self.extract_executor, mode=item.mode,
+                    micro_batch=True
+                )
+        except Exception as e:
+            result = {"error": f"Exception: {str(e)}"}
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        if is_transient(result) and item.attempts < self.max_attempts:
+            delay = self.retry_backoff * 2 ** (item.attempts - 1)
+            print(f"🔁 Job {item.job_id}[{item.index}] attempt {item.attempts} failed, retry in {delay:.0f}s")
+            await asyncio.to_thread(
+                self.queue.retry, item, result.get("llm_error") or result.get("error"), delay
+            )
+        else:
+            await asyncio.to_thread(self.queue.complete, item, result, elapsed_ms)
+
+
+async def _serve(workers: int):
+    from src.api import admission, parser, pools, jobs_queue
+    from src.config import settings
+
+    if not parser:
+        raise SystemExit("Parser not initialized. Check API_KEY in .env")
+    pool = JobWorkerPool(
+        jobs_queue, parser,
+        workers=workers,
+        max_attempts=settings.jobs_max_attempts,
+        retry_backoff=settings.jobs_retry_backoff,
+        extract_executor=pools,
+        admission=admission,
+    )
+    pool.start()
+    print(f"👷 {workers} job workers polling {jobs_queue.path}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await pool.stop()
+        await parser.aclose()
+        pools.shutdown()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run standalone resume job workers")
+    ap.add_argument("--workers", type=int, default=8)
+    args = ap.parse_args()
+    try:
+        asyncio.run(_serve(args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import asyncio
+import importlib.util
+import threading
+from typing import Dict, List, Optional
+
+import httpx
+
+from src import metrics
+
+# h2 enables HTTP/2 in httpx; only check it is installed, httpx imports
+# it when the first HTTP/2 client is built
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class LLMClient:
+    """Long-lived pooled HTTP client for chat-completion endpoints.
+
+    One keep-alive connection pool is shared by every parse, so the TLS
+    handshake is paid once per connection instead of once per resume. The
+    async client is the primary path; `complete_sync` keeps blocking callers
+    (debug_parser.py, worker threads) on an equivalent pooled session.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        endpoint: str,
+        http2: bool = True,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 60.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        write_timeout: float = 10.0,
+        pool_timeout: float = 10.0,
+    ):
+        self.api_key = api_key
+        self.endpoint = endpoint
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(
+            connect=connect_timeout,
+            read=read_timeout,
+            write=write_timeout,
+            pool=pool_timeout,
+        )
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_loop = None
+        self._sync_client: Optional[httpx.Client] = None
+        self._lock = threading.Lock()
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        # Async connections belong to the loop that opened them
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=self.limits,
+                timeout=self.timeout,
+                headers=self.headers,
+            )
+            self._async_loop = loop
+        return self._async_client
+
+    def _get_sync_client(self) -> httpx.Client:
+        with self._lock:
+            if self._sync_client is None:
+                self._sync_client = httpx.Client(
+                    http2=self.http2,
+                    limits=self.limits,
+                    timeout=self.timeout,
+                    headers=self.headers,
+                )
+            return self._sync_client
+
+    @staticmethod
+    def build_payload(
+        messages: List[Dict],
+        model: str,
+        temperature: float = 0.0,
+        max_tokens: int = 1500,
+        **extra,
+    ) -> Dict:
+        """Chat-completions body; `extra` carries provider-specific fields"""
+        return {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            **extra,
+        }
+
+    async def complete(self, messages: List[Dict], model: str, **options) -> httpx.Response:
+        """POST a chat completion on the shared async pool.
+
+        Only the HTTP exchange counts as the "llm_request" stage: scheduler
+        queueing, backoff between retries and decoding are not in it.
+        """
+        client = self._get_async_client()
+        payload = self.build_payload(messages, model, **options)
+        with metrics.timed("llm_request"):
+            return await client.post(self.endpoint, json=payload)
+
+    async def warm_up(self):
+        """Open a pooled connection (DNS, TCP, TLS) before the first call.
+
+        Any HTTP status counts: the connection stays in the pool either way.
+        """
+        client = self._get_async_client()
+        await client.head(self.endpoint)
+
+    def complete_sync(self, messages: List[Dict], model: str, **options) -> httpx.Response:
+        """Blocking equivalent of `complete` for threads and scripts"""
+        client = self._get_sync_client()
+        payload = self.build_payload(messages, model, **options)
+        with metrics.timed("llm_request"):
+            return client.post(self.endpoint, json=payload)
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_loop = None
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if self._sync_client is not None:
+                self._sync_client.close()
+                self._sync_client = None
@@ -1,20 +1,75 @@
-from pydantic import BaseModel
-from typing import List, Optional
+import re
+from pydantic import BaseModel, ValidationError, field_validator
+from typing import Any, Dict, List, Optional
+
+# "Python, SQL; AWS (EC2, S3)" or one item per line; commas inside
+# parentheses stay with their item
+LIST_SPLIT_RE = re.compile(r"[,;\n•](?![^()]*\))")
+
+
+def _to_text(value: Any) -> Optional[str]:
+    """null stays null; numbers become strings; lists are joined"""
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        value = ", ".join(str(v) for v in value if v not in (None, ""))
+    elif isinstance(value, dict):
+        value = ", ".join(str(v) for v in value.values() if v not in (None, ""))
+    value = str(value).strip()
+    return value or None
+
+
+def _to_text_list(value: Any) -> List[str]:
+    """null -> [], "a, b" -> ["a", "b"], non-strings stringified"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = LIST_SPLIT_RE.split(value)
+    elif not isinstance(value, (list, tuple)):
+        value = [value]
+    items = (_to_text(v) for v in value)
+    return [v for v in items if v]
+
+
+def _to_records(value: Any, text_field: str) -> List[dict]:
+    """null -> [], one object -> [object], bare strings -> {text_field: s}"""
+    if value is None:
+        return []
+    if not isinstance(value, (list, tuple)):
+        value = [value]
+    records = []
+    for item in value:
+        if isinstance(item, dict):
+            records.append(item)
+        elif item not in (None, ""):
+            records.append({text_field: _to_text(item)})
+    return records
+
 
 class Experience(BaseModel):
-    title: str
-    company: str
+    title: Optional[str] = None
+    company: Optional[str] = None
     duration: Optional[str] = None
     description: Optional[str] = None
 
+    @field_validator("title", "company", "duration", "description", mode="before")
+    @classmethod
+    def _text(cls, value: Any) -> Optional[str]:
+        return _to_text(value)
+
 class Education(BaseModel):
-    degree: str
-    institution: str
+    degree: Optional[str] = None
+    institution: Optional[str] = None
     year: Optional[str] = None
     details: Optional[str] = None
 
+    @field_validator("degree", "institution", "year", "details", mode="before")
+    @classmethod
+    def _text(cls, value: Any) -> Optional[str]:
+        return _to_text(value)
+
 class ResumeData(BaseModel):
-    name: str
+    name: Optional[str] = None
     email: Optional[str] = None
     phone: Optional[str] = None
     location: Optional[str] = None
@@ -23,3 +78,43 @@ class ResumeData(BaseModel):
     experience: List[Experience] = []
     education: List[Education] = []
     certifications: List[str] = []
+    links: List[str] = []
+
+    @field_validator("name", "email", "phone", "location", "summary", mode="before")
+    @classmethod
+    def _text(cls, value: Any) -> Optional[str]:
+        return _to_text(value)
+
+    @field_validator("skills", "certifications", "links", mode="before")
+    @classmethod
+    def _lists(cls, value: Any) -> List[str]:
+        return _to_text_list(value)
+
+    @field_validator("experience", mode="before")
+    @classmethod
+    def _experience(cls, value: Any) -> List[dict]:
+        return _to_records(value, "title")
+
+    @field_validator("education", mode="before")
+    @classmethod
+    def _education(cls, value: Any) -> List[dict]:
+        return _to_records(value, "degree")
+
+
+# Status keys carried alongside the resume fields
+RESULT_FLAGS = ("partial", "llm_error")
+
+
+def validate_resume(data: Dict) -> Dict:
+    """Typed, coerced copy of a parse result; errors pass through untouched"""
+    if "error" in data:
+        return data
+    try:
+        result = ResumeData.model_validate(data).model_dump()
+    except ValidationError as e:
+        print(f"⚠️ Result failed validation, returned as-is: {e.error_count()} errors")
+        return data
+    for flag in RESULT_FLAGS:
+        if flag in data:
+            result[flag] = data[flag]
+    return result
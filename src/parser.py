@@ -1,134 +1,614 @@
-import pdfplumber
-from docx import Document
-import requests
+import asyncio
 import json
-from typing import Dict, Optional
+import hashlib
+from concurrent.futures import Executor
 import os
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from src import compaction, decoding, extraction, metrics, rules
+from src.batching import MICRO_BATCHES, MicroBatcher
+from src.cache import ResultCache
+from src.store import ResumeStore
+from src.llm_client import LLMClient
+from src.models import ResumeData, validate_resume
+from src.providers import LLMRouter, PerplexityBackend, build_router
+from src.workers import WorkerPools
+
+# Prompt budget per LLM call; 1250 tokens is the old 5000-character cut
+DEFAULT_TOKEN_BUDGET = 1250
+
+# Extract this many times the prompt budget: enough for compaction to see
+# the education and certifications at the end of a long (~5-page) resume,
+# while extraction of a 40-page upload still stops early
+EXTRACT_HEADROOM = 4
+
+# Resume text longer than this is split and budgeted off the event loop
+PLAN_OFFLOAD_CHARS = 20_000
+
+# JSON schema line per output field; only unresolved fields are requested
+SCHEMA_FIELDS = {
+    "name": '"name": null',
+    "email": '"email": null',
+    "phone": '"phone": null',
+    "location": '"location": null',
+    "summary": '"summary": null',
+    "skills": '"skills": []',
+    "experience": '"experience": [{"title":null,"company":null,"duration":null,"description":null}]',
+    "education": '"education": [{"degree":null,"institution":null,"year":null,"details":null}]',
+    "certifications": '"certifications": []',
+}
+
+PROMPT_TEMPLATE = """Parse this resume. Return ONLY valid JSON. No markdown. No explanations.
+
+    {{
+    {schema}
+    }}
+
+    Resume:
+    {resume_text}"""
+
+# Several short resumes in one completion (see src/batching.py)
+BATCH_DELIMITER = "=== RESUME {number} ==="
+
+BATCH_PROMPT_TEMPLATE = """Parse each of the {count} resumes below. Return ONLY a valid JSON array with exactly {count} objects, one per resume, in input order. No markdown. No explanations.
+
+    Each object, with "resume" set to the number in its === RESUME n === line:
+    {{
+    "resume": 1,
+    {schema}
+    }}
+
+    {resumes}"""
+
+# Always asked for in a micro-batch: each answer's email and phone must
+# agree with the rule-extracted ones, or it belongs to another resume
+BATCH_CHECK_FIELDS = ("email", "phone")
+
+# Changes whenever the prompt, rules or result model change, so cached
+# results never outlive them
+PROMPT_VERSION = hashlib.sha256(
+    (PROMPT_TEMPLATE + BATCH_PROMPT_TEMPLATE + json.dumps(SCHEMA_FIELDS) + rules.RULES_VERSION
+     + json.dumps(ResumeData.model_json_schema())).encode("utf-8")
+).hexdigest()[:12]
+
+# Parse modes: "full" = rules + LLM for the rest, "rules" = offline rules only
+FULL_MODE = "full"
+RULES_MODE = "rules"
+
+
+def _counted(result: Dict) -> Dict:
+    """Count a finished parse by outcome and hand it back"""
+    if "error" in result:
+        outcome = "error"
+    elif result.get("partial"):
+        outcome = "partial"
+    else:
+        outcome = "success"
+    metrics.PARSES.inc(outcome=outcome)
+    return result
+
+
+def _same_contact(field: str, answer, expected: str) -> bool:
+    """Whether an LLM email/phone can be the rule-extracted one"""
+    if not answer:
+        return True
+    if field == "phone":
+        # "+1 (555) 123-4567" and "555-123-4567" are the same number
+        got = "".join(ch for ch in str(answer) if ch.isdigit())
+        want = "".join(ch for ch in expected if ch.isdigit())
+        return bool(got) and (got.endswith(want) or want.endswith(got))
+    return str(answer).strip().lower() == expected.strip().lower()
+
 
 class ResumeParser:
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        cache: Optional[ResultCache] = None,
+        router: Optional[LLMRouter] = None,
+        pre_extract: bool = True,
+        rules_fallback: bool = True,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        max_chunks: int = 1,
+        micro_batch_size: int = 1,
+        micro_batch_tokens: int = 3000,
+        micro_batch_window: float = 0.05,
+        store: Optional[ResumeStore] = None
+    ):
         self.api_key = api_key
-        self.perplexity_endpoint = "https://api.perplexity.ai/chat/completions"
+        self.perplexity_endpoint = PerplexityBackend.DEFAULT_ENDPOINT
+        self.cache = cache
+        # Searchable copy of every successful result, by upload SHA-256
+        self.store = store
+        # Backends with pooled clients for the lifetime of the parser;
+        # plain Perplexity when no router is given
+        self.llm = router or LLMRouter([
+            PerplexityBackend(LLMClient(api_key, self.perplexity_endpoint), name="perplexity")
+        ])
+        self.model = self.llm.model
+        # Fill what regexes can before asking the LLM for the rest
+        self.pre_extract = pre_extract
+        # Return the rules-only result when the LLM call fails
+        self.rules_fallback = rules_fallback
+        # Prompt tokens per LLM call, and how many section chunks a long
+        # resume may be split into (parsed in parallel)
+        self.token_budget = token_budget
+        self.max_chunks = max(1, max_chunks)
+        # The prompt version plus the settings that change what the LLM
+        # sees; part of every cache key, so retuning never serves old results
+        self.prompt_version = hashlib.sha256(json.dumps(
+            [PROMPT_VERSION, self.token_budget, self.max_chunks, self.pre_extract]
+        ).encode("utf-8")).hexdigest()[:12]
+        # Short resumes from bulk callers share completions (size 1 = off)
+        self.batcher = None
+        if micro_batch_size > 1:
+            self.batcher = MicroBatcher(
+                self._complete_batch_async,
+                max_items=micro_batch_size,
+                max_tokens=micro_batch_tokens,
+                window=micro_batch_window,
+            )
+        # Running async parses by mode + cache key, for single-flight:
+        # [task, callers still waiting on it]
+        self._in_flight: Dict[str, list] = {}
+
+    @property
+    def extract_char_budget(self) -> int:
+        """Characters worth extracting - compaction trims the rest anyway"""
+        return (self.token_budget * compaction.CHARS_PER_TOKEN
+                * self.max_chunks * EXTRACT_HEADROOM)
     
     def extract_text(self, file_path: str) -> str:
-        """Extract text - handle generic 'file' names"""
-        filename = os.path.basename(file_path).lower()
-        
-        if filename.endswith('.pdf') or 'pdf' in file_path.lower():
-            return self._extract_from_pdf(file_path)
-        elif filename.endswith(('.docx', '.doc')):
-            return self._extract_from_docx(file_path)
-        else:
-            # Default to PDF (most common)
-            print(f"📄 Assuming PDF: {file_path}")
-            return self._extract_from_pdf(file_path)
+        """Extract text - format detected from the file's magic bytes"""
+        return extraction.extract_text(file_path)
+
+    def extract_text_from_stream(self, stream: BinaryIO, filename: Optional[str] = None) -> str:
+        """Extract text from an in-memory upload without touching disk"""
+        return extraction.extract_text_from_stream(stream, filename)
     
     def _extract_from_pdf(self, file_path: str) -> str:
         """Use pdfplumber to extract text"""
-        text = ""
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                extracted = page.extract_text()
-                if extracted:
-                    text += extracted + "\n"
-        return text
+        return extraction.extract_from_pdf(file_path)
     
     def _extract_from_docx(self, file_path: str) -> str:
         """Extract from DOCX"""
-        doc = Document(file_path)
-        return "\n".join([para.text for para in doc.paragraphs])
+        return extraction.extract_from_docx(file_path)
     
+    def _build_messages(self, resume_text: str, fields: Optional[List[str]] = None) -> List[Dict]:
+        schema = ",\n    ".join(SCHEMA_FIELDS[f] for f in (fields or SCHEMA_FIELDS))
+        prompt = PROMPT_TEMPLATE.format(schema=schema, resume_text=resume_text)
+        return [{"role": "user", "content": prompt}]
+
+    def _build_batch_messages(self, items: List[Tuple[List[str], str, Dict]]) -> List[Dict]:
+        wanted = {f for fields, _, _ in items for f in fields}.union(BATCH_CHECK_FIELDS)
+        schema = ",\n    ".join(SCHEMA_FIELDS[f] for f in SCHEMA_FIELDS if f in wanted)
+        resumes = "\n\n".join(
+            f"{BATCH_DELIMITER.format(number=i)}\n{text}" for i, (_, text, _) in enumerate(items, 1)
+        )
+        prompt = BATCH_PROMPT_TEMPLATE.format(count=len(items), schema=schema, resumes=resumes)
+        return [{"role": "user", "content": prompt}]
+
+    def _plan(self, resume_text: str):
+        """Rules pass plus prompt budgeting.
+
+        Returns the rule-based partial result (None when pre-extraction is
+        off) and the (fields, prompt text) chunks still to send to the LLM.
+        """
+        text = compaction.normalize(resume_text)
+        sections = rules.split_sections(text)
+        if self.pre_extract:
+            partial = rules.extract_fields(text, sections)
+            missing = rules.unresolved_fields(partial)
+            resolved = [f for f in SCHEMA_FIELDS if f not in missing]
+            sections = rules.sections_for_llm(sections, resolved)
+        else:
+            partial, missing = None, list(SCHEMA_FIELDS)
+        if not missing:
+            return partial, []
+        return partial, compaction.plan_chunks(
+            sections, missing, self.token_budget, self.max_chunks
+        )
+
+    def _finish(self, partial: Optional[Dict], llm_result: Dict) -> Dict:
+        """Merge the LLM answer into the rule-based fields, typed and coerced"""
+        if partial is None:
+            return validate_resume(llm_result)
+        if "error" in llm_result:
+            if not self.rules_fallback:
+                return llm_result
+            return validate_resume({**partial, "partial": True, "llm_error": llm_result["error"]})
+        merged = rules.merge(partial, llm_result)
+        for flag in ("partial", "llm_error"):
+            if flag in llm_result:
+                merged[flag] = llm_result[flag]
+        return validate_resume(merged)
+
+    def parse_rules_only(self, resume_text: str) -> Dict:
+        """Offline parse: regex fields only, no LLM call"""
+        result = rules.extract_fields(compaction.normalize(resume_text))
+        result["partial"] = True
+        return validate_resume(result)
+
+    def _complete_chunk(self, fields: List[str], text: str) -> Dict:
+        with metrics.timed("prompt_build"):
+            messages = self._build_messages(text, fields)
+        # The backend client times the HTTP exchange itself ("llm_request")
+        return self.llm.complete_sync(
+            messages,
+            self._handle_response,
+            temperature=0.0,  # Even more deterministic
+            max_tokens=1500
+        )
+
+    async def _complete_chunk_async(self, fields: List[str], text: str) -> Dict:
+        with metrics.timed("prompt_build"):
+            messages = self._build_messages(text, fields)
+        return await self.llm.complete(
+            messages,
+            self._handle_response,
+            temperature=0.0,
+            max_tokens=1500
+        )
+
+    async def _complete_batch_async(self, items: List[Tuple[List[str], str, Dict]]) -> List[Dict]:
+        """One completion for several (fields, text, rule contacts) items.
+
+        Each answer is matched to its resume by the number it echoes, and
+        must agree with the rule-extracted email and phone; items without
+        such an answer are parsed individually.
+        """
+        if len(items) == 1:
+            MICRO_BATCHES.inc(outcome="single")
+            fields, text, _ = items[0]
+            return [await self._complete_chunk_async(fields, text)]
+
+        with metrics.timed("prompt_build"):
+            messages = self._build_batch_messages(items)
+        result = await self.llm.complete(
+            messages,
+            self._handle_batch_response,
+            temperature=0.0,
+            max_tokens=1500 * len(items)
+        )
+        results: List[Optional[Dict]] = [None] * len(items)
+        answers = result.get("items", {})
+        for number, (fields, _, contacts) in enumerate(items, 1):
+            entry = answers.get(number)
+            if entry is not None and all(
+                _same_contact(f, entry.get(f), value) for f, value in contacts.items()
+            ):
+                results[number - 1] = {f: entry[f] for f in fields if f in entry}
+
+        unmatched = [i for i, r in enumerate(results) if r is None]
+        if not unmatched:
+            MICRO_BATCHES.inc(outcome="batched")
+            return results
+        MICRO_BATCHES.inc(outcome="fallback")
+        reason = result.get("error", "answers missing or not matching their resume")
+        print(f"⚠️ {len(unmatched)} of {len(items)} micro-batched resumes unusable ({reason}), "
+              f"parsing them individually")
+        retried = await asyncio.gather(
+            *(self._complete_chunk_async(*items[i][:2]) for i in unmatched)
+        )
+        for i, retry in zip(unmatched, retried):
+            results[i] = retry
+        return results
+
     def parse_with_llm(self, resume_text: str) -> Dict:
-        """Use Perplexity API to structure resume data"""
-        
-        if len(resume_text) > 5000:
-            resume_text = resume_text[:5000]
-        
-        prompt = f"""Parse this resume. Return ONLY valid JSON. No markdown. No explanations.
+        """Use the LLM backends to structure resume data (blocking)"""
+        with metrics.timed("pre_extract"):
+            partial, chunks = self._plan(resume_text)
+        if not chunks:
+            return partial
+        if len(chunks) == 1:
+            results = [self._complete_chunk(*chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+                results = list(pool.map(lambda c: self._complete_chunk(*c), chunks))
+        return self._finish(partial, compaction.merge_chunk_results(results))
 
-    {{
-    "name": null,
-    "email": null,
-    "phone": null,
-    "location": null,
-    "summary": null,
-    "skills": [],
-    "experience": [{{"title":null,"company":null,"duration":null,"description":null}}],
-    "education": [{{"degree":null,"institution":null,"year":null,"details":null}}],
-    "certifications": []
-    }}
+    async def parse_with_llm_async(self, resume_text: str, micro_batch: bool = False) -> Dict:
+        """Use the LLM backends to structure resume data without blocking the loop.
 
-    Resume:
-    {resume_text}"""
+        With `micro_batch`, a short single-chunk resume may share its
+        completion with others submitted around the same time.
+        """
+        with metrics.timed("pre_extract"):
+            if len(resume_text) > PLAN_OFFLOAD_CHARS:
+                partial, chunks = await asyncio.to_thread(self._plan, resume_text)
+            else:
+                partial, chunks = self._plan(resume_text)
+        if not chunks:
+            return partial
+        tokens = compaction.estimate_tokens(chunks[0][1])
+        if (micro_batch and self.batcher is not None and len(chunks) == 1
+                and tokens <= self.batcher.max_tokens // 2):
+            contacts = {f: partial[f] for f in BATCH_CHECK_FIELDS if partial and partial.get(f)}
+            results = [await self.batcher.submit((*chunks[0], contacts), tokens)]
+        else:
+            results = await asyncio.gather(
+                *(self._complete_chunk_async(fields, text) for fields, text in chunks)
+            )
+        return self._finish(partial, compaction.merge_chunk_results(list(results)))
+
+    def _handle_response(self, response, expect: str = "{") -> Dict:
+        """Turn a chat-completion HTTP response into parsed resume JSON"""
+        if response.status_code != 200:
+            metrics.LLM_ERRORS.inc(status=response.status_code)
+            return {"error": f"HTTP {response.status_code}", "details": response.text}
+
+        with metrics.timed("json_decode"):
+            return self._decode_content(decoding.loads(response.content), expect)
 
+    def _handle_batch_response(self, response) -> Dict:
+        """{"items": {resume number: object}}, or an error.
+
+        Objects without a number, or sharing one, are dropped: which
+        resume they describe is unknown.
+        """
+        parsed = self._handle_response(response, expect="[")
+        if isinstance(parsed, dict):
+            return parsed
+        numbers = [
+            str(entry.get("resume")) if isinstance(entry, dict) else None for entry in parsed
+        ]
+        items = {
+            int(number): entry for number, entry in zip(numbers, parsed)
+            if number is not None and number.isdigit() and numbers.count(number) == 1
+        }
+        if not items:
+            return {"error": "No numbered objects in batch answer"}
+        return {"items": items}
+
+    def _decode_content(self, result: Dict, expect: str = "{"):
+        """Pull the JSON value out of a chat-completion body"""
+        content = ""
+        if 'choices' in result and result['choices']:
+            choice = result['choices'][0]
+            if isinstance(choice, dict) and 'message' in choice:
+                message = choice['message']
+                content = message.get('content', '') if isinstance(message, dict) else str(message)
+
+        if not content:
+            return {"error": "No content in response", "raw": result}
+
+        # One pass over the text: fences, preamble and trailing prose are skipped
         try:
-            response = requests.post(
-                self.perplexity_endpoint,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "sonar-pro",
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.0,  # Even more deterministic
-                    "max_tokens": 1500
-                },
-                timeout=30
-            )
-            
-            if response.status_code != 200:
-                return {"error": f"HTTP {response.status_code}", "details": response.text}
-            
-            result = response.json()
-            
-            # Extract content safely
-            content = ""
-            if 'choices' in result and result['choices']:
-                choice = result['choices'][0]
-                if isinstance(choice, dict) and 'message' in choice:
-                    message = choice['message']
-                    content = message.get('content', '') if isinstance(message, dict) else str(message)
-            
-            if not content:
-                return {"error": "No content in response", "raw": result}
-            
-            # Robust JSON extraction
-            content = content.strip()
-            
-            # Remove markdown code blocks
-            while '```json' in content:
-                start = content.find('```json')
-                end = content.find('```', start + 7)
-                if end != -1:
-                    content = content[start+7:end].strip()
-                else:
-                    break
-            
-            while '```' in content:
-                start = content.find('```')
-                end = content.find('```', start + 3)
-                if end != -1 and end > start + 3:
-                    content = content[:start] + content[end+3:].strip()
-                else:
-                    break
-            
-            # Parse JSON
-            try:
-                parsed = json.loads(content)
-                return parsed
-            except json.JSONDecodeError:
-                # Last resort: return first 500 chars for debugging
-                return {"error": "JSON Parse Failed", "debug_content": content[:500]}
-                
+            parsed, repaired = decoding.extract_json(content, expect)
+        except ValueError:
+            metrics.LLM_ERRORS.inc(status="invalid_json")
+            # Last resort: return first 500 chars for debugging
+            return {"error": "JSON Parse Failed", "debug_content": content[:500]}
+        if repaired:
+            metrics.LLM_ERRORS.inc(status="truncated_json")
+            if isinstance(parsed, dict):
+                # Usable, but the tail of the answer is missing
+                parsed.update(partial=True, llm_error="Truncated JSON repaired")
+        return parsed
+
+    def _record_extraction(self, text: str, stats: Dict) -> str:
+        """Record timings measured in the extraction worker; returns the text"""
+        kind = stats["format"]
+        metrics.record_stage("extract", stats["seconds"])
+        metrics.EXTRACT_SECONDS.observe(stats["seconds"], format=kind)
+        for seconds in stats["page_seconds"]:
+            metrics.EXTRACT_PAGE_SECONDS.observe(seconds, format=kind)
+        metrics.CHARS_EXTRACTED.inc(len(text), format=kind)
+        return text
+
+    def cache_key(self, content: bytes, content_hash: Optional[str] = None) -> str:
+        """Cache key for raw upload bytes under the current prompt, settings and model"""
+        return ResultCache.make_key(content, self.prompt_version, self.model, content_hash)
+
+    def _store_result(
+        self,
+        key: Optional[str],
+        filename: Optional[str],
+        result: Dict,
+        fresh: bool = True
+    ):
+        """Add a result to the search store; never fails the parse.
+
+        Cache hits pass `fresh=False` and are only stored when missing.
+        """
+        if self.store is None or key is None or "error" in result:
+            return
+        try:
+            # A complete LLM result replaces whatever is stored for the
+            # upload; rules-only or partial ones only fill a gap
+            complete = "partial" not in result and "llm_error" not in result
+            self.store.save(key.split(":", 1)[0], filename, result, replace=fresh and complete)
         except Exception as e:
-            return {"error": f"Exception: {str(e)}"}
+            print(f"⚠️ Could not store result: {e}")
+
     def parse(self, file_path: str) -> Dict:
         """Full pipeline: extract text → parse with LLM"""
         try:
-            text = self.extract_text(file_path)
-            if not text or len(text.strip()) < 10:
-                return {"error": "No text extracted from file"}
-            return self.parse_with_llm(text)
+            with open(file_path, "rb") as f:
+                content = f.read()
         except Exception as e:
             return {"error": f"Pipeline failed: {str(e)}"}
+        return self.parse_bytes(content, os.path.basename(file_path))
+
+    def parse_bytes(
+        self,
+        content: bytes,
+        filename: Optional[str] = None,
+        mode: str = FULL_MODE
+    ) -> Dict:
+        """Full pipeline for an upload held in memory"""
+        try:
+            if mode == RULES_MODE:
+                text = self._record_extraction(
+                    *extraction.extract_text_with_stats(content, filename)
+                )
+                result = self.parse_rules_only(text)
+                self._store_result(self.cache_key(content), filename, result)
+                return _counted(result)
+
+            key = None
+            if self.cache is not None or self.store is not None:
+                key = self.cache_key(content)
+            if self.cache is not None:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    metrics.PARSES.inc(outcome="cached")
+                    self._store_result(key, filename, cached, False)
+                    return cached
+
+            text = self._record_extraction(*extraction.extract_text_with_stats(
+                content, filename, self.extract_char_budget
+            ))
+            if not text or len(text.strip()) < 10:
+                return _counted({"error": "No text extracted from file"})
+            result = self.parse_with_llm(text)
+
+            # Only complete, successful parses are worth remembering
+            if self.cache is not None and "error" not in result and "partial" not in result:
+                self.cache.set(key, result)
+            self._store_result(key, filename, result)
+            return _counted(result)
+        except Exception as e:
+            return _counted({"error": f"Pipeline failed: {str(e)}"})
+
+    async def parse_bytes_async(
+        self,
+        content: bytes,
+        filename: Optional[str] = None,
+        extract_executor: Union[WorkerPools, Executor, None] = None,
+        mode: str = FULL_MODE,
+        content_hash: Optional[str] = None,
+        micro_batch: bool = False
+    ) -> Dict:
+        """Non-blocking pipeline: extraction in an executor, LLM call awaited.
+
+        `extract_executor` is normally the app's WorkerPools, whose process
+        pool is replaced when a worker crashes; a plain Executor works too,
+        and `None` uses the loop's default thread pool. `content_hash` is the upload's SHA-256
+        when the caller already has it. Bulk callers pass `micro_batch`
+        to let short resumes share completions.
+
+        Concurrent calls for the same bytes and mode share one run
+        (single-flight): the first caller starts it, later ones await it.
+        The run is cancelled once every caller waiting on it is.
+        """
+        key = self.cache_key(content, content_hash)
+        flight_key = f"{mode}:{key}"
+        loop = asyncio.get_running_loop()
+        flight = self._in_flight.get(flight_key)
+        if flight is not None and flight[0].get_loop() is loop:
+            metrics.PARSES.inc(outcome="coalesced")
+            flight[1] += 1
+        else:
+            # A task of its own, so a disconnecting first caller does not
+            # cancel the parse for everyone else waiting on it
+            task = loop.create_task(
+                self._parse_bytes_async(
+                    content, filename, extract_executor, mode, key, micro_batch
+                )
+            )
+            flight = [task, 1]
+            self._in_flight[flight_key] = flight
+
+            def land(done: asyncio.Task):
+                current = self._in_flight.get(flight_key)
+                if current is not None and current[0] is done:
+                    del self._in_flight[flight_key]
+
+            task.add_done_callback(land)
+        task = flight[0]
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # Last one out stops paying for the LLM calls
+            flight[1] -= 1
+            if flight[1] == 0:
+                # Forget it first: a caller arriving before the done
+                # callback runs must start afresh, not join a cancelled run
+                if self._in_flight.get(flight_key) is flight:
+                    del self._in_flight[flight_key]
+                task.cancel()
+            raise
+
+    async def aclose(self):
+        """Finish pending micro-batches, then release LLM connections"""
+        if self.batcher is not None:
+            await self.batcher.aclose()
+        await self.llm.aclose()
+
+    async def _extract(self, extract_executor: Union[WorkerPools, Executor, None], *args):
+        """extract_text_with_stats off the event loop"""
+        if isinstance(extract_executor, WorkerPools):
+            return await extract_executor.run_cpu(extraction.extract_text_with_stats, *args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(extract_executor, extraction.extract_text_with_stats, *args)
+
+    async def _cache_call(self, method, *args):
+        """Cache lookup or write; SQLite-backed ones run off the event loop"""
+        if self.cache.persistent:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def _parse_bytes_async(
+        self,
+        content: bytes,
+        filename: Optional[str],
+        extract_executor: Union[WorkerPools, Executor, None],
+        mode: str,
+        key: str,
+        micro_batch: bool = False
+    ) -> Dict:
+        try:
+            if mode == RULES_MODE:
+                text = self._record_extraction(
+                    *await self._extract(extract_executor, content, filename)
+                )
+                result = self.parse_rules_only(text)
+                await asyncio.to_thread(self._store_result, key, filename, result)
+                return _counted(result)
+
+            if self.cache is not None:
+                cached = await self._cache_call(self.cache.get, key)
+                if cached is not None:
+                    metrics.PARSES.inc(outcome="cached")
+                    await asyncio.to_thread(self._store_result, key, filename, cached, False)
+                    return cached
+
+            text = self._record_extraction(*await self._extract(
+                extract_executor, content, filename, self.extract_char_budget
+            ))
+            if not text or len(text.strip()) < 10:
+                return _counted({"error": "No text extracted from file"})
+            result = await self.parse_with_llm_async(text, micro_batch)
+
+            if self.cache is not None and "error" not in result and "partial" not in result:
+                await self._cache_call(self.cache.set, key, result)
+            await asyncio.to_thread(self._store_result, key, filename, result)
+            return _counted(result)
+        except Exception as e:
+            return _counted({"error": f"Pipeline failed: {str(e)}"})
+
+
+def build_parser(settings) -> ResumeParser:
+    """Parser with cache, search store and LLM routing from settings"""
+    cache = None
+    if settings.cache_enabled:
+        cache = ResultCache(
+            max_entries=settings.cache_max_entries,
+            ttl_seconds=settings.cache_ttl_seconds,
+            sqlite_path=settings.cache_sqlite_path,
+        )
+    store = ResumeStore(settings.store_db_path) if settings.store_enabled else None
+    return ResumeParser(
+        api_key=settings.perplexity_api_key,
+        cache=cache,
+        store=store,
+        router=build_router(settings),
+        pre_extract=settings.rules_pre_extract,
+        rules_fallback=settings.rules_fallback,
+        token_budget=settings.llm_token_budget,
+        max_chunks=settings.llm_max_chunks,
+        micro_batch_size=settings.micro_batch_size,
+        micro_batch_tokens=settings.micro_batch_tokens,
+        micro_batch_window=settings.micro_batch_window_ms / 1000
+    )
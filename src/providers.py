@@ -0,0 +1,344 @@
+"""
+LLM backends and the router that picks between them.
+
+A backend is one chat-completions provider: a pooled (and normally
+scheduled) client, a model and a price. `PerplexityBackend` is the
+original sonar-pro setup; `OpenAIBackend` speaks the same protocol to
+OpenAI or to any compatible local server (vLLM, llama.cpp, Ollama).
+
+`LLMRouter` decides which backend answers:
+
+- ``fallback``: backends in configured order, next one on failure
+- ``cheapest``: same, ordered by cost per 1K tokens
+- ``hedged``: start the first backend; if it has not answered by its
+  observed p90 latency, also start the next one. The first valid JSON
+  wins and the losers are cancelled.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+import httpx
+
+from src import metrics
+from src.llm_client import LLMClient
+from src.scheduler import LLMScheduler
+
+FALLBACK = "fallback"
+CHEAPEST = "cheapest"
+HEDGED = "hedged"
+STRATEGIES = (FALLBACK, CHEAPEST, HEDGED)
+
+OPENAI_ENDPOINT = "https://api.openai.com/v1/chat/completions"
+
+# Returned by every completion of a router without backends; rules-only
+# parsing keeps working
+NO_BACKEND_ERROR = "No LLM backend configured: set PERPLEXITY_API_KEY or OPENAI_API_KEY"
+
+LLM_HEDGES = metrics.REGISTRY.counter(
+    "resume_llm_hedges_total",
+    "Hedged requests fired because the previous backend was slower than its p90",
+    ["backend"],
+)
+LLM_WINS = metrics.REGISTRY.counter(
+    "resume_llm_wins_total",
+    "Valid answers by the backend that produced them",
+    ["backend"],
+)
+
+# Turns a chat-completion response into parsed JSON or {"error": ...}
+Decoder = Callable[[httpx.Response], Dict]
+
+
+class Backend:
+    """One chat-completions provider with its own latency history"""
+
+    DEFAULT_ENDPOINT = ""
+    DEFAULT_MODEL = ""
+
+    def __init__(
+        self,
+        client,
+        model: Optional[str] = None,
+        name: Optional[str] = None,
+        cost_per_1k_tokens: float = 0.0,
+        options: Optional[Dict] = None,
+        latency_window: int = 200,
+    ):
+        self.client = client
+        self.model = model or self.DEFAULT_MODEL
+        self.name = name or self.model
+        self.cost_per_1k_tokens = cost_per_1k_tokens
+        # Extra payload fields this provider wants on every call
+        self.options = options or {}
+        self.latencies: Deque[float] = deque(maxlen=latency_window)
+
+    async def complete(self, messages: List[Dict], **options) -> httpx.Response:
+        metrics.LLM_REQUESTS.inc(backend=self.name)
+        started = time.perf_counter()
+        response = await self.client.complete(messages, self.model, **{**self.options, **options})
+        if response.status_code == 200:
+            self.latencies.append(time.perf_counter() - started)
+        return response
+
+    def complete_sync(self, messages: List[Dict], **options) -> httpx.Response:
+        metrics.LLM_REQUESTS.inc(backend=self.name)
+        started = time.perf_counter()
+        response = self.client.complete_sync(messages, self.model, **{**self.options, **options})
+        if response.status_code == 200:
+            self.latencies.append(time.perf_counter() - started)
+        return response
+
+    def latency_quantile(self, quantile: float, min_samples: int = 20) -> Optional[float]:
+        """Observed latency quantile in seconds, or None until enough samples"""
+        if len(self.latencies) < min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(quantile * len(ordered)) - 1)]
+
+    async def warm_up(self):
+        await self.client.warm_up()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    def close(self):
+        self.client.close()
+
+
+class PerplexityBackend(Backend):
+    DEFAULT_ENDPOINT = "https://api.perplexity.ai/chat/completions"
+    DEFAULT_MODEL = "sonar-pro"
+
+
+class OpenAIBackend(Backend):
+    """OpenAI or any OpenAI-compatible server, optionally in JSON mode"""
+
+    DEFAULT_ENDPOINT = OPENAI_ENDPOINT
+    DEFAULT_MODEL = "gpt-4o-mini"
+
+    def __init__(self, client, model: Optional[str] = None, json_mode: bool = True, **kwargs):
+        options = kwargs.pop("options", None) or {}
+        if json_mode:
+            options.setdefault("response_format", {"type": "json_object"})
+        super().__init__(client, model, options=options, **kwargs)
+
+
+class LLMRouter:
+    """Routes each completion to one or more backends by strategy.
+
+    With no backends every completion returns `NO_BACKEND_ERROR`.
+    """
+
+    def __init__(
+        self,
+        backends: List[Backend],
+        strategy: str = FALLBACK,
+        hedge_quantile: float = 0.9,
+        hedge_delay: float = 8.0,
+        hedge_min_samples: int = 20,
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown routing strategy: {strategy}")
+        self.backends = backends
+        self.strategy = strategy
+        self.hedge_quantile = hedge_quantile
+        # Used until a backend has `hedge_min_samples` latencies
+        self.hedge_delay = hedge_delay
+        self.hedge_min_samples = hedge_min_samples
+
+    @property
+    def model(self) -> str:
+        """Identity of the configured models, part of the cache key"""
+        return "|".join(b.model for b in self.backends)
+
+    def ordered(self) -> List[Backend]:
+        if self.strategy == CHEAPEST:
+            return sorted(self.backends, key=lambda b: b.cost_per_1k_tokens)
+        return list(self.backends)
+
+    def _hedge_after(self, backend: Backend) -> float:
+        observed = backend.latency_quantile(self.hedge_quantile, self.hedge_min_samples)
+        return self.hedge_delay if observed is None else observed
+
+    async def _attempt(self, backend: Backend, messages: List[Dict], decode: Decoder, options: Dict) -> Dict:
+        try:
+            response = await backend.complete(messages, **options)
+        except Exception as e:
+            metrics.LLM_ERRORS.inc(status="exception")
+            return {"error": f"Exception: {str(e)}"}
+        return decode(response)
+
+    def _attempt_sync(self, backend: Backend, messages: List[Dict], decode: Decoder, options: Dict) -> Dict:
+        try:
+            response = backend.complete_sync(messages, **options)
+        except Exception as e:
+            metrics.LLM_ERRORS.inc(status="exception")
+            return {"error": f"Exception: {str(e)}"}
+        return decode(response)
+
+    async def complete(self, messages: List[Dict], decode: Decoder, **options) -> Dict:
+        """Decoded JSON from the winning backend, or the last error"""
+        if not self.backends:
+            return {"error": NO_BACKEND_ERROR}
+        if self.strategy == HEDGED and len(self.backends) > 1:
+            return await self._complete_hedged(messages, decode, options)
+        result: Dict = {}
+        for backend in self.ordered():
+            result = await self._attempt(backend, messages, decode, options)
+            if "error" not in result:
+                LLM_WINS.inc(backend=backend.name)
+                return result
+        return result
+
+    def complete_sync(self, messages: List[Dict], decode: Decoder, **options) -> Dict:
+        """Blocking path; hedging needs an event loop, so it falls back in order"""
+        if not self.backends:
+            return {"error": NO_BACKEND_ERROR}
+        result: Dict = {}
+        for backend in self.ordered():
+            result = self._attempt_sync(backend, messages, decode, options)
+            if "error" not in result:
+                LLM_WINS.inc(backend=backend.name)
+                return result
+        return result
+
+    async def _complete_hedged(self, messages: List[Dict], decode: Decoder, options: Dict) -> Dict:
+        waiting = list(self.backends)
+        pending: Dict[asyncio.Task, Backend] = {}
+        result: Dict = {}
+
+        def launch() -> Optional[Backend]:
+            if not waiting:
+                return None
+            backend = waiting.pop(0)
+            task = asyncio.ensure_future(self._attempt(backend, messages, decode, options))
+            pending[task] = backend
+            return backend
+
+        latest = launch()
+        try:
+            while pending:
+                timeout = self._hedge_after(latest) if waiting else None
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Slower than its p90: race the next backend against it
+                    latest = launch()
+                    LLM_HEDGES.inc(backend=latest.name)
+                    continue
+                for task in done:
+                    backend = pending.pop(task)
+                    result = task.result()
+                    if "error" not in result:
+                        LLM_WINS.inc(backend=backend.name)
+                        return result
+                # A failure hedges immediately rather than after the delay
+                if waiting:
+                    latest = launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        return result
+
+    def stats(self) -> List[Dict]:
+        rows = []
+        for backend in self.backends:
+            row = {
+                "backend": backend.name,
+                "model": backend.model,
+                "cost_per_1k_tokens": backend.cost_per_1k_tokens,
+                "p90_seconds": backend.latency_quantile(0.9, self.hedge_min_samples),
+            }
+            if isinstance(backend.client, LLMScheduler):
+                row.update(backend.client.stats())
+            rows.append(row)
+        return rows
+
+    async def warm_up(self, timeout: float = 5.0) -> Dict[str, str]:
+        """Open a connection to every backend at once; returns errors by name"""
+        results = await asyncio.gather(
+            *(asyncio.wait_for(b.warm_up(), timeout) for b in self.backends),
+            return_exceptions=True,
+        )
+        return {
+            b.name: repr(r) for b, r in zip(self.backends, results) if isinstance(r, BaseException)
+        }
+
+    async def aclose(self):
+        for backend in self.backends:
+            await backend.aclose()
+
+    def close(self):
+        for backend in self.backends:
+            backend.close()
+
+
+def _scheduled_client(settings, api_key: str, endpoint: str) -> LLMScheduler:
+    """Pooled client for one provider behind its own scheduler"""
+    client = LLMClient(
+        api_key=api_key,
+        endpoint=endpoint,
+        http2=settings.llm_http2,
+        max_connections=settings.llm_max_connections,
+        max_keepalive_connections=settings.llm_max_keepalive_connections,
+        keepalive_expiry=settings.llm_keepalive_expiry,
+        connect_timeout=settings.llm_connect_timeout,
+        read_timeout=settings.llm_read_timeout,
+        write_timeout=settings.llm_write_timeout,
+        pool_timeout=settings.llm_pool_timeout,
+    )
+    return LLMScheduler(
+        client,
+        requests_per_second=settings.llm_requests_per_second,
+        burst=settings.llm_burst,
+        tokens_per_minute=settings.llm_tokens_per_minute,
+        initial_concurrency=settings.llm_initial_concurrency,
+        min_concurrency=settings.llm_min_concurrency,
+        max_concurrency=settings.llm_max_concurrency,
+        max_attempts=settings.llm_max_attempts,
+        backoff_base=settings.llm_backoff_base,
+        backoff_max=settings.llm_backoff_max,
+        breaker_threshold=settings.llm_breaker_threshold,
+        breaker_reset_seconds=settings.llm_breaker_reset_seconds,
+    )
+
+
+def build_router(settings) -> LLMRouter:
+    """Backends listed in LLM_BACKENDS that have credentials, in that order.
+
+    None configured is not fatal: the router answers every completion with
+    an error, and rules-only parsing still works.
+    """
+    backends: List[Backend] = []
+    for name in (n.strip() for n in settings.llm_backends.split(",")):
+        if name == "perplexity" and settings.perplexity_api_key:
+            backends.append(PerplexityBackend(
+                _scheduled_client(settings, settings.perplexity_api_key, settings.llm_endpoint),
+                model=settings.perplexity_model,
+                name="perplexity",
+                cost_per_1k_tokens=settings.perplexity_cost_per_1k_tokens,
+            ))
+        elif name == "openai" and (settings.openai_api_key or settings.openai_endpoint != OPENAI_ENDPOINT):
+            # Local OpenAI-compatible servers usually need no key
+            backends.append(OpenAIBackend(
+                _scheduled_client(settings, settings.openai_api_key or "local", settings.openai_endpoint),
+                model=settings.openai_model,
+                json_mode=settings.openai_json_mode,
+                name="openai",
+                cost_per_1k_tokens=settings.openai_cost_per_1k_tokens,
+            ))
+        elif name and name not in ("perplexity", "openai"):
+            print(f"⚠️ Unknown LLM backend: {name}")
+    if not backends:
+        print(f"⚠️ {NO_BACKEND_ERROR} (LLM_BACKENDS={settings.llm_backends}); only mode=rules works")
+    return LLMRouter(
+        backends,
+        strategy=settings.llm_strategy,
+        hedge_quantile=settings.llm_hedge_quantile,
+        hedge_delay=settings.llm_hedge_delay,
+    )
@@ -0,0 +1,241 @@
+"""Deterministic, rule-based pre-extraction.
+
+Pulls the fields that regexes get right (email, phone, links) out of
+resume text before the LLM sees it, so the LLM is only asked for what is
+still unresolved. Name, location and clearly headed sections are guessed
+too, but those guesses only fill gaps the LLM leaves. Also serves as an
+offline "rules-only" parser when the LLM is unavailable.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# Bump when the rules change so cached LLM results keyed on them expire
+RULES_VERSION = "3"
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+# Spaces and tabs only: a number never continues onto the next line
+PHONE_RE = re.compile(r"(?<![\w/(])(\+?\(?\d[\d \t().-]{7,}\d)(?![\w/])")
+# Dates that look like phone numbers: "2018 - 2021", "01.2018 - 12.2021"
+_DATE = r"(?:\d{1,2}[./-]){0,2}(?:19|20)\d{2}(?:[./-]\d{1,2}){0,2}"
+DATE_RE = re.compile(rf"{_DATE}(?:\s*[-–]\s*{_DATE})?")
+# Only the top of the header is searched for a phone number; further down
+# long digit runs are dates, IDs and figures far more often than not
+CONTACT_LINES = 10
+URL_RE = re.compile(
+    r"(?:https?://|www\.)[^\s|,;<>()]+"
+    r"|(?:linkedin\.com|github\.com|gitlab\.com)/[^\s|,;<>()]+",
+    re.IGNORECASE,
+)
+LOCATION_RE = re.compile(
+    r"^[A-Z][A-Za-z.'-]+(?: [A-Z][A-Za-z.'-]+)*, ?[A-Z][A-Za-z.'-]+(?: [A-Z][A-Za-z.'-]+)*$"
+)
+# Trailing state/country code, as in "Austin, TX" or "Leeds, UK"
+REGION_RE = re.compile(r", ?[A-Z]{2,3}$")
+NAME_RE = re.compile(r"^[A-Za-z][A-Za-z.'-]+(?: [A-Za-z][A-Za-z.'-]+){1,3}$")
+BULLET_RE = re.compile(r"^[\s•·▪‣◦●*\-–—]+")
+# Separators between skills, ignoring commas inside "AWS (EC2, S3)"
+SKILL_SPLIT_RE = re.compile(r"[,;|•·](?![^()]*\))")
+WHITESPACE_RE = re.compile(r"\s+")
+
+SECTION_ALIASES = {
+    "summary": ("summary", "professional summary", "profile", "objective",
+                "career objective", "about me", "professional profile"),
+    "experience": ("experience", "work experience", "professional experience",
+                   "employment", "employment history", "work history", "career history"),
+    "education": ("education", "academic background", "qualifications",
+                  "education and training", "academic qualifications"),
+    "skills": ("skills", "technical skills", "core skills", "key skills",
+               "core competencies", "competencies", "technologies", "tech stack"),
+    "certifications": ("certification", "certifications", "certificates",
+                       "licenses", "licenses and certifications",
+                       "licenses & certifications", "courses"),
+}
+_HEADINGS = {alias: section for section, aliases in SECTION_ALIASES.items() for alias in aliases}
+HEADING_RE = re.compile(
+    r"^(?:" + "|".join(sorted((re.escape(a) for a in _HEADINGS), key=len, reverse=True)) + r")$",
+    re.IGNORECASE,
+)
+# Short upper-case lines we don't recognise still end the previous section
+OTHER_HEADING_RE = re.compile(r"^[A-Z][A-Z &/'-]{2,40}$")
+
+# Output fields in ResumeData order, with their empty values
+FIELDS = {
+    "name": None,
+    "email": None,
+    "phone": None,
+    "location": None,
+    "summary": None,
+    "skills": [],
+    "experience": [],
+    "education": [],
+    "certifications": [],
+}
+
+# Fields precise enough to skip the LLM; every other rule value is a guess
+# that only fills what the LLM leaves empty
+RESOLVED_FIELDS = ("email", "phone")
+
+# Sections whose text is only needed by the LLM while the field is missing
+SECTION_FIELDS = {"summary": "summary", "skills": "skills", "certifications": "certifications"}
+
+
+def _clean_heading(line: str) -> str:
+    return BULLET_RE.sub("", line).strip().rstrip(":").strip()
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    """Split resume text into {section: body}; preamble goes to "header".
+
+    Unrecognised upper-case headings are kept under their own lower-cased
+    title unless bulleted or indented ("- AWS" is an item, not a heading);
+    a repeated heading gets a numeric suffix ("skills_4").
+    """
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for raw in text.splitlines():
+        line = _clean_heading(raw)
+        if line and len(line) <= 45:
+            section = None
+            if HEADING_RE.match(line):
+                section = _HEADINGS[line.lower()]
+            elif current != "header" and not BULLET_RE.match(raw) and OTHER_HEADING_RE.match(line):
+                section = line.lower()
+            if section:
+                current = section if section not in sections else f"{section}_{len(sections)}"
+                sections[current] = []
+                continue
+        sections[current].append(raw)
+    return {name: "\n".join(lines).strip() for name, lines in sections.items()}
+
+
+def _section(sections: Dict[str, str], name: str) -> str:
+    """All bodies for a section, including repeated headings (skills_5, ...)"""
+    return "\n".join(
+        body for key, body in sections.items()
+        if key == name or key.startswith(name + "_")
+    ).strip()
+
+
+def _name_line(lines: List[str]) -> int:
+    """Index of the first header line that is not a "Resume" banner, or -1"""
+    for index, line in enumerate(lines[:5]):
+        lowered = line.lower()
+        if not line or "resume" in lowered or "curriculum" in lowered or HEADING_RE.match(line):
+            continue
+        return index
+    return -1
+
+
+def _find_name(header: str) -> Optional[str]:
+    # Only the top line: a job title underneath must never pass for a name
+    lines = [line.strip() for line in header.splitlines()]
+    index = _name_line(lines)
+    if index < 0:
+        return None
+    # "JOHN SMITH, PhD | john@x.com" -> "JOHN SMITH"
+    candidate = lines[index].split("|")[0].split(",")[0].strip()
+    if NAME_RE.match(candidate):
+        return candidate.title() if candidate.isupper() else candidate
+    return None
+
+
+def _find_location(header: str) -> Optional[str]:
+    lines = [line.strip() for line in header.splitlines()]
+    start = _name_line(lines)
+    for index, line in enumerate(lines[max(start, 0):], max(start, 0)):
+        parts = [part.strip() for part in re.split(r"[|•·]", line)]
+        if index == start:
+            # The name itself ("SMITH, John") is never the location
+            parts = parts[1:]
+        # "Python, Kubernetes" looks like "Austin, Texas": only trust a
+        # region code ("Austin, TX") or a line that also has contact details
+        contact = len(parts) > 1 or EMAIL_RE.search(line) or _find_phone(line)
+        for part in parts:
+            if part and not EMAIL_RE.search(part) and LOCATION_RE.match(part):
+                if contact or REGION_RE.search(part):
+                    return part
+    return None
+
+
+def _find_phone(text: str) -> Optional[str]:
+    for match in PHONE_RE.finditer(text):
+        candidate = match.group(1).strip()
+        digits = sum(ch.isdigit() for ch in candidate)
+        if 8 <= digits <= 15 and not DATE_RE.fullmatch(candidate):
+            return candidate
+    return None
+
+
+def _split_items(body: str) -> List[str]:
+    items = []
+    seen = set()
+    for line in body.splitlines():
+        line = BULLET_RE.sub("", line).strip()
+        # "Cloud & Deployment: AWS, Azure" -> drop the category label
+        if ":" in line:
+            line = line.split(":", 1)[1]
+        for item in SKILL_SPLIT_RE.split(line):
+            item = item.strip(" .\t")
+            if item and len(item) <= 40 and item.lower() not in seen:
+                seen.add(item.lower())
+                items.append(item)
+    return items
+
+
+def _lines(body: str) -> List[str]:
+    return [
+        BULLET_RE.sub("", line).strip()
+        for line in body.splitlines()
+        if BULLET_RE.sub("", line).strip()
+    ]
+
+
+def extract_fields(text: str, sections: Optional[Dict[str, str]] = None) -> Dict:
+    """Rule-based partial ResumeData dict; unresolved fields stay empty"""
+    sections = sections if sections is not None else split_sections(text)
+    header = sections.get("header", "")
+
+    email = EMAIL_RE.search(text)
+    summary = _section(sections, "summary")
+    links = []
+    for match in URL_RE.finditer(text):
+        url = match.group(0).rstrip(".")
+        if url not in links:
+            links.append(url)
+
+    result = dict(FIELDS)
+    result.update({
+        "name": _find_name(header),
+        "email": email.group(0) if email else None,
+        "phone": _find_phone("\n".join(header.splitlines()[:CONTACT_LINES])),
+        "location": _find_location(header),
+        "summary": WHITESPACE_RE.sub(" ", summary) if summary else None,
+        "skills": _split_items(_section(sections, "skills")),
+        "certifications": _lines(_section(sections, "certifications")),
+        "links": links,
+    })
+    return result
+
+
+def unresolved_fields(partial: Dict) -> List[str]:
+    """Output fields still to ask the LLM for; only RESOLVED_FIELDS can be settled"""
+    return [field for field in FIELDS if field not in RESOLVED_FIELDS or not partial.get(field)]
+
+
+def sections_for_llm(sections: Dict[str, str], resolved: List[str]) -> Dict[str, str]:
+    """Sections the LLM still needs, minus those whose field is already known"""
+    return {
+        name: body for name, body in sections.items()
+        if body and SECTION_FIELDS.get(re.sub(r"_\d+$", "", name)) not in resolved
+    }
+
+
+def merge(partial: Dict, llm_result: Dict) -> Dict:
+    """LLM values win except for RESOLVED_FIELDS; rule guesses fill the gaps"""
+    merged = dict(partial)
+    for field, empty in FIELDS.items():
+        if field in RESOLVED_FIELDS and merged.get(field):
+            continue
+        merged[field] = llm_result.get(field) or merged.get(field) or empty
+    return merged
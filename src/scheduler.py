@@ -0,0 +1,402 @@
+"""
+Shared scheduler in front of the LLM client.
+
+Every chat completion goes through one `LLMScheduler`, which
+
+- paces requests with token buckets for requests/second and tokens/minute,
+- caps in-flight calls with an AIMD limit that halves on 429/5xx and
+  grows back by one slot per window of successes,
+- retries overload and network failures with full-jitter exponential
+  backoff, honouring `Retry-After` for every caller, not just the one
+  that got the 429 (a pause longer than `backoff_max` fails fast instead),
+- opens a circuit breaker after repeated failures so a dead provider
+  fails fast instead of tying up workers for the whole read timeout.
+
+The scheduler exposes the same `complete` / `complete_sync` interface as
+`LLMClient`, so the parser does not know whether it is there.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Callable, Deque, Dict, List, Optional
+
+import httpx
+
+from src import metrics
+from src.compaction import CHARS_PER_TOKEN
+
+# Statuses that mean "slow down", not "your request is wrong"
+OVERLOAD_STATUSES = {429, 500, 502, 503, 504, 529}
+
+LLM_RETRIES = metrics.REGISTRY.counter(
+    "resume_llm_retries_total",
+    "Chat-completion retries by reason (HTTP status or exception)",
+    ["reason"],
+)
+LLM_REJECTED = metrics.REGISTRY.counter(
+    "resume_llm_circuit_rejections_total",
+    "Chat-completion calls refused while the circuit breaker was open",
+)
+
+
+class CircuitOpenError(Exception):
+    """The provider failed repeatedly; calls are refused until the cool-down ends"""
+
+
+class TokenBucket:
+    """Reservation-style token bucket, safe across threads and event loops.
+
+    `reserve(n)` takes the tokens immediately (the balance may go negative)
+    and returns how long the caller must wait before using them, so waiters
+    are served in arrival order without a queue.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float = 1.0) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+    def refund(self, amount: float):
+        """Give back an over-estimate once the real cost is known"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+
+class AdaptiveConcurrency:
+    """AIMD in-flight limit shared by async and threaded callers"""
+
+    def __init__(self, initial: int = 8, minimum: int = 1, maximum: int = 32, decrease: float = 0.5):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.decrease = decrease
+        self.in_flight = 0
+        self._waiters: Deque[Callable[[], None]] = deque()
+        self._lock = threading.Lock()
+
+    def _try_enter(self, waiter: Optional[Callable[[], None]] = None) -> bool:
+        with self._lock:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            if waiter is not None:
+                self._waiters.append(waiter)
+            return False
+
+    def _wake(self):
+        with self._lock:
+            free = int(self.limit) - self.in_flight
+            woken = [self._waiters.popleft() for _ in range(min(free, len(self._waiters)))]
+        for wake in woken:
+            wake()
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            future = loop.create_future()
+
+            def wake(future=future):
+                loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+            if self._try_enter(wake):
+                return
+            try:
+                await future
+            except asyncio.CancelledError:
+                # Pass a wake-up we may have swallowed on to the next waiter
+                self._wake()
+                raise
+
+    def acquire_sync(self):
+        while True:
+            event = threading.Event()
+            if self._try_enter(event.set):
+                return
+            event.wait()
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._wake()
+
+    def on_success(self):
+        """Additive increase: one more slot per `limit` successes"""
+        with self._lock:
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+        self._wake()
+
+    def on_overload(self):
+        """Multiplicative decrease on 429/5xx"""
+        with self._lock:
+            self.limit = max(self.minimum, self.limit * self.decrease)
+
+
+class CircuitBreaker:
+    """Closed -> open after `threshold` consecutive failures -> half-open probe"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold: int = 5, reset_seconds: float = 30.0):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        if self.threshold <= 0:
+            return True
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+            # A probe that never reported back (cancelled) is replaced
+            stale = time.monotonic() - self._probe_started >= self.reset_seconds
+            if self.state == self.HALF_OPEN and (not self._probing or stale):
+                self._probing = True
+                self._probe_started = time.monotonic()
+                return True
+            return False
+
+    def retry_in(self) -> float:
+        return max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                if self.state != self.OPEN:
+                    print(f"⚡ LLM circuit open after {self.failures} failures")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class LLMScheduler:
+    """Rate-limited, adaptive, retrying front for an `LLMClient`"""
+
+    def __init__(
+        self,
+        client,
+        requests_per_second: float = 0.0,
+        burst: int = 5,
+        tokens_per_minute: int = 0,
+        initial_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32,
+        max_attempts: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        breaker_threshold: int = 5,
+        breaker_reset_seconds: float = 30.0,
+    ):
+        self.client = client
+        # 0 disables a limiter
+        self.requests = TokenBucket(requests_per_second, max(1, burst)) if requests_per_second > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute) if tokens_per_minute > 0 else None
+        self.concurrency = AdaptiveConcurrency(initial_concurrency, min_concurrency, max_concurrency)
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset_seconds)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Set from Retry-After; every caller waits it out, or fails fast
+        # when it is longer than backoff_max
+        self._paused_until = 0.0
+
+    @property
+    def endpoint(self) -> str:
+        return self.client.endpoint
+
+    def _estimate_tokens(self, messages: List[Dict], options: Dict) -> int:
+        chars = sum(len(str(m.get("content", ""))) for m in messages)
+        return chars // CHARS_PER_TOKEN + options.get("max_tokens", 1500)
+
+    def _admit(self) -> None:
+        if not self.breaker.allow():
+            LLM_REJECTED.inc()
+            raise CircuitOpenError(f"LLM circuit open, retry in {self.breaker.retry_in():.0f}s")
+        paused = self._paused_until - time.monotonic()
+        if paused > self.backoff_max:
+            LLM_REJECTED.inc()
+            raise CircuitOpenError(f"LLM provider asked us to back off, retry in {paused:.0f}s")
+
+    def _pacing_delay(self, estimate: int) -> float:
+        """Seconds to wait for the rate limiters and any Retry-After pause"""
+        delay = max(0.0, self._paused_until - time.monotonic())
+        if self.requests is not None:
+            delay = max(delay, self.requests.reserve(1))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.reserve(estimate))
+        return delay
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response]) -> Optional[float]:
+        """Retry-After when the provider sent one, else full-jitter exponential.
+
+        None when Retry-After exceeds `backoff_max`: not worth waiting for.
+        """
+        if response is not None:
+            retry_after = _retry_after_seconds(response)
+            if retry_after is not None:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+                return retry_after if retry_after <= self.backoff_max else None
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _settle(self, estimate: int, response: httpx.Response):
+        """Refund the token over-estimate using the provider's usage report"""
+        if self.tokens is None:
+            return
+        try:
+            usage = response.json().get("usage") or {}
+        except ValueError:
+            return
+        used = usage.get("total_tokens") or (
+            usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0)
+        )
+        if used:
+            self.tokens.refund(max(0, estimate - used))
+
+    def _outcome(self, response: Optional[httpx.Response], error: Optional[Exception]) -> Optional[str]:
+        """Retry reason, or None when the call is finished"""
+        if error is not None:
+            self.concurrency.on_overload()
+            self.breaker.record_failure()
+            return type(error).__name__
+        if response.status_code in OVERLOAD_STATUSES:
+            self.concurrency.on_overload()
+            # A 429 is the quota talking, not a sick provider
+            if response.status_code != 429:
+                self.breaker.record_failure()
+            return str(response.status_code)
+        # 2xx and 4xx are answers the provider was healthy enough to give
+        self.concurrency.on_success()
+        self.breaker.record_success()
+        return None
+
+    async def complete(self, messages: List[Dict], model: str, **options) -> httpx.Response:
+        estimate = self._estimate_tokens(messages, options)
+        for attempt in range(self.max_attempts):
+            self._admit()
+            delay = self._pacing_delay(estimate)
+            if delay:
+                await asyncio.sleep(delay)
+            await self.concurrency.acquire()
+            response, error = None, None
+            try:
+                response = await self.client.complete(messages, model, **options)
+            except httpx.TransportError as e:
+                error = e
+            finally:
+                self.concurrency.release()
+
+            reason = self._outcome(response, error)
+            if reason is None:
+                self._settle(estimate, response)
+                return response
+            if attempt + 1 == self.max_attempts:
+                break
+            wait = self._backoff(attempt, response)
+            if wait is None:
+                break
+            LLM_RETRIES.inc(reason=reason)
+            await asyncio.sleep(wait)
+
+        if error is not None:
+            raise error
+        return response
+
+    def complete_sync(self, messages: List[Dict], model: str, **options) -> httpx.Response:
+        """Blocking equivalent of `complete`, sharing the same limits"""
+        estimate = self._estimate_tokens(messages, options)
+        for attempt in range(self.max_attempts):
+            self._admit()
+            delay = self._pacing_delay(estimate)
+            if delay:
+                time.sleep(delay)
+            self.concurrency.acquire_sync()
+            response, error = None, None
+            try:
+                response = self.client.complete_sync(messages, model, **options)
+            except httpx.TransportError as e:
+                error = e
+            finally:
+                self.concurrency.release()
+
+            reason = self._outcome(response, error)
+            if reason is None:
+                self._settle(estimate, response)
+                return response
+            if attempt + 1 == self.max_attempts:
+                break
+            wait = self._backoff(attempt, response)
+            if wait is None:
+                break
+            LLM_RETRIES.inc(reason=reason)
+            time.sleep(wait)
+
+        if error is not None:
+            raise error
+        return response
+
+    def stats(self) -> Dict:
+        return {
+            "concurrency_limit": int(self.concurrency.limit),
+            "in_flight": self.concurrency.in_flight,
+            "breaker": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 2),
+        }
+
+    async def warm_up(self):
+        # Not a completion: bypasses the rate limits and the breaker
+        await self.client.warm_up()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    def close(self):
+        self.client.close()
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """`Retry-After` as seconds; accepts delta-seconds or an HTTP date"""
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
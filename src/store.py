@@ -0,0 +1,264 @@
+"""
+Persistent store of parsed resumes with inverted indexes for search.
+
+Every validated result is kept as one compact JSON row keyed by the
+upload's SHA-256. Skills, job titles, companies, institutions and
+certifications are normalised and written to a postings table clustered
+by (field, term, resume), so a boolean query is a handful of index seeks:
+the rarest clause drives the scan and every other clause is a point
+lookup, with no LLM involved.
+
+    skill=kubernetes&title=senior          both
+    skill=kubernetes|k8s                   either term
+    skill=python&skill=-java               python but not java
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src import decoding
+
+# Query parameter -> small integer stored in the postings table
+INDEXED_FIELDS = {
+    "skill": 1,
+    "title": 2,
+    "company": 3,
+    "institution": 4,
+    "certification": 5,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumes (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    filename TEXT,
+    partial INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    field INTEGER NOT NULL,
+    term TEXT NOT NULL,
+    resume_id INTEGER NOT NULL,
+    PRIMARY KEY (field, term, resume_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS term_counts (
+    field INTEGER NOT NULL,
+    term TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (field, term)
+) WITHOUT ROWID;
+"""
+
+# Keep symbols that carry meaning in skill names: c++, c#, node.js
+TERM_SPLIT_RE = re.compile(r"[^\w+#.]+")
+
+
+def normalize_term(value: str) -> str:
+    """"  AWS (EC2, S3) " -> "aws ec2 s3" """
+    words = (w.strip(".") for w in TERM_SPLIT_RE.split(str(value).lower()))
+    return " ".join(w for w in words if w)
+
+
+def _field_values(result: Dict, field: str) -> Iterable[str]:
+    if field == "skill":
+        return result.get("skills") or []
+    if field == "certification":
+        return result.get("certifications") or []
+    if field in ("title", "company"):
+        return [job.get(field) for job in result.get("experience") or [] if job.get(field)]
+    if field == "institution":
+        return [edu.get(field) for edu in result.get("education") or [] if edu.get(field)]
+    return []
+
+
+def index_terms(result: Dict) -> List[Tuple[int, str]]:
+    """(field id, term) pairs for a result: each whole value plus its words"""
+    pairs = set()
+    for field, field_id in INDEXED_FIELDS.items():
+        for value in _field_values(result, field):
+            phrase = normalize_term(value)
+            if not phrase:
+                continue
+            pairs.add((field_id, phrase))
+            for word in phrase.split():
+                pairs.add((field_id, word))
+    return sorted(pairs)
+
+
+class SearchError(ValueError):
+    """Query the store cannot answer (e.g. only negated clauses)"""
+
+
+class ResumeStore:
+    """SQLite-backed resume store; safe to share between threads"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def save(self, content_hash: str, filename: Optional[str], result: Dict, replace: bool = True):
+        """Store (or refresh) one result and its index terms"""
+        self.save_many([(content_hash, filename, result)], replace)
+
+    def save_many(self, rows: List[Tuple[str, Optional[str], Dict]], replace: bool = True):
+        """Store several results in one transaction"""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                for content_hash, filename, result in rows:
+                    self._save(content_hash, filename, result, replace, now)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _save(self, content_hash: str, filename: Optional[str], result: Dict, replace: bool, now: float):
+        existing = self._db.execute(
+            "SELECT id, data FROM resumes WHERE hash = ?", (content_hash,)
+        ).fetchone()
+        if existing is not None and not replace:
+            return
+        data = {k: v for k, v in result.items() if k != "llm_error"}
+        terms = index_terms(data)
+
+        if existing is not None:
+            resume_id, old = existing
+            # Drop the old postings by primary key; no per-resume index needed
+            old_terms = index_terms(decoding.loads(old))
+            self._db.executemany(
+                "DELETE FROM postings WHERE field = ? AND term = ? AND resume_id = ?",
+                [(f, t, resume_id) for f, t in old_terms],
+            )
+            self._db.executemany(
+                "UPDATE term_counts SET n = n - 1 WHERE field = ? AND term = ?", old_terms
+            )
+            self._db.execute(
+                "UPDATE resumes SET filename = ?, partial = ?, data = ?, updated_at = ? WHERE id = ?",
+                (filename, int(bool(data.get("partial"))), decoding.dumps(data), now, resume_id),
+            )
+        else:
+            resume_id = self._db.execute(
+                "INSERT INTO resumes (hash, filename, partial, data, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (content_hash, filename, int(bool(data.get("partial"))), decoding.dumps(data), now),
+            ).lastrowid
+
+        self._db.executemany(
+            "INSERT OR IGNORE INTO postings (field, term, resume_id) VALUES (?, ?, ?)",
+            [(f, t, resume_id) for f, t in terms],
+        )
+        self._db.executemany(
+            "INSERT INTO term_counts (field, term, n) VALUES (?, ?, 1) "
+            "ON CONFLICT (field, term) DO UPDATE SET n = n + 1",
+            terms,
+        )
+
+    def get(self, content_hash: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT hash, filename, data, updated_at FROM resumes WHERE hash = ?",
+                (content_hash,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"hash": row[0], "filename": row[1], "updated_at": row[3], "data": decoding.loads(row[2])}
+
+    def search(self, clauses: Dict[str, List[str]], limit: int = 20, offset: int = 0) -> Dict:
+        """Resumes matching every clause, newest first.
+
+        `clauses` maps a field ("skill", "title", ...) to query values; a
+        value may list alternatives as "a|b" and is negated by a leading "-".
+        """
+        positive: List[Tuple[int, List[str]]] = []
+        negative: List[Tuple[int, List[str]]] = []
+        for field, values in clauses.items():
+            if field not in INDEXED_FIELDS:
+                raise SearchError(f"Unknown search field: {field}")
+            for value in values:
+                negate = value.startswith("-")
+                terms = [normalize_term(v) for v in value.lstrip("-").split("|")]
+                terms = [t for t in terms if t]
+                if terms:
+                    (negative if negate else positive).append((INDEXED_FIELDS[field], terms))
+        if not positive:
+            raise SearchError("At least one non-negated search term is required")
+
+        started = time.perf_counter()
+        with self._lock:
+            # The rarest clause drives the scan; the rest are index probes
+            positive.sort(key=lambda clause: self._estimate(*clause))
+            (field, terms), others = positive[0], positive[1:]
+            sql = [
+                "SELECT DISTINCT p.resume_id FROM postings p",
+                f"WHERE p.field = ? AND p.term IN ({','.join('?' * len(terms))})",
+            ]
+            params: list = [field, *terms]
+            for negate, group in ((False, others), (True, negative)):
+                for field, terms in group:
+                    sql.append(
+                        f"AND {'NOT ' if negate else ''}EXISTS (SELECT 1 FROM postings q "
+                        f"WHERE q.field = ? AND q.term IN ({','.join('?' * len(terms))}) "
+                        "AND q.resume_id = p.resume_id)"
+                    )
+                    params += [field, *terms]
+            sql.append("ORDER BY p.resume_id DESC LIMIT ? OFFSET ?")
+            # One extra row tells whether another page exists
+            params += [limit + 1, offset]
+            ids = [row[0] for row in self._db.execute(" ".join(sql), params)]
+
+            rows = []
+            if ids[:limit]:
+                found = self._db.execute(
+                    f"SELECT id, hash, filename, partial, data FROM resumes "
+                    f"WHERE id IN ({','.join('?' * len(ids[:limit]))})",
+                    ids[:limit],
+                ).fetchall()
+                by_id = {row[0]: row for row in found}
+                rows = [by_id[i] for i in ids[:limit] if i in by_id]
+
+        return {
+            "results": [_summary(*row[1:]) for row in rows],
+            "count": len(rows),
+            "offset": offset,
+            "has_more": len(ids) > limit,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def _estimate(self, field: int, terms: List[str]) -> int:
+        total = 0
+        for term in terms:
+            row = self._db.execute(
+                "SELECT n FROM term_counts WHERE field = ? AND term = ?", (field, term)
+            ).fetchone()
+            total += row[0] if row else 0
+        return total
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _summary(content_hash: str, filename: Optional[str], partial: int, data: str) -> Dict:
+    result = decoding.loads(data)
+    return {
+        "hash": content_hash,
+        "filename": filename,
+        "name": result.get("name"),
+        "email": result.get("email"),
+        "location": result.get("location"),
+        "titles": [job.get("title") for job in result.get("experience") or [] if job.get("title")],
+        "skills": result.get("skills") or [],
+        "partial": bool(partial),
+    }
@@ -0,0 +1,136 @@
+"""Bounded-memory upload ingestion.
+
+Uploads are read in fixed-size chunks: the first chunk is sniffed for a
+resume format, every chunk is hashed on the fly, and reading stops as soon
+as the per-file byte cap is crossed. `UploadLimitMiddleware` applies the
+per-request cap to the raw request body, so oversize requests are
+rejected before the multipart parser spools them.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from fastapi import UploadFile
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.extraction import SNIFF_BYTES, detect_format
+
+
+class UploadTooLarge(Exception):
+    """Upload (or the whole request) is over its byte cap"""
+
+
+class UnsupportedUpload(Exception):
+    """Payload is not a PDF, DOCX or text resume"""
+
+
+@dataclass
+class Upload:
+    filename: Optional[str]
+    content: bytes
+    sha256: str
+    kind: str
+
+
+async def read_upload(
+    file: UploadFile,
+    max_bytes: int,
+    chunk_size: int = 64 * 1024,
+) -> Upload:
+    """Read one upload chunk by chunk, rejecting it as early as possible"""
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLarge("File too large")
+
+    hasher = hashlib.sha256()
+    buffer = bytearray()
+    kind = None
+    chunk_size = max(chunk_size, SNIFF_BYTES)
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        if kind is None:
+            try:
+                kind = detect_format(chunk, file.filename)
+            except ValueError as e:
+                raise UnsupportedUpload(str(e))
+        if len(buffer) + len(chunk) > max_bytes:
+            raise UploadTooLarge("File too large")
+        hasher.update(chunk)
+        buffer += chunk
+
+    if kind is None:
+        raise UnsupportedUpload("Empty file")
+    return Upload(file.filename, bytes(buffer), hasher.hexdigest(), kind)
+
+
+class UploadLimitMiddleware:
+    """Reject request bodies over `max_bytes` on the upload endpoints.
+
+    A declared Content-Length over the cap is refused before any body is
+    read; otherwise bytes are counted as they arrive and the request is
+    cut off at the first chunk that crosses the cap.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int, paths: Iterable[str]):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = set(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        declared = headers.get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > self.max_bytes:
+            await self._reject(send)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    exceeded = True
+                    raise UploadTooLarge(f"Request exceeds {self.max_bytes} bytes")
+            return message
+
+        async def limited_send(message: Message):
+            nonlocal response_started
+            if exceeded:
+                # The app turned our error into its own (e.g. a 400 body
+                # parse error); answer 413 instead
+                if not response_started:
+                    response_started = True
+                    await self._reject(send)
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, limited_send)
+        except UploadTooLarge:
+            if not response_started:
+                await self._reject(send)
+
+    async def _reject(self, send: Send):
+        body = b'{"detail":"Request too large"}'
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
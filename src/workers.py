@@ -0,0 +1,90 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+from src import extraction
+
+
+class WorkerPools:
+    """Executors that keep blocking work off the event loop.
+
+    CPU-bound extraction (pdfplumber layout analysis) goes to a process pool
+    so it does not hold the GIL against request handling; blocking I/O such as
+    temp-file writes goes to a thread pool. With `cpu_workers=0` extraction
+    falls back to the thread pool, which suits very small containers.
+    """
+
+    def __init__(self, cpu_workers: int = 2, io_workers: int = 16):
+        self.cpu_workers = cpu_workers
+        self.io_workers = io_workers
+        self._cpu: Optional[Executor] = None
+        self._io: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def io(self) -> ThreadPoolExecutor:
+        if self._io is None:
+            self._io = ThreadPoolExecutor(
+                max_workers=self.io_workers, thread_name_prefix="resume-io"
+            )
+        return self._io
+
+    @property
+    def cpu(self) -> Executor:
+        if self._cpu is None:
+            if self.cpu_workers > 0:
+                # spawn: forking a process that already runs an event loop
+                # and HTTP pool threads is not safe
+                self._cpu = ProcessPoolExecutor(
+                    max_workers=self.cpu_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._cpu = self.io
+        return self._cpu
+
+    async def run_cpu(self, fn: Callable, *args):
+        """Run `fn` in the extraction pool.
+
+        A worker that dies (say OOM on a hostile PDF) breaks a process pool
+        for good, so the pool is replaced and the call retried once.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self.cpu
+        try:
+            return await loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            self._replace_cpu(executor)
+            return await loop.run_in_executor(self.cpu, fn, *args)
+
+    def _replace_cpu(self, broken: Executor):
+        # Only the first caller to see this pool broken replaces it
+        if self._cpu is broken:
+            print("⚠️ Extraction worker died, restarting the process pool")
+            self._cpu = None
+            broken.shutdown(wait=False, cancel_futures=True)
+
+    async def run_io(self, fn: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.io, fn, *args)
+
+    async def warm_up(self):
+        """Start the extraction processes and import the PDF stack in them.
+
+        Spawned workers otherwise pay interpreter start-up and pdfminer
+        imports on the first uploads they receive.
+        """
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self.cpu, extraction.warm_up)
+            for _ in range(max(1, self.cpu_workers))
+        ))
+
+    def shutdown(self):
+        if self._cpu is not None and self._cpu is not self._io:
+            self._cpu.shutdown(wait=False, cancel_futures=True)
+        if self._io is not None:
+            self._io.shutdown(wait=False, cancel_futures=True)
+        self._cpu = None
+        self._io = None
@@ -0,0 +1,82 @@
+import asyncio
+import importlib
+import sys
+
+import httpx
+import pytest
+
+from benchmarks.mock_llm import create_app
+from src.llm_client import LLMClient
+from src.providers import LLMRouter, OpenAIBackend
+
+
+class MockLLMClient(LLMClient):
+    """LLMClient that talks to benchmarks/mock_llm.py in-process"""
+
+    def __init__(self, app):
+        super().__init__("test-key", "http://mock-llm/chat/completions", http2=False)
+        self.app = app
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=self.app),
+                timeout=self.timeout,
+                headers=self.headers,
+            )
+            self._async_loop = loop
+        return self._async_client
+
+
+@pytest.fixture
+def mock_backend():
+    """Factory for (backend, stats) backed by its own mock LLM app.
+
+    Keyword arguments go to `create_app`; latency defaults to 0.
+    """
+    def make(name="mock", cost_per_1k_tokens=0.0, **options):
+        app = create_app(**{"latency": 0.0, **options})
+        backend = OpenAIBackend(
+            MockLLMClient(app), model=name, name=name,
+            cost_per_1k_tokens=cost_per_1k_tokens, json_mode=False
+        )
+        return backend, app.state.stats
+
+    return make
+
+
+@pytest.fixture
+def mock_llm(mock_backend):
+    """Factory for (router, stats) over a single mock backend"""
+    def make(**options):
+        backend, stats = mock_backend(**options)
+        return LLMRouter([backend]), stats
+
+    return make
+
+
+@pytest.fixture
+def load_api(tmp_path, monkeypatch):
+    """Factory that (re)imports src.api under the given settings.
+
+    Keyword arguments are environment variables; databases go to tmp_path
+    and no in-process job workers are started.
+    """
+    from src import config
+
+    def load(**env):
+        defaults = {
+            "JOBS_DB_PATH": str(tmp_path / "jobs.db"),
+            "STORE_DB_PATH": str(tmp_path / "resumes.db"),
+            "JOBS_WORKERS": "0",
+            "EXTRACT_PROCESS_WORKERS": "0",
+        }
+        for name, value in {**defaults, **env}.items():
+            monkeypatch.setenv(name, str(value))
+        monkeypatch.setattr(config, "_settings", None)
+        if "src.api" in sys.modules:
+            return importlib.reload(sys.modules["src.api"])
+        return importlib.import_module("src.api")
+
+    return load
@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+from src.admission import AdmissionController, Overloaded, client_id, parse_trusted_proxies
+
+
+def controller(**kwargs) -> AdmissionController:
+    options = dict(max_in_flight=1, max_queue=10, max_queue_per_client=10,
+                   queue_timeout=5.0, initial_service_time=0.01)
+    return AdmissionController(**{**options, **kwargs})
+
+
+async def queue(admission, client, label, log, deadline=True):
+    """Wait for a slot and log `label` (or the refusal reason)"""
+    try:
+        await admission.acquire(client, deadline)
+        log.append(label)
+    except Overloaded as e:
+        log.append(f"{label}:{e.reason}")
+
+
+async def settle():
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def test_slots_are_handed_out_round_robin():
+    async def scenario():
+        admission = controller()
+        await admission.acquire("holder")
+        log = []
+        waiters = [asyncio.create_task(queue(admission, "bulk", f"bulk{i}", log)) for i in range(3)]
+        await settle()
+        waiters.append(asyncio.create_task(queue(admission, "user", "user", log)))
+        await settle()
+        for _ in waiters:
+            admission.release()
+            await settle()
+        return log
+
+    assert asyncio.run(scenario()) == ["bulk0", "user", "bulk1", "bulk2"]
+
+
+def test_full_queue_sheds_heaviest_clients_newest_waiter():
+    async def scenario():
+        admission = controller(max_queue=2)
+        await admission.acquire("holder")
+        log = []
+        for i in range(2):
+            asyncio.create_task(queue(admission, "bulk", f"bulk{i}", log))
+        await settle()
+        asyncio.create_task(queue(admission, "user", "user", log))
+        await settle()
+        shed = list(log)
+        admission.release()
+        await settle()
+        return shed, log, admission.stats()
+
+    shed, log, stats = asyncio.run(scenario())
+    assert shed == ["bulk1:shed"]
+    assert log == ["bulk1:shed", "bulk0"]
+    assert stats["queued"] == 1
+
+
+def test_per_client_queue_limit():
+    async def scenario():
+        admission = controller(max_queue_per_client=2)
+        await admission.acquire("holder")
+        for _ in range(2):
+            asyncio.create_task(admission.acquire("bulk"))
+        await settle()
+        with pytest.raises(Overloaded) as refused:
+            admission.check("bulk")
+        admission.check("user")
+        return refused.value
+
+    refused = asyncio.run(scenario())
+    assert refused.reason == "client_queue_full"
+    assert refused.retry_after >= 1
+
+
+def test_waiters_without_deadline_are_not_shed_or_counted():
+    async def scenario():
+        admission = controller(max_queue=1)
+        await admission.acquire("holder")
+        log = []
+        for i in range(3):
+            asyncio.create_task(queue(admission, "batch", f"batch{i}", log, deadline=False))
+        await settle()
+        asyncio.create_task(queue(admission, "user", "user", log))
+        await settle()
+        return log, admission.stats()
+
+    log, stats = asyncio.run(scenario())
+    assert log == []
+    assert stats["queued"] == 4
+
+
+def test_queue_timeout_refuses_and_forgets_waiter():
+    async def scenario():
+        admission = controller(queue_timeout=0.05)
+        await admission.acquire("holder")
+        log = []
+        await queue(admission, "user", "user", log)
+        return log, admission.stats()
+
+    log, stats = asyncio.run(scenario())
+    assert log == ["user:deadline"]
+    assert stats["queued"] == 0
+
+
+def test_predicted_wait_over_timeout_is_refused_up_front():
+    admission = controller(max_queue=100, max_queue_per_client=100,
+                           queue_timeout=1.0, initial_service_time=2.0)
+    admission.in_flight = 1
+    with pytest.raises(Overloaded) as refused:
+        admission.check("user")
+    assert refused.value.reason == "deadline"
+    assert refused.value.retry_after == 2
+
+
+def scope(peer, **headers):
+    return {
+        "client": (peer, 5000),
+        "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()],
+    }
+
+
+def test_client_headers_ignored_from_untrusted_peer():
+    trusted = parse_trusted_proxies("10.0.0.0/8")
+    request = scope("203.0.113.9", x_client_id="spoofed", x_forwarded_for="198.51.100.1")
+    assert client_id(request, trusted) == "203.0.113.9"
+    assert client_id(request) == "203.0.113.9"
+
+
+def test_client_headers_from_trusted_proxy():
+    trusted = parse_trusted_proxies("10.0.0.0/8, 127.0.0.1")
+    assert client_id(scope("127.0.0.1", x_client_id="session-1"), trusted) == "session-1"
+    # Rightmost hop that is not one of our proxies; the left end is client-controlled
+    forwarded = scope("10.0.0.2", x_forwarded_for="198.51.100.1, 203.0.113.9, 10.0.0.7")
+    assert client_id(forwarded, trusted) == "203.0.113.9"
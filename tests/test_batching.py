@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+import httpx
+
+from src.parser import ResumeParser
+
+
+def resume(number: int) -> str:
+    return (f"Candidate {number}\ncandidate{number}@example.com\n"
+            f"EXPERIENCE\nEngineer at Acme number {number}, shipping services")
+
+
+def batching_parser(router, size=3) -> ResumeParser:
+    return ResumeParser("test-key", router=router, micro_batch_size=size, micro_batch_window=0.5)
+
+
+async def parse_all(parser, texts):
+    try:
+        return await asyncio.gather(
+            *(parser.parse_with_llm_async(text, micro_batch=True) for text in texts)
+        )
+    finally:
+        await parser.aclose()
+
+
+def test_shuffled_batch_answers_land_on_their_own_resume(mock_llm):
+    router, stats = mock_llm(shuffle_batches=True, seed=1)  # answers as 3, 1, 2
+    parser = batching_parser(router)
+    results = asyncio.run(parse_all(parser, [resume(n) for n in (1, 2, 3)]))
+    assert stats["requests"] == 1
+    assert [r["name"] for r in results] == ["Jane Doe 1", "Jane Doe 2", "Jane Doe 3"]
+    assert [r["email"] for r in results] == [f"candidate{n}@example.com" for n in (1, 2, 3)]
+
+
+class ScriptedRouter:
+    """Router stand-in that answers the batch with `answer`, then singles"""
+
+    model = "scripted"
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.calls = []
+
+    async def complete(self, messages, decode, **options):
+        prompt = messages[0]["content"]
+        self.calls.append(prompt)
+        if "=== RESUME" in prompt:
+            content = json.dumps(self.answer)
+        else:
+            content = json.dumps({"name": "Single " + prompt.split("Candidate ")[1][0]})
+        body = {"choices": [{"message": {"content": content}}]}
+        return decode(httpx.Response(200, json=body))
+
+    async def aclose(self):
+        pass
+
+
+def test_unmatched_batch_answers_are_parsed_individually():
+    router = ScriptedRouter([
+        {"resume": 1, "name": "Jane Doe 1", "email": "candidate1@example.com"},
+        # Answer for resume 3, numbered 2 and carrying its email
+        {"resume": 2, "name": "Jane Doe 3", "email": "candidate3@example.com"},
+        # No number: it could be anyone's
+        {"name": "Jane Doe 3"},
+    ])
+    parser = batching_parser(router)
+    results = asyncio.run(parse_all(parser, [resume(n) for n in (1, 2, 3)]))
+    assert len(router.calls) == 3
+    assert [r["name"] for r in results] == ["Jane Doe 1", "Single 2", "Single 3"]
@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+from src.cache import ResultCache
+from src.parser import ResumeParser
+
+RESUME = b"Jane Doe\njane@example.com\nEXPERIENCE\nEngineer at Acme, shipping billing services"
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.set("a", {"n": 1})
+    cache.set("b", {"n": 2})
+    assert cache.get("a") == {"n": 1}
+    cache.set("c", {"n": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"n": 1}
+
+
+def test_expired_entries_are_misses():
+    cache = ResultCache(ttl_seconds=0.05)
+    cache.set("a", {"n": 1})
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_sqlite_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    ResultCache(sqlite_path=path).set("a", {"n": 1})
+    reopened = ResultCache(sqlite_path=path)
+    assert reopened.persistent
+    assert reopened.get("a") == {"n": 1}
+    assert reopened.stats()["disk_hits"] == 1
+
+
+def test_key_covers_settings_that_change_the_prompt():
+    base = ResumeParser("test-key").cache_key(RESUME)
+    assert ResumeParser("test-key").cache_key(RESUME) == base
+    for options in ({"token_budget": 2000}, {"max_chunks": 3}, {"pre_extract": False}):
+        assert ResumeParser("test-key", **options).cache_key(RESUME) != base
+    # Only results it never caches depend on the fallback
+    assert ResumeParser("test-key", rules_fallback=False).cache_key(RESUME) == base
+
+
+def test_identical_upload_is_served_from_cache(mock_llm):
+    router, stats = mock_llm()
+    cache = ResultCache()
+
+    async def parse_twice(budget):
+        parser = ResumeParser("test-key", router=router, cache=cache, token_budget=budget)
+        return [await parser.parse_bytes_async(RESUME, "cv.txt") for _ in range(2)]
+
+    first, again = asyncio.run(parse_twice(1250))
+    assert first == again
+    assert stats["requests"] == 1
+    asyncio.run(parse_twice(2000))
+    assert stats["requests"] == 2
@@ -0,0 +1,71 @@
+from io import BytesIO
+
+import pytest
+from docx import Document
+
+from src import cli, parser as parser_module
+from src.parser import ResumeParser
+
+
+def write_docx(path, lines):
+    doc = Document()
+    for line in lines:
+        doc.add_paragraph(line)
+    out = BytesIO()
+    doc.save(out)
+    path.write_bytes(out.getvalue())
+
+
+@pytest.fixture
+def corpus(tmp_path, mock_llm, monkeypatch):
+    """Two resumes on disk and a parser wired to the mock LLM"""
+    source = tmp_path / "resumes"
+    source.mkdir()
+    for n in (1, 2):
+        write_docx(source / f"cv{n}.docx", [f"Candidate {n}", f"candidate{n}@example.com",
+                                            "EXPERIENCE", f"Engineer at Acme {n}"])
+    router, stats = mock_llm()
+    monkeypatch.setattr(parser_module, "build_parser", lambda settings: ResumeParser(
+        "test-key", router=router
+    ))
+    return source, tmp_path / "out.jsonl", stats
+
+
+def ingest(source, out, *options):
+    return cli.main(["ingest", str(source), "--out", str(out), "--extract-workers", "0",
+                     "--progress-every", "60", *options])
+
+
+def test_rerun_skips_files_already_done(corpus, capsys):
+    source, out, stats = corpus
+    assert ingest(source, out) == 0
+    assert stats["requests"] == 2
+    assert ingest(source, out) == 0
+    assert stats["requests"] == 2
+    assert "0 parsed, 2 skipped" in capsys.readouterr().out
+    assert len(out.read_text().splitlines()) == 2
+
+
+def test_rules_only_checkpoint_does_not_skip_full_run(corpus, capsys):
+    source, out, stats = corpus
+    assert ingest(source, out, "--mode", "rules") == 0
+    assert stats["requests"] == 0
+    assert ingest(source, out) == 0
+    assert stats["requests"] == 2
+    assert "2 parsed, 0 skipped" in capsys.readouterr().out
+    # A full parse covers a later rules run
+    assert ingest(source, out, "--mode", "rules") == 0
+    assert "0 parsed, 2 skipped" in capsys.readouterr().out.splitlines()[-1]
+
+
+def test_half_written_line_is_dropped_and_redone(corpus):
+    source, out, stats = corpus
+    assert ingest(source, out) == 0
+    lines = out.read_text().splitlines()
+    # Killed while writing the second result, before its checkpoint line
+    out.write_text(lines[0] + "\n" + lines[1][:20])
+    checkpoint = out.parent / "out.jsonl.checkpoint"
+    checkpoint.write_text(checkpoint.read_text().splitlines()[0] + "\n")
+    assert ingest(source, out) == 0
+    assert stats["requests"] == 3
+    assert len(out.read_text().splitlines()) == 2
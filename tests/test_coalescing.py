@@ -0,0 +1,51 @@
+import asyncio
+
+from src.parser import ResumeParser
+
+RESUME = b"Jane Doe\njane@example.com\nEXPERIENCE\nEngineer at Acme, shipping billing services"
+
+
+def parser_for(mock_llm, latency=0.2):
+    router, stats = mock_llm(latency=latency)
+    return ResumeParser("test-key", router=router), stats
+
+
+def test_identical_uploads_share_one_llm_call(mock_llm):
+    parser, stats = parser_for(mock_llm)
+
+    async def scenario():
+        return await asyncio.gather(*(parser.parse_bytes_async(RESUME, "cv.txt") for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert stats["requests"] == 1
+    assert all(r == results[0] for r in results)
+    assert results[0]["email"] == "jane@example.com"
+
+
+def test_cancelling_first_caller_keeps_the_others(mock_llm):
+    parser, stats = parser_for(mock_llm)
+
+    async def scenario():
+        callers = [asyncio.create_task(parser.parse_bytes_async(RESUME, "cv.txt")) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        callers[0].cancel()
+        return await asyncio.gather(*callers, return_exceptions=True)
+
+    first, *others = asyncio.run(scenario())
+    assert isinstance(first, asyncio.CancelledError)
+    assert all(r["name"] == "Jane Doe" for r in others)
+    assert stats["requests"] == 1
+
+
+def test_caller_after_last_cancel_starts_a_new_run(mock_llm):
+    parser, stats = parser_for(mock_llm)
+
+    async def scenario():
+        caller = asyncio.create_task(parser.parse_bytes_async(RESUME, "cv.txt"))
+        await asyncio.sleep(0.05)
+        caller.cancel()
+        await asyncio.sleep(0)
+        # Arrives once the run is cancelled, before it has wound down
+        return await parser.parse_bytes_async(RESUME, "cv.txt")
+
+    assert asyncio.run(scenario())["name"] == "Jane Doe"
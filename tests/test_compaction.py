@@ -0,0 +1,84 @@
+from io import BytesIO
+
+from docx import Document
+
+from src import compaction, extraction
+from src.parser import EXTRACT_HEADROOM, ResumeParser
+
+
+def long_resume_docx(bullets: int = 150) -> bytes:
+    """Experience long enough to blow the prompt budget, education last"""
+    doc = Document()
+    for line in ("Jane Doe", "jane@example.com", "EXPERIENCE"):
+        doc.add_paragraph(line)
+    for i in range(bullets):
+        doc.add_paragraph(f"Led migration project {i} across payment and billing services for Acme Corp")
+    for line in ("EDUCATION", "MSc Computer Science, University of Leeds, 2015",
+                 "CERTIFICATIONS", "AWS Solutions Architect"):
+        doc.add_paragraph(line)
+    out = BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def test_allocate_keeps_everything_under_budget():
+    sections = {"header": "a" * 40, "skills": "b" * 80}
+    assert compaction.allocate(sections, 100) == {"header": 10, "skills": 20}
+
+
+def test_allocate_lets_small_sections_keep_their_text():
+    sections = {"experience": "x" * 40_000, "education": "y" * 200, "certifications": "z" * 40}
+    allocation = compaction.allocate(sections, 1000)
+    assert sum(allocation.values()) <= 1000
+    assert allocation["education"] == 50
+    assert allocation["certifications"] == 10
+    assert allocation["experience"] == 1000 - 60
+
+
+def test_fit_to_budget_keeps_trailing_sections():
+    sections = {
+        "header": "Jane Doe",
+        "experience": "\n".join(f"Bullet {i} " + "x" * 60 for i in range(500)),
+        "education": "MSc, University of Leeds",
+    }
+    prompt = compaction.fit_to_budget(sections, 500)
+    assert compaction.estimate_tokens(prompt) <= 510
+    assert "University of Leeds" in prompt
+
+
+def test_normalize_drops_page_furniture():
+    page = "Jane Doe - Resume\nWork line {n}\nPage {n} of 3"
+    text = "\n".join(page.format(n=n) for n in (1, 2, 3))
+    assert compaction.normalize(text) == "Jane Doe - Resume\nWork line 1\nWork line 2\nWork line 3"
+
+
+def test_plan_chunks_splits_long_resume_by_section():
+    sections = {
+        "header": "Jane Doe",
+        "experience": "e" * 8000,
+        "education": "d" * 3000,
+    }
+    chunks = compaction.plan_chunks(sections, ["name", "experience", "education"], 1000, max_chunks=3)
+    assert [fields for fields, _ in chunks] == [["name"], ["experience"], ["education"]]
+    assert all(compaction.estimate_tokens(text) <= 1010 for _, text in chunks)
+
+
+def test_long_resume_keeps_education_in_prompt():
+    parser = ResumeParser("test-key")
+    content = long_resume_docx()
+    text, _ = extraction.extract_text_with_stats(content, "resume.docx", parser.extract_char_budget)
+    assert compaction.estimate_tokens(text) > 2 * parser.token_budget
+    _, chunks = parser._plan(text)
+    prompt = "\n".join(chunk for _, chunk in chunks)
+    assert "University of Leeds" in prompt
+    assert "AWS Solutions Architect" in prompt
+
+
+def test_extraction_stops_at_a_multiple_of_the_prompt_budget():
+    parser = ResumeParser("test-key", token_budget=1000, max_chunks=2)
+    assert parser.extract_char_budget == 1000 * compaction.CHARS_PER_TOKEN * 2 * EXTRACT_HEADROOM
+    text, _ = extraction.extract_text_with_stats(
+        long_resume_docx(2000), "resume.docx", parser.extract_char_budget
+    )
+    assert parser.extract_char_budget <= len(text) < parser.extract_char_budget + 1000
+    assert "University of Leeds" not in text
@@ -0,0 +1,48 @@
+import pytest
+
+from src.decoding import extract_json
+
+
+def test_plain_object():
+    assert extract_json('{"name": "Jane"}') == ({"name": "Jane"}, False)
+
+
+def test_markdown_fence_and_prose_are_skipped():
+    content = 'Sure! Here it is:\n```json\n{"name": "Jane", "skills": ["Python"]}\n```\nHope that helps.'
+    assert extract_json(content) == ({"name": "Jane", "skills": ["Python"]}, False)
+
+
+def test_trailing_prose_with_braces():
+    content = '{"name": "Jane"}\nNote: fields like {phone} were missing.'
+    assert extract_json(content, "{") == ({"name": "Jane"}, False)
+
+
+def test_brackets_and_escaped_quotes_inside_strings():
+    content = 'Result: {"summary": "Built \\"fast\\" {APIs} [v2]", "skills": []} done'
+    value, repaired = extract_json(content)
+    assert value == {"summary": 'Built "fast" {APIs} [v2]', "skills": []}
+    assert not repaired
+
+
+def test_expect_array_skips_leading_object():
+    content = 'Meta {"count": 2} then [{"name": "A"}, {"name": "B"}]'
+    assert extract_json(content, "[") == ([{"name": "A"}, {"name": "B"}], False)
+
+
+def test_truncated_answer_is_repaired():
+    content = '{"name": "Jane", "skills": ["Python", "SQL"], "experience": [{"title": "Eng'
+    value, repaired = extract_json(content)
+    assert repaired
+    assert value == {"name": "Jane", "skills": ["Python", "SQL"]}
+
+
+def test_truncated_array_keeps_complete_items():
+    content = '[{"name": "A"}, {"name": "B"}, {"name": "C'
+    value, repaired = extract_json(content, "[")
+    assert repaired
+    assert value == [{"name": "A"}, {"name": "B"}]
+
+
+def test_no_json_raises():
+    with pytest.raises(ValueError):
+        extract_json("I could not parse this resume.")
@@ -0,0 +1,23 @@
+from fastapi.testclient import TestClient
+
+ORIGIN = {"Origin": "http://frontend.example"}
+
+
+def test_admission_rejection_is_readable_cross_origin(load_api):
+    api = load_api(ADMISSION_MAX_IN_FLIGHT=1, ADMISSION_QUEUE_TIMEOUT=0.001)
+    api.admission.in_flight = 1
+    response = TestClient(api.app).post(
+        "/parse", headers=ORIGIN, files={"file": ("cv.txt", b"Jane Doe")}
+    )
+    assert response.status_code == 503
+    assert response.headers["access-control-allow-origin"] == ORIGIN["Origin"]
+    assert "retry-after" in response.headers["access-control-expose-headers"].lower()
+
+
+def test_oversized_request_is_readable_cross_origin(load_api):
+    api = load_api(MAX_REQUEST_BYTES=1000)
+    response = TestClient(api.app).post(
+        "/parse", headers=ORIGIN, files={"file": ("cv.txt", b"x" * 5000)}
+    )
+    assert response.status_code == 413
+    assert response.headers["access-control-allow-origin"] == ORIGIN["Origin"]
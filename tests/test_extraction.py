@@ -0,0 +1,119 @@
+import tempfile
+import zipfile
+from io import BytesIO
+
+import pytest
+from docx import Document
+
+from benchmarks import corpus
+from src import extraction
+
+
+def docx_bytes(*paragraphs) -> bytes:
+    doc = Document()
+    for text in paragraphs:
+        doc.add_paragraph(text)
+    out = BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def test_magic_bytes_win_over_the_filename():
+    pdf = corpus.make_pdf([["Jane Doe"]])
+    assert extraction.detect_format(pdf, "resume.docx") == extraction.PDF
+    assert extraction.detect_format(docx_bytes("Jane"), "resume.pdf") == extraction.DOCX
+    # Some generators put junk before the PDF header
+    assert extraction.detect_format(b"\r\n\x00" + pdf, None) == extraction.PDF
+
+
+def test_plain_text_is_detected_even_when_cut_mid_character():
+    head = ("Jane Doe\n" + "é" * 600).encode("utf-8")[:extraction.SNIFF_BYTES]
+    with pytest.raises(UnicodeDecodeError):
+        head.decode("utf-8")
+    assert extraction.detect_format(head, None) == extraction.TEXT
+
+
+@pytest.mark.parametrize("content, message", [
+    (b"<!DOCTYPE html><html><body>Jane</body></html>", "Unsupported"),
+    (b'{"name": "Jane"}', "Unsupported"),
+    (b"\x7fELF\x02\x01\x01" + bytes(64), "Unsupported"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + bytes(64), "Legacy .doc"),
+])
+def test_non_resume_uploads_are_rejected(content, message):
+    with pytest.raises(ValueError, match=message):
+        extraction.detect_format(content, "upload")
+
+
+def test_unrecognised_binary_falls_back_to_extension():
+    assert extraction.detect_format(bytes(range(256)), "scan.pdf") == extraction.PDF
+
+
+def test_uploads_are_extracted_without_temp_files(monkeypatch):
+    def no_disk(*args, **kwargs):
+        raise AssertionError("extraction touched a temp file")
+
+    for name in ("NamedTemporaryFile", "TemporaryFile", "mkstemp", "mkdtemp"):
+        monkeypatch.setattr(tempfile, name, no_disk)
+    text, stats = extraction.extract_text_with_stats(docx_bytes("Jane Doe", "SKILLS"), "cv")
+    assert text == "Jane Doe\nSKILLS"
+    assert stats["format"] == extraction.DOCX
+    pdf = corpus.make_pdf([["Jane Doe", "jane@example.com"]])
+    assert "jane@example.com" in extraction.extract_text_from_bytes(pdf)
+
+
+def test_docx_stream_reads_headers_tables_and_footers_in_order():
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Jane Doe | jane@example.com"
+    doc.add_paragraph("EXPERIENCE")
+    run = doc.add_paragraph("Engineer").add_run()
+    run.add_tab()
+    run.add_text("2019 - 2021")
+    table = doc.add_table(rows=2, cols=2)
+    for r, row in enumerate((("Skill", "Level"), ("Python", "Expert"))):
+        for c, text in enumerate(row):
+            table.cell(r, c).text = text
+    doc.add_paragraph("")
+    doc.sections[0].footer.paragraphs[0].text = "Page 1"
+    out = BytesIO()
+    doc.save(out)
+
+    lines = list(extraction.iter_docx_text(BytesIO(out.getvalue())))
+    assert lines == [
+        "Jane Doe | jane@example.com",
+        "EXPERIENCE",
+        "Engineer\t2019 - 2021",
+        "Skill | Level",
+        "Python | Expert",
+        "Page 1",
+    ]
+
+
+def test_docx_text_box_fallback_is_not_duplicated():
+    body = (
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+        'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"><w:body>'
+        '<w:p><w:r><mc:AlternateContent>'
+        '<mc:Choice><w:txbxContent><w:p><w:r><w:t>Boxed</w:t></w:r></w:p></w:txbxContent></mc:Choice>'
+        '<mc:Fallback><w:txbxContent><w:p><w:r><w:t>Boxed</w:t></w:r></w:p></w:txbxContent></mc:Fallback>'
+        '</mc:AlternateContent></w:r></w:p>'
+        '<w:p><w:r><w:t>After</w:t></w:r></w:p>'
+        '</w:body></w:document>'
+    )
+    archive = BytesIO()
+    with zipfile.ZipFile(archive, "w") as z:
+        z.writestr("word/document.xml", body)
+    assert list(extraction.iter_docx_text(archive)) == ["Boxed", "After"]
+
+
+def test_docx_extraction_stops_at_char_budget():
+    content = docx_bytes(*(f"Bullet {i} " + "x" * 40 for i in range(5000)))
+    text = extraction.extract_from_docx(BytesIO(content), char_budget=1000)
+    assert 1000 <= len(text) < 1100
+    assert text.startswith("Bullet 0 ")
+
+
+def test_docx_stream_matches_python_docx_paragraphs():
+    paragraphs = ["Jane Doe", "SUMMARY", "Backend engineer", "SKILLS", "Python, Go"]
+    content = docx_bytes(*paragraphs)
+    expected = [p.text for p in Document(BytesIO(content)).paragraphs if p.text.strip()]
+    assert list(extraction.iter_docx_text(BytesIO(content))) == expected
@@ -0,0 +1,98 @@
+import asyncio
+import sqlite3
+
+from src.jobs import FAILED, JobQueue, JobWorkerPool
+from src.parser import RULES_MODE, ResumeParser
+
+RESUME = b"Jane Doe\njane@example.com\nSKILLS\nPython, SQL"
+
+
+def queue(tmp_path, **kwargs) -> JobQueue:
+    return JobQueue(str(tmp_path / "jobs.db"), **kwargs)
+
+
+def test_expired_lease_hands_item_out_again(tmp_path):
+    jobs = queue(tmp_path, lease_seconds=0)
+    jobs.submit([("cv.txt", RESUME)], RULES_MODE)
+    assert jobs.claim(max_attempts=3).attempts == 1
+    # The worker never finished: the item comes back with the next claim
+    assert jobs.claim(max_attempts=3).attempts == 2
+
+
+def test_item_that_keeps_losing_its_worker_is_failed(tmp_path):
+    jobs = queue(tmp_path, lease_seconds=0)
+    job_id = jobs.submit([("crash.pdf", b"%PDF-1.4")], RULES_MODE)
+    for _ in range(3):
+        assert jobs.claim(max_attempts=3) is not None
+    assert jobs.claim(max_attempts=3) is None
+    job = jobs.get(job_id)
+    assert job["status"] == "completed"
+    assert job["resumes"][0]["status"] == FAILED
+    assert "lease expired" in job["resumes"][0]["data"]["error"]
+
+
+class StubParser:
+    """Fails with `errors` in turn, then parses"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+
+    async def parse_bytes_async(self, content, filename, **options):
+        if self.errors:
+            return {"error": self.errors.pop(0)}
+        return {"name": "Jane Doe"}
+
+
+def test_transient_failure_is_retried(tmp_path):
+    jobs = queue(tmp_path)
+    job_id = jobs.submit([("cv.txt", RESUME)], RULES_MODE)
+    workers = JobWorkerPool(jobs, StubParser("HTTP 503"), max_attempts=3, retry_backoff=0)
+
+    async def drain():
+        for _ in range(2):
+            await workers.process(jobs.claim(max_attempts=3))
+
+    asyncio.run(drain())
+    entry = jobs.get(job_id)["resumes"][0]
+    assert entry["status"] == "success"
+    assert entry["attempts"] == 2
+
+
+def test_bad_file_is_not_retried(tmp_path):
+    jobs = queue(tmp_path)
+    job_id = jobs.submit([("cv.txt", RESUME)], RULES_MODE)
+    workers = JobWorkerPool(jobs, StubParser("Unsupported file format"), max_attempts=3)
+    asyncio.run(workers.process(jobs.claim()))
+    assert jobs.get(job_id)["resumes"][0]["status"] == FAILED
+
+
+class LockedOnce(JobQueue):
+    """Queue whose first claim fails like a locked database"""
+
+    locked = True
+
+    def claim(self, max_attempts=None):
+        if self.locked:
+            self.locked = False
+            raise sqlite3.OperationalError("database is locked")
+        return super().claim(max_attempts)
+
+
+def test_worker_survives_database_errors(tmp_path):
+    jobs = LockedOnce(str(tmp_path / "jobs.db"))
+    job_id = jobs.submit([("cv.txt", RESUME)], RULES_MODE)
+    parser = ResumeParser("test-key")
+
+    async def run():
+        workers = JobWorkerPool(jobs, parser, workers=1, poll_interval=0.01)
+        workers.start()
+        for _ in range(200):
+            if jobs.get(job_id)["status"] == "completed":
+                break
+            await asyncio.sleep(0.01)
+        await workers.stop()
+
+    asyncio.run(run())
+    entry = jobs.get(job_id)["resumes"][0]
+    assert entry["status"] == "success"
+    assert entry["data"]["email"] == "jane@example.com"
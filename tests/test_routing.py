@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+from src.parser import ResumeParser
+from src.providers import CHEAPEST, HEDGED, LLM_HEDGES, NO_BACKEND_ERROR, LLMRouter
+
+RESUME = b"Jane Doe\njane@example.com\nEXPERIENCE\nEngineer at Acme, shipping billing services"
+
+
+def parse(router):
+    return asyncio.run(ResumeParser("test-key", router=router).parse_bytes_async(RESUME, "cv.txt"))
+
+
+def test_failing_backend_falls_back_to_the_next(mock_backend):
+    broken, broken_stats = mock_backend("broken", error_rate=1.0)
+    working, working_stats = mock_backend("working")
+    result = parse(LLMRouter([broken, working]))
+    assert "llm_error" not in result
+    assert result["name"] == "Jane Doe"
+    assert broken_stats["errors"] >= 1
+    assert working_stats["requests"] == 1
+
+
+def test_cheapest_backend_is_tried_first(mock_backend):
+    pricey, pricey_stats = mock_backend("pricey", cost_per_1k_tokens=1.0)
+    cheap, cheap_stats = mock_backend("cheap", cost_per_1k_tokens=0.1)
+    router = LLMRouter([pricey, cheap], strategy=CHEAPEST)
+    assert [b.name for b in router.ordered()] == ["cheap", "pricey"]
+    parse(router)
+    assert cheap_stats["requests"] == 1
+    assert pricey_stats["requests"] == 0
+
+
+def test_slow_backend_is_hedged_by_the_next(mock_backend):
+    slow, slow_stats = mock_backend("slow", latency=5.0)
+    fast, fast_stats = mock_backend("fast")
+    router = LLMRouter([slow, fast], strategy=HEDGED, hedge_delay=0.05)
+    hedges = LLM_HEDGES.value(backend="fast")
+    started = time.perf_counter()
+    result = parse(router)
+    assert time.perf_counter() - started < 2.0
+    assert result["name"] == "Jane Doe"
+    assert slow_stats["requests"] == 1 and fast_stats["requests"] == 1
+    assert LLM_HEDGES.value(backend="fast") == hedges + 1
+
+
+def test_router_without_backends_reports_it():
+    router = LLMRouter([])
+    assert asyncio.run(router.complete([], decode=dict)) == {"error": NO_BACKEND_ERROR}
+    result = parse(router)
+    assert result["llm_error"] == NO_BACKEND_ERROR
+    assert result["email"] == "jane@example.com"
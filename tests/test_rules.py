@@ -0,0 +1,87 @@
+from src import rules
+
+
+def fields(text):
+    return rules.extract_fields(text)
+
+
+def test_contact_details_and_links():
+    result = fields(
+        "Jane Doe\njane.doe@example.com | +1 (555) 123-4567 | Boston, MA\n"
+        "linkedin.com/in/janedoe | https://github.com/jane"
+    )
+    assert result["name"] == "Jane Doe"
+    assert result["email"] == "jane.doe@example.com"
+    assert result["phone"] == "+1 (555) 123-4567"
+    assert result["location"] == "Boston, MA"
+    assert result["links"] == ["linkedin.com/in/janedoe", "https://github.com/jane"]
+
+
+def test_phone_keeps_opening_parenthesis():
+    assert fields("Jane Doe\n(555) 123-4567")["phone"] == "(555) 123-4567"
+
+
+def test_date_range_is_not_a_phone():
+    assert fields("Jane Doe\nEXPERIENCE\nEngineer, Acme 2018 - 2021")["phone"] is None
+
+
+def test_job_title_is_not_taken_as_name_or_location():
+    result = fields("JOHN SMITH, PhD\nSenior Software Engineer")
+    assert result["name"] == "John Smith"
+    assert result["location"] is None
+
+
+def test_skill_list_is_not_a_location():
+    assert fields("Alex Chen\nPython, Kubernetes")["location"] is None
+
+
+def test_headed_sections():
+    text = (
+        "Jane Doe\nSUMMARY\nBackend engineer.\nSKILLS\n"
+        "Languages: Python, Go\nAWS (EC2, S3); Docker\nCERTIFICATIONS\n- CKA\n"
+    )
+    result = fields(text)
+    assert result["summary"] == "Backend engineer."
+    assert result["skills"] == ["Python", "Go", "AWS (EC2, S3)", "Docker"]
+    assert result["certifications"] == ["CKA"]
+
+
+def test_repeated_heading_gets_suffix():
+    sections = rules.split_sections("Jane\nSKILLS\nPython\nEXPERIENCE\nAcme\nSKILLS\nGo")
+    assert list(sections) == ["header", "skills", "experience", "skills_3"]
+
+
+def test_only_precise_fields_are_resolved():
+    partial = fields("Jane Doe\njane@example.com | Boston, MA\nSKILLS\nPython")
+    missing = rules.unresolved_fields(partial)
+    assert "email" not in missing
+    assert {"name", "location", "skills"} <= set(missing)
+
+
+def test_merge_prefers_llm_except_for_resolved_fields():
+    partial = {**rules.FIELDS, "name": "Senior Engineer", "email": "jane@example.com",
+               "location": "Python, Go", "skills": ["Python"], "links": ["github.com/jane"]}
+    llm = {"name": "Jane Doe", "email": "wrong@example.com", "location": None, "skills": []}
+    merged = rules.merge(partial, llm)
+    assert merged["name"] == "Jane Doe"
+    assert merged["email"] == "jane@example.com"
+    # LLM left these empty: the rule guesses fill in
+    assert merged["location"] == "Python, Go"
+    assert merged["skills"] == ["Python"]
+    assert merged["links"] == ["github.com/jane"]
+
+
+def test_phone_does_not_span_lines():
+    assert fields("Jane Doe\n#0\n8928008966")["phone"] == "8928008966"
+
+
+def test_month_year_range_is_not_a_phone():
+    result = fields("Jane Doe\njane@example.com\nEngineer, Acme 01.2018 - 12.2021")
+    assert result["phone"] is None
+
+
+def test_phone_only_taken_from_header():
+    text = "Jane Doe\njane@example.com\nEXPERIENCE\nTicket 555 123 4567 closed, 01.2018 - 12.2021"
+    result = fields(text)
+    assert result["phone"] is None
+    assert "phone" in rules.unresolved_fields(result)
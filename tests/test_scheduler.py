@@ -0,0 +1,102 @@
+import time
+
+import httpx
+import pytest
+
+from src.scheduler import CircuitBreaker, CircuitOpenError, LLMScheduler, TokenBucket
+
+
+class ThrottledClient:
+    """Answers 429 with `retry_after` until `failures` calls have been made"""
+
+    endpoint = "http://llm"
+
+    def __init__(self, retry_after: str, failures: int = 100):
+        self.retry_after = retry_after
+        self.failures = failures
+        self.calls = 0
+
+    def complete_sync(self, messages, model, **options):
+        self.calls += 1
+        if self.calls <= self.failures:
+            return httpx.Response(429, headers={"Retry-After": self.retry_after})
+        return httpx.Response(200, json={"choices": []})
+
+
+def test_token_bucket_serves_burst_then_paces():
+    bucket = TokenBucket(rate=10.0, capacity=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_token_bucket_refund_returns_tokens():
+    bucket = TokenBucket(rate=1.0, capacity=10)
+    bucket.reserve(10)
+    assert bucket.reserve(4) == pytest.approx(4.0, abs=0.01)
+    bucket.refund(4)
+    assert bucket.reserve(4) == pytest.approx(4.0, abs=0.01)
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(threshold=2, reset_seconds=60)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.retry_in() > 59
+
+
+def test_breaker_half_open_allows_one_probe():
+    breaker = CircuitBreaker(threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_breaker_failed_probe_reopens():
+    breaker = CircuitBreaker(threshold=3, reset_seconds=0.05)
+    for _ in range(3):
+        breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_disabled_with_zero_threshold():
+    breaker = CircuitBreaker(threshold=0)
+    for _ in range(10):
+        breaker.record_failure()
+    assert breaker.allow()
+
+
+def test_short_retry_after_is_waited_out_and_retried():
+    client = ThrottledClient("0.05", failures=1)
+    scheduler = LLMScheduler(client, max_attempts=3, backoff_max=1.0)
+    started = time.monotonic()
+    assert scheduler.complete_sync([], "model").status_code == 200
+    assert client.calls == 2
+    assert time.monotonic() - started >= 0.05
+
+
+def test_retry_after_beyond_backoff_max_fails_fast():
+    client = ThrottledClient("3600")
+    scheduler = LLMScheduler(client, max_attempts=4, backoff_max=5.0)
+    started = time.monotonic()
+    assert scheduler.complete_sync([], "model").status_code == 429
+    assert client.calls == 1
+    # Later callers are refused without reaching the provider
+    with pytest.raises(CircuitOpenError):
+        scheduler.complete_sync([], "model")
+    assert client.calls == 1
+    assert time.monotonic() - started < 1.0
@@ -0,0 +1,76 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src.store import ResumeStore, SearchError, index_terms, normalize_term
+
+
+def resume(name, skills, titles=(), companies=()):
+    return {
+        "name": name,
+        "skills": list(skills),
+        "experience": [{"title": t, "company": c} for t, c in zip(titles, companies or [None] * len(titles))],
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResumeStore(str(tmp_path / "resumes.db"))
+    store.save_many([
+        ("a" * 64, "ann.pdf", resume("Ann", ["Python", "AWS (EC2, S3)"], ["Senior Engineer"], ["Acme"])),
+        ("b" * 64, "bob.pdf", resume("Bob", ["Python", "Java"], ["Engineer"], ["Globex"])),
+        ("c" * 64, "cat.pdf", resume("Cat", ["C++", "Kubernetes"], ["Senior SRE"], ["Acme"])),
+    ])
+    yield store
+    store.close()
+
+
+def names(result):
+    return [r["name"] for r in result["results"]]
+
+
+def test_terms_are_normalised_whole_and_by_word():
+    assert normalize_term("  AWS (EC2, S3) ") == "aws ec2 s3"
+    assert normalize_term("Node.js") == "node.js"
+    assert (1, "c++") in index_terms({"skills": ["C++"]})
+    terms = index_terms(resume("Ann", [], ["Senior Engineer"]))
+    assert {(2, "senior engineer"), (2, "senior"), (2, "engineer")} <= set(terms)
+
+
+def test_clauses_are_anded_newest_first(store):
+    assert names(store.search({"skill": ["python"]})) == ["Bob", "Ann"]
+    assert names(store.search({"skill": ["python"], "title": ["senior"]})) == ["Ann"]
+    assert names(store.search({"skill": ["ec2"], "company": ["acme"]})) == ["Ann"]
+
+
+def test_alternatives_and_negation(store):
+    assert names(store.search({"skill": ["java|kubernetes"]})) == ["Cat", "Bob"]
+    assert names(store.search({"skill": ["python", "-java"]})) == ["Ann"]
+
+
+def test_paging_reports_more(store):
+    first = store.search({"company": ["acme|globex"]}, limit=2)
+    assert first["count"] == 2 and first["has_more"]
+    rest = store.search({"company": ["acme|globex"]}, limit=2, offset=2)
+    assert names(rest) == ["Ann"] and not rest["has_more"]
+
+
+def test_replace_drops_the_old_terms(store):
+    store.save("b" * 64, "bob.pdf", resume("Bob", ["Go"], ["Engineer"], ["Globex"]))
+    assert names(store.search({"skill": ["python"]})) == ["Ann"]
+    assert names(store.search({"skill": ["go"]})) == ["Bob"]
+    # A rules-only save never overwrites a full result
+    store.save("b" * 64, "bob.pdf", resume("Bob", ["Rust"]), replace=False)
+    assert store.get("b" * 64)["data"]["skills"] == ["Go"]
+
+
+def test_unanswerable_queries_are_rejected(store):
+    with pytest.raises(SearchError):
+        store.search({"skill": ["-java"]})
+    with pytest.raises(SearchError):
+        store.search({"hobby": ["chess"]})
+
+
+def test_search_endpoint_returns_400_for_bad_queries(load_api):
+    client = TestClient(load_api().app)
+    assert client.get("/search", params={"skill": "-java"}).status_code == 400
+    assert client.get("/resumes/" + "0" * 64).status_code == 404
@@ -0,0 +1,65 @@
+import asyncio
+from io import BytesIO
+
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+
+from src.uploads import UnsupportedUpload, UploadTooLarge, read_upload
+
+RESUME = b"Jane Doe\njane@example.com\nSKILLS\nPython, SQL\n"
+
+
+def read(content, filename="cv.txt", max_bytes=1000, chunk_size=64):
+    return asyncio.run(read_upload(UploadFile(BytesIO(content), filename=filename), max_bytes, chunk_size))
+
+
+def test_read_upload_hashes_and_sniffs():
+    upload = read(RESUME * 10)
+    assert upload.content == RESUME * 10
+    assert upload.kind == "text"
+    assert len(upload.sha256) == 64
+
+
+def test_read_upload_stops_at_the_cap():
+    with pytest.raises(UploadTooLarge):
+        read(RESUME * 100, max_bytes=500)
+
+
+def test_read_upload_rejects_html():
+    with pytest.raises(UnsupportedUpload):
+        read(b"<!DOCTYPE html><html><body>Jane Doe</body></html>")
+
+
+def test_oversized_file_gets_413(load_api):
+    api = load_api(MAX_UPLOAD_BYTES=1000)
+    response = TestClient(api.app).post("/parse", files={"file": ("cv.txt", RESUME * 100)})
+    assert response.status_code == 413
+
+
+def test_oversized_request_is_cut_off_before_parsing(load_api):
+    api = load_api(MAX_REQUEST_BYTES=1000)
+    response = TestClient(api.app).post("/parse", files={"file": ("cv.txt", RESUME * 100)})
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Request too large"}
+
+
+def test_unsupported_upload_gets_415(load_api):
+    api = load_api()
+    response = TestClient(api.app).post(
+        "/parse", files={"file": ("page.html", b"<html><body>Jane Doe</body></html>")}
+    )
+    assert response.status_code == 415
+
+
+def test_batch_reports_oversized_file_alone(load_api):
+    api = load_api(MAX_UPLOAD_BYTES=1000)
+    response = TestClient(api.app).post(
+        "/batch-parse?mode=rules",
+        files=[("files", ("big.txt", RESUME * 100)), ("files", ("cv.txt", RESUME))],
+    )
+    assert response.status_code == 200
+    big, small = response.json()["resumes"]
+    assert big["status"] == "error" and big["error"] == "File too large"
+    assert small["status"] == "success"
+    assert small["data"]["email"] == "jane@example.com"
@@ -0,0 +1,30 @@
+import asyncio
+import os
+
+from src.workers import WorkerPools
+
+
+def crash_once(marker: str) -> int:
+    """Kill the worker process the first time, like an OOM on a hostile PDF"""
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return os.getpid()
+
+
+def test_crashed_process_pool_is_replaced(tmp_path):
+    pools = WorkerPools(cpu_workers=1, io_workers=1)
+
+    async def scenario():
+        first = pools.cpu
+        pid = await pools.run_cpu(crash_once, str(tmp_path / "crashed"))
+        return first, pid
+
+    try:
+        first, pid = asyncio.run(scenario())
+        assert pid != os.getpid()
+        assert pools.cpu is not first
+        # The replacement keeps serving later calls
+        assert asyncio.run(pools.run_cpu(os.getpid)) == pid
+    finally:
+        pools.shutdown()